@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-from utils.db_connector import get_data
+from utils import profiling, startup
+from utils.health import get_health, start_health_check
+from utils.prefetch import prefetch_adjacent
+from model.modeling import start_background_warmup
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -9,6 +11,12 @@ st.set_page_config(
     layout="wide"
 )
 
+profiling.set_page("app")
+startup.mark("app: imports + page config")
+
+# The database check runs on a background thread while the page renders (result cached for a minute)
+start_health_check()
+
 # --- Header and Introduction ---
 st.title("🚗 Revving Up Classic Models: A Data-Driven Pit Stop")
 
@@ -42,22 +50,32 @@ st.markdown(
 )
 
 st.markdown("---")
+startup.mark("app: first paint")
+
+# Load the ML models into the shared cache while the user reads the landing page
+# (started after first paint so importing scikit-learn does not compete with it)
+start_background_warmup()
 
 # --- Quick Database Health Check (Optional but helpful) ---
 st.header("Database Status Check")
 
-# Query to get basic info (e.g., total customers)
-try:
-    df_customers_count = get_data("SELECT COUNT(customerNumber) AS total_customers FROM customers;")
-    if not df_customers_count.empty:
-        st.success(f"Database connection successful! We are tracking **{df_customers_count.iloc[0]['total_customers']}** customers.")
-    else:
-        st.warning("Database connected, but no customer data found.")
-except Exception as e:
-    st.error(f"Failed to query database. Ensure 'classicmodels.sqlite' is in the root directory. Error: {e}")
+# Only the first load of a process waits (briefly) for the check; later loads use the cached result
+health = get_health(wait=5.0)
+if health is None:
+    st.info("The database check is still running. Refresh the page in a moment to see the result.")
+elif not health.ok:
+    st.error(f"Failed to query database. Ensure 'classicmodels.sqlite' is in the root directory. Error: {health.error}")
+elif health.customers:
+    st.success(f"Database connection successful! We are tracking **{health.customers}** customers.")
+else:
+    st.warning("Database connected, but no customer data found.")
+startup.mark("app: health check")
 
 st.markdown(
     """
     **💡 Get Started:** Select **'📊 Exploratory Data Analysis'** from the sidebar to begin your data deep dive!
     """
-)
\ No newline at end of file
+)
+
+# Warm the query cache for the neighbouring pages now that this one has rendered
+prefetch_adjacent("app")
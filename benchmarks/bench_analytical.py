@@ -0,0 +1,89 @@
+"""Benchmark: aggregate queries on SQLite vs the DuckDB analytical mirror.
+
+For every query registered with analytical=True, runs its SQL on SQLite and
+on an AnalyticalMirror of the same database (utils/analytical.py). It reports
+the median latency of each engine, the speedup and the mirror build time, and
+checks that both engines return the same rows.
+
+Databases are the generated classicmodels datasets of the benchmark suite
+(cached under benchmarks/.data, generated on first use).
+
+Usage:
+    python benchmarks/bench_analytical.py                      # sample database + 1m order lines
+    python benchmarks/bench_analytical.py --scales 1m 10m --repeat 5
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suite import ROOT, SCALES, prepare_database  # noqa: E402
+from utils.analytical import AnalyticalMirror  # noqa: E402
+from utils.index_advisor import sample_params  # noqa: E402
+from utils.queries import QUERY_REGISTRY  # noqa: E402
+
+
+def same_result(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    """Order-insensitive comparison with a float tolerance (engines sum in different orders)."""
+    if list(left.columns) != list(right.columns) or len(left) != len(right):
+        return False
+    left = left.sort_values(list(left.columns), ignore_index=True)
+    right = right.sort_values(list(right.columns), ignore_index=True)
+    for column in left.columns:
+        a, b = left[column], right[column]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            if not np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), rtol=1e-9, equal_nan=True):
+                return False
+        elif not a.astype(str).equals(b.astype(str)):
+            return False
+    return True
+
+
+def timed(run, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def bench_scale(db_path: str, repeat: int):
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    mirror = AnalyticalMirror(db_path)
+    rows = sum(mirror.tables.values())
+    print(f"  mirror: {rows:,} rows in {len(mirror.tables)} tables built in {mirror.build_seconds:.1f}s")
+    print(f"  {'query':<34} {'sqlite ms':>10} {'duckdb ms':>10} {'speedup':>8} {'rows':>9}  same")
+    for name, query in sorted(QUERY_REGISTRY.items()):
+        if not query.analytical:
+            continue
+        params = sample_params(connection, query)
+        sqlite_ms, expected = timed(lambda: pd.read_sql_query(query.sql, connection, params=params), repeat)
+        duckdb_sql = query.sql_for("duckdb")
+        duckdb_ms, actual = timed(lambda: mirror.query(duckdb_sql, params), repeat)
+        print(f"  {name:<34} {sqlite_ms:>10.1f} {duckdb_ms:>10.1f} {sqlite_ms / duckdb_ms:>7.1f}x "
+              f"{len(actual):>9,}  {'yes' if same_result(expected, actual) else 'NO'}")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["sample", "1m"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query and engine (median)")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "benchmarks", ".data"), help="generated databases")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        print(f"[{scale}]")
+        bench_scale(prepare_database(scale, args.data_dir), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: running each page query vs reading its result back from the disk cache.
+
+For every parameterless query in PAGE_QUERIES (what a fresh replica computes
+first), runs its SQL on SQLite, stores the result in a DiskResultCache
+(utils/disk_cache.py) and reads it back as a restarted process would. It
+reports the median latency of both paths, the file size and whether the round
+trip returned the same frame.
+
+Databases are the generated classicmodels datasets of the benchmark suite
+(cached under benchmarks/.data, generated on first use).
+
+Usage:
+    python benchmarks/bench_disk_cache.py                      # sample database + 1m order lines
+    python benchmarks/bench_disk_cache.py --scales 1m 10m --repeat 5
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_analytical import timed  # noqa: E402
+from suite import ROOT, SCALES, prepare_database  # noqa: E402
+from utils.disk_cache import DiskResultCache  # noqa: E402
+from utils.queries import PAGE_QUERIES, get_query  # noqa: E402
+from utils.query_cache import make_cache_key  # noqa: E402
+
+
+def bench_scale(db_path: str, repeat: int):
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    names = dict.fromkeys(name for names in PAGE_QUERIES.values() for name in names)
+    print(f"  {'query':<34} {'sqlite ms':>10} {'disk ms':>8} {'speedup':>8} {'file KB':>8}  same")
+    with tempfile.TemporaryDirectory() as directory:
+        disk = DiskResultCache(directory, max_bytes=1 << 34, min_seconds=0)
+        for name in names:
+            query = get_query(name)
+            if query.params:
+                continue
+            if query.requires and not set(query.requires) <= tables:
+                query = get_query(query.fallback)
+            key, version = make_cache_key(query.sql), (db_path,)
+            sqlite_ms, expected = timed(lambda: pd.read_sql_query(query.sql, connection), repeat)
+            disk.put(key, version, expected)
+            disk_ms, actual = timed(lambda: disk.get(key, version), repeat)
+            size_kb = os.path.getsize(disk.path_for(key, version)) / 1024
+            same = actual is not None and actual.equals(expected)
+            print(f"  {name:<34} {sqlite_ms:>10.1f} {disk_ms:>8.1f} {sqlite_ms / disk_ms:>7.1f}x "
+                  f"{size_kb:>8.0f}  {'yes' if same else 'NO'}")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["sample", "1m"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query and path (median)")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "benchmarks", ".data"), help="generated databases")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        print(f"[{scale}]")
+        bench_scale(prepare_database(scale, args.data_dir), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
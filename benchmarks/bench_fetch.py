@@ -0,0 +1,116 @@
+"""Benchmark: row-based vs columnar fetch path of get_data.
+
+Builds an orderdetails-shaped SQLite table at each scale and reads it back
+through both fetch engines. Every measurement runs in a fresh subprocess so the
+reported peak RSS belongs to that fetch path alone.
+
+Usage:
+    python benchmarks/bench_fetch.py                       # 10k, 1M and 10M rows
+    python benchmarks/bench_fetch.py --rows 10000 1000000  # custom scales
+"""
+import argparse
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from utils.columnar import fetch_columnar, fetch_rows  # noqa: E402
+
+QUERY = "SELECT orderNumber, productCode, quantityOrdered, priceEach, orderLineNumber FROM orderdetails"
+DTYPES = {"orderNumber": "int64", "quantityOrdered": "int64", "priceEach": "float64", "orderLineNumber": "int64"}
+
+
+def build_database(path: str, n_rows: int, chunk: int = 500_000):
+    """Writes an orderdetails-shaped table with `n_rows` random rows."""
+    rng = np.random.default_rng(42)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = OFF;")
+    connection.execute("PRAGMA synchronous = OFF;")
+    connection.execute(
+        "CREATE TABLE orderdetails (orderNumber BIGINT, productCode TEXT, "
+        "quantityOrdered BIGINT, priceEach FLOAT, orderLineNumber BIGINT)"
+    )
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        rows = zip(
+            (10100 + np.arange(start, start + size) // 10).tolist(),
+            ("S" + s for s in rng.integers(10, 99, size).astype(str)),
+            rng.integers(1, 100, size).tolist(),
+            rng.uniform(10, 250, size).round(2).tolist(),
+            (np.arange(start, start + size) % 10 + 1).tolist(),
+        )
+        connection.executemany("INSERT INTO orderdetails VALUES (?, ?, ?, ?, ?)", rows)
+        connection.commit()
+    connection.close()
+
+
+def peak_rss_mb() -> float:
+    """Returns this process's peak resident set size in MB.
+
+    VmHWM is preferred on Linux because ru_maxrss survives exec() and would
+    report the parent's peak (the database build) instead of the worker's.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(engine_name: str, path: str):
+    """Fetches the table once with one engine and prints seconds, peak RSS and frame size."""
+    engine = create_engine(f"sqlite:///{path}")
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        result = connection.execute(text(QUERY))
+        if engine_name == "rows":
+            df = fetch_rows(result)
+        else:
+            df = fetch_columnar(result, dtypes=DTYPES)
+    elapsed = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    frame_mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"{elapsed:.4f} {rss_after - rss_before:.1f} {frame_mb:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    print(f"{'rows':>12} {'engine':>9} {'seconds':>9} {'peak MB':>9} {'frame MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f"bench_{n_rows}.sqlite")
+            build_database(path, n_rows)
+            for engine_name in ("rows", "columnar"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", engine_name, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()
+                seconds, peak_mb, frame_mb = output
+                print(f"{n_rows:>12,} {engine_name:>9} {seconds:>9} {peak_mb:>9} {frame_mb:>9}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
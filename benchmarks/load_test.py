@@ -0,0 +1,145 @@
+"""Load test: N concurrent dashboard sessions replaying the page queries.
+
+Each simulated session walks app -> 01_eda -> 02/03/04 like a real user,
+running every page's registered queries (with a random customer for the
+per-selection lookups) against a shared engine, and the harness reports
+p50/p95/p99 latency per query.
+
+By default queries go straight to the engine so the numbers reflect SQLite and
+the connection pool; pass --cache to route them through run_query and the
+shared result cache instead.
+
+Usage:
+    python benchmarks/load_test.py --sessions 32 --rounds 20
+    python benchmarks/load_test.py --db /tmp/big.sqlite --pool-size 16 --cache
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.churn_windows import window_bounds  # noqa: E402
+from utils.engine_factory import EngineConfig, create_sqlite_engine  # noqa: E402
+from utils.queries import PAGE_QUERIES, get_query  # noqa: E402
+
+# Values for page query parameters that are not a customer id (histogram bin edges;
+# the churn window bounds are added from the database in main())
+FIXED_PARAMS = {"lo": 0.0, "width": 10000.0}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_customer_ids(engine) -> list[int]:
+    with engine.connect() as connection:
+        return [row[0] for row in connection.exec_driver_sql("SELECT customerNumber FROM customers;")]
+
+
+def run_session(run_one, customer_ids: list[int], rounds: int, seed: int, timings: dict, lock: threading.Lock):
+    """Replays `rounds` page visits in navigation order and records per-query latency."""
+    rng = random.Random(seed)
+    local = defaultdict(list)
+    for _ in range(rounds):
+        for page, query_names in PAGE_QUERIES.items():
+            for name in query_names:
+                query = get_query(name)
+                params = {
+                    param: FIXED_PARAMS[param] if param in FIXED_PARAMS else rng.choice(customer_ids)
+                    for param in query.params
+                }
+                start = time.perf_counter()
+                run_one(query, params)
+                local[f"{page}:{name}"].append((time.perf_counter() - start) * 1000)
+    with lock:
+        for key, values in local.items():
+            timings[key].extend(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join("data", "classicmodels.sqlite"))
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent simulated sessions")
+    parser.add_argument("--rounds", type=int, default=10, help="page walks per session")
+    parser.add_argument("--pool-size", type=int, default=None, help="override the engine pool size")
+    parser.add_argument("--cache", action="store_true", help="go through run_query and the shared result cache")
+    args = parser.parse_args()
+
+    config = EngineConfig.from_env()
+    if args.pool_size is not None:
+        config = replace(config, pool_size=args.pool_size)
+    engine = create_sqlite_engine(args.db, config)
+
+    if args.cache:
+        # Route the cached path at the requested database / pool settings
+        os.environ["DASHBOARD_DB_SQLITE_PATH"] = args.db
+        if args.pool_size is not None:
+            os.environ["DASHBOARD_DB_POOL_SIZE"] = str(args.pool_size)
+        from utils import db_connector
+
+        def run_one(query, params):
+            db_connector.run_query(query.name, **params)
+    else:
+        def run_one(query, params):
+            if query.requires:
+                query = get_query(query.fallback) if not _has_tables(engine, query.requires) else query
+            with engine.connect() as connection:
+                connection.execute(query.statement, params).fetchall()
+
+    customer_ids = load_customer_ids(engine)
+    with engine.connect() as connection:
+        last_order = connection.exec_driver_sql("SELECT MAX(orderDate) FROM orders;").scalar()
+    FIXED_PARAMS.update(window_bounds(pd.Timestamp(last_order)))
+    timings = defaultdict(list)
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, run_one, customer_ids, args.rounds, seed, timings, lock)
+            for seed in range(args.sessions)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in timings.values())
+    print(f"{args.sessions} sessions x {args.rounds} rounds: {total} queries in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} queries/s), pool_size={config.pool_size}, cache={args.cache}")
+    print(f"{'page:query':<52} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    all_values = []
+    for key in sorted(timings):
+        values = timings[key]
+        all_values.extend(values)
+        print(f"{key:<52} {len(values):>6} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} "
+              f"{percentile(values, 99):>8.2f} {statistics.fmean(values):>8.2f}")
+    print(f"{'ALL':<52} {len(all_values):>6} {percentile(all_values, 50):>8.2f} {percentile(all_values, 95):>8.2f} "
+          f"{percentile(all_values, 99):>8.2f} {statistics.fmean(all_values):>8.2f}")
+
+
+_table_cache = {}
+
+
+def _has_tables(engine, tables: tuple) -> bool:
+    if engine not in _table_cache:
+        with engine.connect() as connection:
+            _table_cache[engine] = {
+                row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table';")
+            }
+    return set(tables) <= _table_cache[engine]
+
+
+if __name__ == "__main__":
+    main()
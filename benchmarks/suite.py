@@ -0,0 +1,284 @@
+"""Benchmark suite: every registered query and every page, at several data scales.
+
+For each scale a classicmodels-shaped database is generated once (cached under
+--data-dir) with the recommended indexes, materialized summaries and churn
+windows, then a fresh worker process pointed at it (DASHBOARD_DB_SQLITE_PATH)
+measures:
+
+    queries  every query in utils/queries.py through run_query, end to end:
+             cold (result cache cleared) and warm (cache hit) latency, rows, bytes
+    pages    app.py and pages/*.py run headlessly with Streamlit's AppTest:
+             first run (cold caches, includes model loading) and
+             rerun latency, exceptions, RSS after each page
+    memory   peak RSS of the worker
+
+The worker first publishes the ML models (model.modeling bootstrap) into its
+own directory, never to model/artifacts. Results are written to benchmarks/results/<time>_<commit>.json
+and compared with the previous run (or --baseline); metrics that got more than
+--threshold slower / bigger are reported and make the command exit with 1.
+
+Usage:
+    python benchmarks/suite.py                                # sample database + 100k order lines
+    python benchmarks/suite.py --scales sample 100k 1m 10m --repeat 5
+    python benchmarks/suite.py --baseline benchmarks/results/<file>.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_fetch import peak_rss_mb  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SAMPLE_DATABASE = os.path.join(ROOT, "data", "classicmodels.sqlite")
+
+# Scale name -> generated order lines (None = the committed sample database)
+SCALES = {"sample": None, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000, "100m": 100_000_000}
+
+# Metrics compared between runs (higher is worse) and the minimum absolute change
+# that counts, so sub-millisecond noise on tiny queries is not reported
+COMPARED_METRICS = {"cold_ms": 2.0, "warm_ms": 1.0, "first_run_ms": 25.0, "rerun_ms": 10.0, "peak_rss_mb": 20.0}
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Datasets ---
+
+def prepare_database(scale: str, data_dir: str) -> str:
+    """Path of the database for a scale, generating and indexing it on first use."""
+    if SCALES[scale] is None:
+        return SAMPLE_DATABASE
+    path = os.path.join(data_dir, f"classicmodels_{scale}.sqlite")
+    if os.path.exists(path):
+        return path
+
+    from data.generate_dummy import GeneratorConfig, generate_classicmodels
+    from model.churn_windows import refresh_churn_windows
+    from utils.index_advisor import RECOMMENDED_INDEXES, create_indexes
+    from utils.materialize import refresh_summaries
+
+    os.makedirs(data_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    start = time.perf_counter()
+    generate_classicmodels(GeneratorConfig(orderdetails=SCALES[scale]), tmp_path, workers=os.cpu_count() or 1)
+    connection = sqlite3.connect(tmp_path)
+    create_indexes(connection, RECOMMENDED_INDEXES)
+    refresh_summaries(connection, full=True)
+    refresh_churn_windows(connection, full=True)
+    connection.close()
+    os.replace(tmp_path, path)
+    print(f"  generated {scale} dataset in {time.perf_counter() - start:.1f}s -> {path}")
+    return path
+
+
+# --- Worker (runs in a fresh process per scale) ---
+
+def bench_queries(repeat: int) -> list[dict]:
+    from utils import db_connector
+    from utils.index_advisor import sample_params
+    from utils.queries import PAGE_QUERIES, QUERY_REGISTRY
+    from utils.query_cache import frame_nbytes
+
+    pages_of = {}
+    for page, names in PAGE_QUERIES.items():
+        for name in names:
+            pages_of.setdefault(name, []).append(page)
+
+    connection = sqlite3.connect(os.environ["DASHBOARD_DB_SQLITE_PATH"])
+    cache = db_connector.get_query_cache()
+    results = []
+    for name, query in sorted(QUERY_REGISTRY.items()):
+        params = sample_params(connection, query)
+        cold, warm = [], []
+        for _ in range(repeat):
+            cache.clear()
+            start = time.perf_counter()
+            df = db_connector.run_query(name, **params)
+            cold.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            db_connector.run_query(name, **params)
+            warm.append((time.perf_counter() - start) * 1000)
+        results.append({
+            "query": name,
+            "pages": pages_of.get(name, []),
+            "cold_ms": statistics.median(cold),
+            "warm_ms": statistics.median(warm),
+            "rows": len(df),
+            "bytes": frame_nbytes(df),
+        })
+    connection.close()
+    return results
+
+
+def bench_pages(repeat: int) -> list[dict]:
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    for path in [os.path.join(ROOT, "app.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+        runs, exceptions = [], []
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            app = AppTest.from_file(path, default_timeout=600).run()
+            runs.append((time.perf_counter() - start) * 1000)
+            exceptions += [exception.value for exception in app.exception]
+        results.append({
+            "page": os.path.relpath(path, ROOT),
+            "first_run_ms": runs[0],
+            "rerun_ms": statistics.median(runs[1:]),
+            "exceptions": exceptions[:3],
+            "rss_mb_after": current_rss_mb(),
+        })
+    return results
+
+
+def run_worker(repeat: int):
+    from model.modeling import bootstrap_models
+
+    # The deploy step: the pages only load published models
+    bootstrap_models()
+    report = {"queries": bench_queries(repeat), "pages": bench_pages(repeat)}
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(report))
+
+
+def run_scale(scale: str, db_path: str, repeat: int, work_dir: str) -> dict:
+    """Runs the worker for one scale in a fresh process and returns its report."""
+    os.makedirs(work_dir, exist_ok=True)
+    env = dict(os.environ, DASHBOARD_DB_SQLITE_PATH=db_path, DASHBOARD_BACKEND="sqlite", PYTHONPATH=ROOT)
+    # The worker's cwd is scratch space: the models it publishes land in work_dir/model/artifacts
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(repeat)],
+        cwd=work_dir, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{scale} worker failed:\n{completed.stderr[-4000:]}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report.update({"scale": scale, "database": db_path, "database_mb": os.path.getsize(db_path) / 1024 / 1024})
+    return report
+
+
+# --- Results and comparison ---
+
+def flatten(result: dict) -> dict[str, float]:
+    """Metric name -> value for every compared metric in a stored result."""
+    metrics = {}
+    for scale in result["scales"]:
+        prefix = scale["scale"]
+        metrics[f"{prefix}:peak_rss_mb"] = scale["peak_rss_mb"]
+        for query in scale["queries"]:
+            for key in ("cold_ms", "warm_ms"):
+                metrics[f"{prefix}:query:{query['query']}:{key}"] = query[key]
+        for page in scale["pages"]:
+            for key in ("first_run_ms", "rerun_ms"):
+                metrics[f"{prefix}:page:{page['page']}:{key}"] = page[key]
+    return metrics
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Metrics that regressed by more than `threshold` (relative) and the metric's noise floor."""
+    regressions = []
+    before = flatten(baseline)
+    for name, value in flatten(current).items():
+        if name not in before:
+            continue
+        old = before[name]
+        floor = COMPARED_METRICS[name.rsplit(":", 1)[1]]
+        if value > old * (1 + threshold) and value - old > floor:
+            regressions.append(f"{name}: {old:,.1f} -> {value:,.1f} (+{(value / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def latest_result(exclude: str | None = None) -> str | None:
+    files = sorted(path for path in glob.glob(os.path.join(RESULTS_DIR, "*.json")) if path != exclude)
+    return files[-1] if files else None
+
+
+def print_report(result: dict):
+    for scale in result["scales"]:
+        print(f"\n== {scale['scale']} ({scale['database_mb']:.1f} MB, peak RSS {scale['peak_rss_mb']:.0f} MB)")
+        print(f"{'query':<40} {'cold ms':>9} {'warm ms':>9} {'rows':>10} {'KB':>9}")
+        for query in scale["queries"]:
+            print(f"{query['query']:<40} {query['cold_ms']:>9.2f} {query['warm_ms']:>9.2f} "
+                  f"{query['rows']:>10,} {query['bytes'] / 1024:>9.1f}")
+        print(f"{'page':<40} {'first ms':>9} {'rerun ms':>9} {'RSS MB':>10} exceptions")
+        for page in scale["pages"]:
+            print(f"{page['page']:<40} {page['first_run_ms']:>9.0f} {page['rerun_ms']:>9.0f} "
+                  f"{page['rss_mb_after']:>10.0f} {page['exceptions'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["sample", "100k"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per query / page")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "benchmarks", ".data"), help="generated databases")
+    parser.add_argument("--baseline", help="result file to compare with (default: the previous run)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="do not store this run in benchmarks/results")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.repeat)
+        return
+
+    result = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "repeat": args.repeat,
+        "scales": [],
+    }
+    for scale in args.scales:
+        print(f"[{scale}]")
+        db_path = prepare_database(scale, args.data_dir)
+        result["scales"].append(run_scale(scale, db_path, args.repeat, os.path.join(args.data_dir, f"work_{scale}")))
+    print_report(result)
+
+    baseline_path = args.baseline or latest_result()
+    path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{result['commit']}.json")
+        with open(path, "w") as out:
+            json.dump(result, out, indent=2)
+        print(f"\nSaved {path}")
+
+    if baseline_path and baseline_path != path:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(result, baseline, args.threshold)
+        print(f"\nCompared with {os.path.basename(baseline_path)} (commit {baseline.get('commit')}): "
+              f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
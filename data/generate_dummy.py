@@ -1,51 +1,408 @@
-import pandas as pd
+"""Synthetic data generators for development and load testing.
+
+`classicmodels` generates a database shaped like data/classicmodels.sqlite
+(productlines, products, customers, orders, orderdetails, payments) at any
+scale, so the dashboard can be benchmarked at production-like volumes. Every
+column is drawn with NumPy over whole chunks of orders; chunks are seeded
+independently (reproducible for a given --seed regardless of --workers), can be
+generated across processes, and at most `2 x workers` chunks are in memory at
+once. Output goes straight to a SQLite file or to a directory of Parquet files
+(one folder per table, one part file per chunk; needs pyarrow).
+
+`flat` writes the original single-table demo CSV (data/dataset.csv).
+
+Usage:
+    python data/generate_dummy.py classicmodels --orderdetails 10000000 --out /tmp/big.sqlite --workers 4
+    python data/generate_dummy.py classicmodels --orderdetails 100000000 --format parquet --out /tmp/big_parquet
+    python data/generate_dummy.py flat --rows 2000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
 import numpy as np
-from datetime import datetime, timedelta
-import random
+import pandas as pd
 
-def generate_dummy_data(n_rows=2000, seed=42):
-    # Set seed for reproducibility
-    np.random.seed(seed)
-    random.seed(seed)
+
+def generate_dummy_data(n_rows=2000, seed=42, path='data/dataset.csv'):
+    rng = np.random.default_rng(seed)
 
     # Define feature ranges and categories
-    customer_ids = range(1, n_rows + 1)
-    ages = np.random.randint(18, 81, size=n_rows)
-    incomes = np.random.normal(60_000, 20_000, size=n_rows).round(2)
-    regions = random.choices(['North', 'South', 'East', 'West'], k=n_rows)
-    product_categories = random.choices(['Electronics', 'Clothing', 'Books'], k=n_rows)
-    start_date = datetime(2024, 1, 1)
-    purchase_dates = [start_date + timedelta(days=random.randint(0, 365)) for _ in range(n_rows)]
-    quantities = np.random.randint(1, 11, size=n_rows)
-    unit_prices = np.random.uniform(10, 500, size=n_rows).round(2)
+    customer_ids = np.arange(1, n_rows + 1)
+    ages = rng.integers(18, 81, size=n_rows)
+    incomes = rng.normal(60_000, 20_000, size=n_rows).round(2)
+    regions = rng.choice(['North', 'South', 'East', 'West'], size=n_rows)
+    product_categories = rng.choice(['Electronics', 'Clothing', 'Books'], size=n_rows)
+    purchase_dates = np.datetime64('2024-01-01') + rng.integers(0, 366, size=n_rows).astype('timedelta64[D]')
+    quantities = rng.integers(1, 11, size=n_rows)
+    unit_prices = rng.uniform(10, 500, size=n_rows).round(2)
 
     # Introduce ~20% missing values in income
-    missing_mask = np.random.choice([True, False], size=n_rows, p=[0.2, 0.8])
+    missing_mask = rng.random(n_rows) < 0.2
     incomes = np.where(missing_mask, np.nan, incomes)
 
     # Calculate total_sales with noise
-    discount_factor = np.random.uniform(0.8, 1.0, size=n_rows)  # Random discount 0-20%
-    total_sales = (quantities * unit_prices * discount_factor + np.random.normal(0, 50, n_rows)).round(2)
+    discount_factor = rng.uniform(0.8, 1.0, size=n_rows)  # Random discount 0-20%
+    total_sales = (quantities * unit_prices * discount_factor + rng.normal(0, 50, n_rows)).round(2)
 
     # Create DataFrame
-    data = {
+    df = pd.DataFrame({
         'customer_id': customer_ids,
         'age': ages,
         'income': incomes,
         'region': regions,
         'product_category': product_categories,
-        'purchase_date': purchase_dates,
+        'purchase_date': pd.to_datetime(purchase_dates),
         'quantity': quantities,
         'unit_price': unit_prices,
         'total_sales': total_sales
-    }
-    df = pd.DataFrame(data)
+    })
 
     # Save to CSV
-    df.to_csv('data/dataset.csv', index=False)
+    df.to_csv(path, index=False)
     return df
 
+
+# --- classicmodels-shaped generator ---
+
+PRODUCT_LINES = ['Classic Cars', 'Motorcycles', 'Planes', 'Ships', 'Trains', 'Trucks and Buses', 'Vintage Cars']
+PRODUCT_LINE_WEIGHTS = [0.38, 0.12, 0.11, 0.08, 0.03, 0.10, 0.18]
+PRODUCT_SCALES = ['1:10', '1:12', '1:18', '1:24', '1:32', '1:50', '1:72', '1:700']
+
+# Customer countries roughly in the proportions of the sample database
+COUNTRIES = ['USA', 'Germany', 'France', 'Spain', 'Australia', 'UK', 'Italy', 'New Zealand',
+             'Switzerland', 'Singapore', 'Finland', 'Japan', 'Canada', 'Norway', 'Denmark', 'Sweden']
+COUNTRY_WEIGHTS = np.array([36, 13, 12, 7, 5, 5, 4, 4, 3, 3, 3, 2, 3, 3, 2, 2], dtype=np.float64)
+
+ORDER_STATUSES = ['Shipped', 'Resolved', 'Cancelled', 'On Hold', 'Disputed', 'In Process']
+ORDER_STATUS_WEIGHTS = [0.93, 0.015, 0.02, 0.012, 0.008, 0.015]
+
+# Lines per order are uniform on [1, MAX_LINES_PER_ORDER], like the sample data (mean ~9)
+MAX_LINES_PER_ORDER = 18
+FIRST_ORDER_NUMBER = 10100
+FIRST_CUSTOMER_NUMBER = 103
+
+# Column layout and types of data/classicmodels.sqlite
+SCHEMA = {
+    'productlines': {'productLine': 'TEXT', 'textDescription': 'TEXT', 'htmlDescription': 'TEXT', 'image': 'TEXT'},
+    'products': {
+        'productCode': 'TEXT', 'productName': 'TEXT', 'productLine': 'TEXT', 'productScale': 'TEXT',
+        'productVendor': 'TEXT', 'productDescription': 'TEXT', 'quantityInStock': 'BIGINT',
+        'buyPrice': 'FLOAT', 'MSRP': 'FLOAT',
+    },
+    'customers': {
+        'customerNumber': 'BIGINT', 'customerName': 'TEXT', 'contactLastName': 'TEXT', 'contactFirstName': 'TEXT',
+        'phone': 'TEXT', 'addressLine1': 'TEXT', 'addressLine2': 'TEXT', 'city': 'TEXT', 'state': 'TEXT',
+        'postalCode': 'TEXT', 'country': 'TEXT', 'salesRepEmployeeNumber': 'FLOAT', 'creditLimit': 'FLOAT',
+    },
+    'orders': {
+        'orderNumber': 'BIGINT', 'orderDate': 'DATE', 'requiredDate': 'DATE', 'shippedDate': 'DATE',
+        'status': 'TEXT', 'comments': 'TEXT', 'customerNumber': 'BIGINT',
+    },
+    'orderdetails': {
+        'orderNumber': 'BIGINT', 'productCode': 'TEXT', 'quantityOrdered': 'BIGINT',
+        'priceEach': 'FLOAT', 'orderLineNumber': 'BIGINT',
+    },
+    'payments': {'customerNumber': 'BIGINT', 'checkNumber': 'TEXT', 'paymentDate': 'DATE', 'amount': 'FLOAT'},
+}
+
+RANDOM_STREAMS = tuple(SCHEMA) + ('customer_weights',)
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Scale and shape of a generated classicmodels database."""
+    orderdetails: int = 3_000
+    products: int = 110
+    customers: int | None = None  # default: one per ~25 order lines, like the sample data
+    start_date: str = '2003-01-01'
+    end_date: str = '2005-05-31'
+    chunk_orders: int = 100_000
+    seed: int = 42
+
+    @property
+    def n_orders(self) -> int:
+        return max(1, round(self.orderdetails / ((1 + MAX_LINES_PER_ORDER) / 2)))
+
+    @property
+    def n_customers(self) -> int:
+        return self.customers or max(10, self.orderdetails // 25)
+
+
+def _rng(config: GeneratorConfig, table: str, chunk: int) -> np.random.Generator:
+    """Independent stream per (table, chunk), so results do not depend on the worker layout."""
+    return np.random.default_rng([config.seed, RANDOM_STREAMS.index(table), chunk])
+
+
+def _dates(days: np.ndarray) -> np.ndarray:
+    """Day offsets from the epoch -> 'YYYY-MM-DD' strings (the format the database stores)."""
+    return np.datetime_as_string(days.astype('datetime64[D]'), unit='D')
+
+
+def _labels(prefix: str, numbers: np.ndarray) -> np.ndarray:
+    return np.char.add(prefix, numbers.astype(str))
+
+
+def make_productlines() -> pd.DataFrame:
+    return pd.DataFrame({
+        'productLine': PRODUCT_LINES,
+        'textDescription': [f"Scale models: {line}." for line in PRODUCT_LINES],
+        'htmlDescription': None,
+        'image': None,
+    })
+
+
+def make_products(config: GeneratorConfig) -> pd.DataFrame:
+    """The product catalogue; regenerated identically in every worker (it is small)."""
+    rng = _rng(config, 'products', 0)
+    n = config.products
+    scale_index = rng.integers(0, len(PRODUCT_SCALES), n)
+    codes = np.char.add(np.char.add('S', np.char.replace(np.array(PRODUCT_SCALES)[scale_index], '1:', '')), '_')
+    buy_price = rng.uniform(15, 105, n).round(2)
+    return pd.DataFrame({
+        'productCode': np.char.add(codes, np.char.zfill(np.arange(1, n + 1).astype(str), 4)),
+        'productName': _labels('Model ', np.arange(1, n + 1)),
+        'productLine': rng.choice(PRODUCT_LINES, n, p=PRODUCT_LINE_WEIGHTS),
+        'productScale': np.array(PRODUCT_SCALES)[scale_index],
+        'productVendor': _labels('Vendor ', rng.integers(1, 14, n)),
+        'productDescription': None,
+        'quantityInStock': rng.integers(0, 10_000, n),
+        'buyPrice': buy_price,
+        'MSRP': (buy_price * rng.uniform(1.6, 2.2, n)).round(2),
+    })
+
+
+def make_customers(config: GeneratorConfig, chunk: int, start: int, stop: int) -> pd.DataFrame:
+    rng = _rng(config, 'customers', chunk)
+    n = stop - start
+    numbers = FIRST_CUSTOMER_NUMBER + np.arange(start, stop)
+    # ~20% of customers have no credit line, like the sample data
+    credit = np.where(rng.random(n) < 0.2, 0.0, (rng.uniform(20_000, 150_000, n) // 100) * 100)
+    return pd.DataFrame({
+        'customerNumber': numbers,
+        'customerName': _labels('Customer ', numbers),
+        'contactLastName': _labels('Contact ', numbers),
+        'contactFirstName': None,
+        'phone': _labels('+1 555 ', rng.integers(1_000_000, 9_999_999, n)),
+        'addressLine1': _labels('Street ', rng.integers(1, 999, n)),
+        'addressLine2': None,
+        'city': _labels('City ', rng.integers(1, 500, n)),
+        'state': None,
+        'postalCode': rng.integers(10_000, 99_999, n).astype(str),
+        'country': rng.choice(COUNTRIES, n, p=COUNTRY_WEIGHTS / COUNTRY_WEIGHTS.sum()),
+        'salesRepEmployeeNumber': rng.integers(1165, 1703, n).astype(np.float64),
+        'creditLimit': credit,
+    })
+
+
+def _customer_cdf(config: GeneratorConfig) -> np.ndarray:
+    """Cumulative order share per customer: a few customers place many orders (lognormal weights)."""
+    weights = _rng(config, 'customer_weights', 0).lognormal(0.0, 1.0, config.n_customers)
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def make_orders(config: GeneratorConfig, chunk: int, start: int, stop: int, products: pd.DataFrame,
+                customer_cdf: np.ndarray) -> dict[str, pd.DataFrame]:
+    """Orders start..stop-1 with their order lines and payments."""
+    rng = _rng(config, 'orders', chunk)
+    n = stop - start
+    order_numbers = FIRST_ORDER_NUMBER + np.arange(start, stop)
+
+    # Order dates rise with orderNumber (as in the source system), so watermarks work on both
+    first_day = np.datetime64(config.start_date, 'D').astype(np.int64)
+    span = np.datetime64(config.end_date, 'D').astype(np.int64) - first_day
+    order_day = first_day + (np.arange(start, stop) * span) // config.n_orders
+    status = rng.choice(ORDER_STATUSES, n, p=ORDER_STATUS_WEIGHTS)
+    shipped = np.isin(status, ['Shipped', 'Resolved', 'Disputed'])
+    shipped_day = order_day + rng.integers(1, 7, n)
+    customers = np.searchsorted(customer_cdf, rng.random(n)) + FIRST_CUSTOMER_NUMBER
+
+    orders = pd.DataFrame({
+        'orderNumber': order_numbers,
+        'orderDate': _dates(order_day),
+        'requiredDate': _dates(order_day + rng.integers(7, 11, n)),
+        'shippedDate': np.where(shipped, _dates(shipped_day), None),
+        'status': status,
+        'comments': None,
+        'customerNumber': customers,
+    })
+
+    # Order lines: distinct products per order by stepping through the catalogue with a stride
+    # coprime to its size from a random offset
+    n_products = len(products)
+    lines = rng.integers(1, min(MAX_LINES_PER_ORDER, n_products) + 1, n)
+    order_index = np.repeat(np.arange(n), lines)
+    line_number = np.arange(len(order_index)) - np.repeat(np.cumsum(lines) - lines, lines)
+    strides = np.array([s for s in range(1, n_products + 1) if np.gcd(s, n_products) == 1])
+    offset, stride = rng.integers(0, n_products, n), rng.choice(strides, n)
+    product_index = (offset[order_index] + line_number * stride[order_index]) % n_products
+    quantity = rng.integers(6, 98, len(order_index))
+    price = (products['MSRP'].to_numpy()[product_index] * rng.uniform(0.8, 1.0, len(order_index))).round(2)
+    orderdetails = pd.DataFrame({
+        'orderNumber': order_numbers[order_index],
+        'productCode': products['productCode'].to_numpy()[product_index],
+        'quantityOrdered': quantity,
+        'priceEach': price,
+        'orderLineNumber': line_number + 1,
+    })
+
+    # One payment per shipped order (most of them), a few weeks after shipping
+    order_total = np.bincount(order_index, weights=quantity * price, minlength=n).round(2)
+    paid = shipped & (rng.random(n) < 0.9)
+    payments = pd.DataFrame({
+        'customerNumber': customers[paid],
+        'checkNumber': _labels('CK', order_numbers[paid]),
+        'paymentDate': _dates(shipped_day[paid] + rng.integers(0, 45, paid.sum())),
+        'amount': order_total[paid],
+    })
+    return {'orders': orders, 'orderdetails': orderdetails, 'payments': payments}
+
+
+def _chunks(total: int, size: int):
+    for chunk, start in enumerate(range(0, total, size)):
+        yield chunk, start, min(start + size, total)
+
+
+def generate_chunk(config: GeneratorConfig, kind: str, chunk: int, start: int, stop: int,
+                   parquet_dir: str | None = None) -> dict[str, pd.DataFrame] | dict[str, int]:
+    """Generates one chunk (runs in a worker). With `parquet_dir` the worker writes its own
+    part files and returns only row counts, so no data crosses process boundaries."""
+    if kind == 'customers':
+        frames = {'customers': make_customers(config, chunk, start, stop)}
+    else:
+        frames = make_orders(config, chunk, start, stop, make_products(config), _customer_cdf(config))
+    if parquet_dir is None:
+        return frames
+    for table, frame in frames.items():
+        frame.to_parquet(os.path.join(parquet_dir, table, f'part-{kind}-{chunk:05d}.parquet'), index=False)
+    return {table: len(frame) for table, frame in frames.items()}
+
+
+class SQLiteSink:
+    """Appends frames to a new SQLite file in large transactions."""
+
+    def __init__(self, path: str):
+        if os.path.exists(path):
+            raise FileExistsError(f"{path} already exists; refusing to append generated data to it.")
+        self.connection = sqlite3.connect(path)
+        # A fresh scratch file: no rollback journal or fsyncs needed while loading
+        self.connection.execute('PRAGMA journal_mode = OFF;')
+        self.connection.execute('PRAGMA synchronous = OFF;')
+        for table, columns in SCHEMA.items():
+            column_sql = ', '.join(f'"{name}" {kind}' for name, kind in columns.items())
+            self.connection.execute(f'CREATE TABLE {table} ({column_sql});')
+
+    def write(self, table: str, frame: pd.DataFrame) -> int:
+        placeholders = ', '.join('?' * len(frame.columns))
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT INTO {table} VALUES ({placeholders});', frame.itertuples(index=False, name=None)
+            )
+        return len(frame)
+
+    def close(self):
+        self.connection.close()
+
+
+class ParquetSink:
+    """Writes each table as a directory of Parquet part files."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+        self.path = path
+        for table in SCHEMA:
+            os.makedirs(os.path.join(path, table), exist_ok=False)
+
+    def write(self, table: str, frame: pd.DataFrame) -> int:
+        frame.to_parquet(os.path.join(self.path, table, 'part-00000.parquet'), index=False)
+        return len(frame)
+
+    def close(self):
+        pass
+
+
+def generate_classicmodels(config: GeneratorConfig, out: str, fmt: str = 'sqlite', workers: int = 1) -> dict[str, int]:
+    """Generates the whole database into `out` and returns rows written per table."""
+    sink = SQLiteSink(out) if fmt == 'sqlite' else ParquetSink(out)
+    parquet_dir = out if fmt == 'parquet' else None
+    counts = {table: 0 for table in SCHEMA}
+    counts['productlines'] += sink.write('productlines', make_productlines())
+    counts['products'] += sink.write('products', make_products(config))
+
+    tasks = [('customers', *bounds) for bounds in _chunks(config.n_customers, config.chunk_orders)]
+    tasks += [('orders', *bounds) for bounds in _chunks(config.n_orders, config.chunk_orders)]
+
+    def collect(result):
+        for table, value in result.items():
+            counts[table] += value if parquet_dir else sink.write(table, value)
+
+    if workers <= 1:
+        for task in tasks:
+            collect(generate_chunk(config, *task, parquet_dir=parquet_dir))
+    else:
+        # Keep at most 2 x workers chunks in flight so memory stays bounded at any scale
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(generate_chunk, config, *task, parquet_dir=parquet_dir))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+    sink.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+
+    flat = commands.add_parser('flat', help='single-table demo CSV')
+    flat.add_argument('--rows', type=int, default=2000)
+    flat.add_argument('--seed', type=int, default=42)
+    flat.add_argument('--out', default='data/dataset.csv')
+
+    full = commands.add_parser('classicmodels', help='classicmodels-shaped database')
+    full.add_argument('--orderdetails', type=int, default=GeneratorConfig.orderdetails, help='approximate order lines')
+    full.add_argument('--products', type=int, default=GeneratorConfig.products)
+    full.add_argument('--customers', type=int, default=None, help='default: orderdetails / 25')
+    full.add_argument('--start-date', default=GeneratorConfig.start_date)
+    full.add_argument('--end-date', default=GeneratorConfig.end_date)
+    full.add_argument('--chunk-orders', type=int, default=GeneratorConfig.chunk_orders, help='orders (or customers) per chunk')
+    full.add_argument('--seed', type=int, default=GeneratorConfig.seed)
+    full.add_argument('--format', choices=['sqlite', 'parquet'], default='sqlite')
+    full.add_argument('--out', required=True, help='new SQLite file, or directory for Parquet')
+    full.add_argument('--workers', type=int, default=1, help='generator processes')
+    # No subcommand: the original behaviour (demo CSV)
+    parser.set_defaults(command='flat', rows=2000, seed=42, out='data/dataset.csv')
+    args = parser.parse_args()
+
+    if args.command == 'classicmodels':
+        config = GeneratorConfig(
+            orderdetails=args.orderdetails, products=args.products, customers=args.customers,
+            start_date=args.start_date, end_date=args.end_date, chunk_orders=args.chunk_orders, seed=args.seed,
+        )
+        start = time.perf_counter()
+        counts = generate_classicmodels(config, args.out, args.format, args.workers)
+        elapsed = time.perf_counter() - start
+        for table, rows in counts.items():
+            print(f"{table:<14} {rows:>13,}")
+        total = sum(counts.values())
+        print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s) -> {args.out}")
+    else:
+        df = generate_dummy_data(args.rows, args.seed, args.out)
+        print(f"Dataset generated with {len(df)} rows. Saved to '{args.out}'.")
+        print(df.head())
+
+
 if __name__ == "__main__":
-    df = generate_dummy_data()
-    print(f"Dataset generated with {len(df)} rows. Saved to 'data/dataset.csv'.")
-    print(df.head())
\ No newline at end of file
+    main()
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.db_connector import run_query
+
+# Numeric features fed to the churn model, in column order (product-line shares are appended)
+BASE_FEATURES = [
+    "recency_days",
+    "frequency",
+    "monetary",
+    "avg_order_value",
+    "tenure_days",
+    "creditLimit",
+    "product_line_loyalty",
+    "product_line_breadth",
+]
+
+# Recency assigned to customers who never ordered before the reference date
+NO_ORDER_RECENCY_DAYS = 3650
+
+
+def order_date_range() -> tuple[pd.Timestamp, pd.Timestamp]:
+    """Returns the first and last order dates in the database."""
+    df = run_query("order_date_range")
+    return pd.Timestamp(df.iloc[0]["first_order_date"]), pd.Timestamp(df.iloc[0]["last_order_date"])
+
+
+def product_line_matrix(customer_ids: np.ndarray, line_qty: pd.DataFrame) -> tuple[np.ndarray, list[str]]:
+    """Pivots (customer, productLine, quantity) rows into a customers x lines quantity matrix.
+
+    Rows follow `customer_ids`; built with a single scatter-add, no per-customer loop.
+    """
+    lines = sorted(line_qty["productLine"].unique()) if not line_qty.empty else []
+    matrix = np.zeros((len(customer_ids), len(lines)), dtype=np.float64)
+    if lines:
+        row_index = pd.Index(customer_ids).get_indexer(line_qty["customerNumber"])
+        col_index = pd.Index(lines).get_indexer(line_qty["productLine"])
+        known = row_index >= 0
+        np.add.at(matrix, (row_index[known], col_index[known]), line_qty["quantity"].to_numpy(dtype=np.float64)[known])
+    return matrix, lines
+
+
+def compute_customer_features(rfm: pd.DataFrame, line_qty: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """Turns the raw per-customer aggregates into model features, vectorized over all customers.
+
+    Returns one row per customer indexed by customerNumber with the RFM features,
+    product-line loyalty (share of the top line) and breadth, plus one
+    `share_<productLine>` column per product line.
+    """
+    customer_ids = rfm["customerNumber"].to_numpy()
+    first_order = pd.to_datetime(rfm["first_order_date"])
+    last_order = pd.to_datetime(rfm["last_order_date"])
+    frequency = rfm["frequency"].to_numpy(dtype=np.float64)
+    monetary = rfm["monetary"].to_numpy(dtype=np.float64)
+
+    features = pd.DataFrame(index=pd.Index(customer_ids, name="customerNumber"))
+    features["recency_days"] = (as_of - last_order).dt.days.fillna(NO_ORDER_RECENCY_DAYS).to_numpy()
+    features["frequency"] = frequency
+    features["monetary"] = monetary
+    features["avg_order_value"] = np.divide(monetary, frequency, out=np.zeros_like(monetary), where=frequency > 0)
+    features["tenure_days"] = (as_of - first_order).dt.days.fillna(0).to_numpy()
+    features["creditLimit"] = rfm["creditLimit"].fillna(0).to_numpy(dtype=np.float64)
+
+    matrix, lines = product_line_matrix(customer_ids, line_qty)
+    totals = matrix.sum(axis=1, keepdims=True)
+    shares = np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+    features["product_line_loyalty"] = shares.max(axis=1) if lines else 0.0
+    features["product_line_breadth"] = (matrix > 0).sum(axis=1) if lines else 0
+    for position, line in enumerate(lines):
+        features[f"share_{line}"] = shares[:, position]
+    return features
+
+
+def build_customer_features(as_of: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Computes features for every customer from the order history up to `as_of` (default: last order)."""
+    if as_of is None:
+        _, as_of = order_date_range()
+    as_of_param = as_of.strftime("%Y-%m-%d")
+    rfm = run_query("features_customer_rfm", as_of=as_of_param)
+    line_qty = run_query("features_customer_product_lines", as_of=as_of_param)
+    return compute_customer_features(rfm, line_qty, as_of)
+
+
+def build_churn_labels(customer_ids, cutoff: pd.Timestamp, horizon_days: int = 365) -> pd.Series:
+    """Labels each customer 1 if they placed no order in the `horizon_days` after `cutoff`."""
+    active = run_query(
+        "customers_ordering_between",
+        start_date=cutoff.strftime("%Y-%m-%d"),
+        end_date=(cutoff + pd.Timedelta(days=horizon_days)).strftime("%Y-%m-%d"),
+    )
+    ordered_again = pd.Index(customer_ids).isin(active["customerNumber"])
+    return pd.Series((~ordered_again).astype(int), index=pd.Index(customer_ids, name="customerNumber"), name="churned")
@@ -0,0 +1,264 @@
+"""Rolling-window activity aggregates for churn monitoring.
+
+Maintains, inside the SQLite database, each customer's orders, order value
+(spend) and payments over the last 30 / 90 / 365 days, counted back from the
+reference day (the latest order date, as for the churn model features):
+
+    churn_daily_activity   orders / spend / paid per (customer, day)
+    churn_windows          one row per customer: <metric>_<days> window totals
+
+Refreshes are incremental and never rescan the full history. New orders
+(orderNumber above the watermark) and payments (rowid above the watermark)
+are folded into the daily table and into the windows they fall in. When the
+reference day moves forward, each window adds the days that entered it and
+subtracts the days that left it (a range scan on the day index). Use --full to
+rebuild from scratch, e.g. after historical rows were edited or deleted.
+
+pages/02_ml_churn.py reads one customer's window row and the daily rows of
+its last year (primary-key lookups) and derives an activity-trend risk from
+them; without the tables, or while they are behind the orders / payments
+tables, it falls back to live per-customer queries.
+
+Usage:
+    python -m model.churn_windows            # incremental refresh (builds on first run)
+    python -m model.churn_windows --full     # full rebuild
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.materialize import DEFAULT_DATABASE_PATH, get_watermark, set_watermark
+
+WINDOWS = (30, 90, 365)
+METRICS = ("orders", "spend", "paid")
+WINDOW_COLUMNS = [f"{metric}_{days}" for days in WINDOWS for metric in METRICS]
+WINDOW_TABLES = ("churn_daily_activity", "churn_windows")
+
+# Share of the activity-trend risk driven by the 90-day and the 30-day pace
+TREND_WEIGHTS = {90: 0.7, 30: 0.3}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS summary_watermarks (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    refreshed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS churn_daily_activity (
+    customerNumber INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    orders INTEGER NOT NULL,
+    spend REAL NOT NULL,
+    paid REAL NOT NULL,
+    PRIMARY KEY (customerNumber, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_churn_daily_activity_day ON churn_daily_activity (day);
+CREATE TABLE IF NOT EXISTS churn_windows (
+    customerNumber INTEGER PRIMARY KEY,
+    {", ".join(f"{column} {'INTEGER' if column.startswith('orders') else 'REAL'} NOT NULL DEFAULT 0" for column in WINDOW_COLUMNS)}
+);
+"""
+
+# Orders and payments above the watermarks, per (customer, day)
+COLLECT_DELTA = """
+CREATE TEMP TABLE churn_delta AS
+SELECT customerNumber, day, SUM(orders) AS orders, SUM(spend) AS spend, SUM(paid) AS paid
+FROM (
+    SELECT
+        o.customerNumber,
+        date(o.orderDate) AS day,
+        COUNT(DISTINCT o.orderNumber) AS orders,
+        COALESCE(SUM(od.quantityOrdered * od.priceEach), 0) AS spend,
+        0 AS paid
+    FROM orders o
+    LEFT JOIN orderdetails od ON od.orderNumber = o.orderNumber
+    WHERE o.orderNumber > :order_watermark AND o.orderNumber <= :order_high
+    GROUP BY o.customerNumber, date(o.orderDate)
+    UNION ALL
+    SELECT customerNumber, date(paymentDate), 0, 0, SUM(amount)
+    FROM payments
+    WHERE rowid > :payment_watermark AND rowid <= :payment_high
+    GROUP BY customerNumber, date(paymentDate)
+)
+GROUP BY customerNumber, day;
+"""
+
+# (The WHERE clause is what lets SQLite parse INSERT ... SELECT ... ON CONFLICT.)
+FOLD_DAILY_ACTIVITY = """
+INSERT INTO churn_daily_activity (customerNumber, day, orders, spend, paid)
+SELECT customerNumber, day, orders, spend, paid FROM temp.churn_delta WHERE true
+ON CONFLICT (customerNumber, day) DO UPDATE SET
+    orders = orders + excluded.orders,
+    spend = spend + excluded.spend,
+    paid = paid + excluded.paid;
+"""
+
+ADD_NEW_CUSTOMERS = """
+INSERT OR IGNORE INTO churn_windows (customerNumber)
+SELECT customerNumber FROM customers WHERE customerNumber > :customer_watermark AND customerNumber <= :customer_high;
+"""
+
+# Delta rows inside a window of the current reference day
+DELTA_IN_WINDOW = """
+SELECT customerNumber, SUM(orders) AS orders, SUM(spend) AS spend, SUM(paid) AS paid
+FROM temp.churn_delta
+WHERE day > :window_start AND day <= :as_of
+GROUP BY customerNumber
+"""
+
+# Days entering a window (added) and leaving it (subtracted) as the reference day moves
+SLIDE_WINDOW = """
+SELECT
+    customerNumber,
+    SUM(CASE WHEN day > :enter_after THEN orders ELSE -orders END) AS orders,
+    SUM(CASE WHEN day > :enter_after THEN spend ELSE -spend END) AS spend,
+    SUM(CASE WHEN day > :enter_after THEN paid ELSE -paid END) AS paid
+FROM churn_daily_activity
+WHERE (day > :enter_after AND day <= :enter_through) OR (day > :exit_after AND day <= :exit_through)
+GROUP BY customerNumber
+"""
+
+
+def _add_to_window(days: int, source: str) -> str:
+    """UPDATE adding the per-customer rows of `source` to one window's columns."""
+    assignments = ", ".join(f"{metric}_{days} = {metric}_{days} + d.{metric}" for metric in METRICS)
+    return (
+        f"UPDATE churn_windows SET {assignments} FROM ({source}) AS d "
+        "WHERE churn_windows.customerNumber = d.customerNumber;"
+    )
+
+
+def _day(value: date, offset_days: int = 0) -> str:
+    return (value + timedelta(days=offset_days)).isoformat()
+
+
+def refresh_churn_windows(connection: sqlite3.Connection, full: bool = False) -> dict:
+    """Brings the daily activity and window tables up to date and returns what was processed.
+
+    Falls back to a full rebuild when the source tables shrank below a stored
+    watermark (data was replaced rather than appended).
+    """
+    start = time.perf_counter()
+    with connection:
+        connection.executescript(SCHEMA)
+        order_high = connection.execute("SELECT COALESCE(MAX(orderNumber), 0) FROM orders;").fetchone()[0]
+        payment_high = connection.execute("SELECT COALESCE(MAX(rowid), 0) FROM payments;").fetchone()[0]
+        customer_high = connection.execute("SELECT COALESCE(MAX(customerNumber), 0) FROM customers;").fetchone()[0]
+        order_watermark = get_watermark(connection, "churn_orderNumber")
+        payment_watermark = get_watermark(connection, "churn_payment_rowid")
+        customer_watermark = get_watermark(connection, "churn_customerNumber")
+        as_of_ordinal = get_watermark(connection, "churn_as_of")
+
+        if full or None in (order_watermark, payment_watermark, customer_watermark) \
+                or order_high < order_watermark or payment_high < payment_watermark \
+                or customer_high < customer_watermark:
+            full = True
+            for table in WINDOW_TABLES:
+                connection.execute(f"DELETE FROM {table};")
+            order_watermark = payment_watermark = customer_watermark = -1
+            as_of_ordinal = None
+        as_of = date.fromordinal(as_of_ordinal) if as_of_ordinal else None
+
+        connection.execute("DROP TABLE IF EXISTS temp.churn_delta;")
+        connection.execute(COLLECT_DELTA, {
+            "order_watermark": order_watermark, "order_high": order_high,
+            "payment_watermark": payment_watermark, "payment_high": payment_high,
+        })
+        delta_rows = connection.execute("SELECT COUNT(*) FROM temp.churn_delta;").fetchone()[0]
+        connection.execute(FOLD_DAILY_ACTIVITY)
+        connection.execute(ADD_NEW_CUSTOMERS, {"customer_watermark": customer_watermark, "customer_high": customer_high})
+
+        # 1. New rows dated inside the current windows
+        if as_of is not None:
+            for days in WINDOWS:
+                connection.execute(
+                    _add_to_window(days, DELTA_IN_WINDOW), {"window_start": _day(as_of, -days), "as_of": _day(as_of)}
+                )
+
+        # 2. Move the reference day forward to the latest order date
+        latest = connection.execute("SELECT MAX(day) FROM temp.churn_delta WHERE orders > 0;").fetchone()[0]
+        new_as_of = max(filter(None, (as_of, date.fromisoformat(latest) if latest else None)), default=None)
+        if new_as_of is not None and new_as_of != as_of:
+            for days in WINDOWS:
+                window_start = new_as_of - timedelta(days=days)
+                if as_of is None:
+                    # First build: the whole window enters, nothing leaves
+                    enter_after, exit_after, exit_through = window_start, None, None
+                else:
+                    enter_after = max(as_of, window_start)
+                    exit_after, exit_through = as_of - timedelta(days=days), min(as_of, window_start)
+                connection.execute(_add_to_window(days, SLIDE_WINDOW), {
+                    "enter_after": _day(enter_after), "enter_through": _day(new_as_of),
+                    "exit_after": _day(exit_after) if exit_after else "", "exit_through": _day(exit_through) if exit_through else "",
+                })
+            set_watermark(connection, "churn_as_of", new_as_of.toordinal())
+
+        connection.execute("DROP TABLE temp.churn_delta;")
+        set_watermark(connection, "churn_orderNumber", order_high)
+        set_watermark(connection, "churn_payment_rowid", payment_high)
+        set_watermark(connection, "churn_customerNumber", customer_high)
+
+    return {
+        "mode": "full" if full else "incremental",
+        "delta_rows": delta_rows,
+        "as_of": new_as_of.isoformat() if new_as_of else None,
+        "previous_as_of": as_of.isoformat() if as_of else None,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# --- Scoring from the windows ---
+
+def window_bounds(as_of: pd.Timestamp) -> dict:
+    """Query parameters for the live (fallback) window queries: [start_<days>, end) per window."""
+    end = as_of.normalize() + pd.Timedelta(days=1)
+    bounds = {f"start_{days}": (end - pd.Timedelta(days=days)).strftime("%Y-%m-%d") for days in WINDOWS}
+    bounds["end"] = end.strftime("%Y-%m-%d")
+    return bounds
+
+
+def activity_risk(windows: pd.DataFrame) -> np.ndarray:
+    """Activity-trend churn risk in [0, 1] from window totals, vectorized over rows.
+
+    Compares the recent order pace (last 90 and 30 days) with the customer's own
+    yearly pace: a customer ordering at or above their usual rate scores 0, one
+    with no orders in the last year scores 1.
+    """
+    yearly = windows["orders_365"].to_numpy(dtype=np.float64)
+    momentum = np.zeros_like(yearly)
+    for days, weight in TREND_WEIGHTS.items():
+        expected = yearly * days / 365
+        recent = windows[f"orders_{days}"].to_numpy(dtype=np.float64)
+        pace = np.divide(recent, expected, out=np.zeros_like(recent), where=expected > 0)
+        momentum += weight * np.minimum(pace, 1.0)
+    return np.where(yearly > 0, 1.0 - momentum, 1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DATABASE_PATH, help="SQLite database file")
+    parser.add_argument("--full", action="store_true", help="rebuild the window tables from scratch")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist")
+    connection = sqlite3.connect(args.db)
+    report = refresh_churn_windows(connection, full=args.full)
+    windows = pd.read_sql_query(f"SELECT {', '.join(WINDOW_COLUMNS)} FROM churn_windows;", connection)
+    connection.close()
+
+    risk = activity_risk(windows)
+    print(
+        f"{report['mode']} refresh: {report['delta_rows']:,} new (customer, day) rows, "
+        f"reference day {report['previous_as_of'] or '-'} -> {report['as_of']} in {report['seconds']:.2f}s"
+    )
+    print(f"{len(windows):,} customers: {int((risk >= 0.65).sum()):,} high / {int(((risk >= 0.35) & (risk < 0.65)).sum()):,} "
+          f"medium / {int((risk < 0.35).sum()):,} low activity-trend risk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""Model registry, churn model training and batch scoring.
+
+Artifacts are versioned under model/artifacts/<model>/<version>/ and a CURRENT
+file names the version the app serves. Publishing or promoting a version is an
+atomic file swap, so running servers pick it up on the next rerun (hot swap)
+without a restart.
+
+The app never trains: it serves published versions only. Run `bootstrap` as a
+deploy step (model/artifacts/ is not versioned), or the ML pages show how to.
+
+Usage:
+    python -m model.modeling bootstrap                  # train and publish every model without a current version
+    python -m model.modeling train-churn                # train, score every customer, publish a new version
+    python -m model.modeling score-churn                # re-score every customer with the current version
+    python -m model.modeling list churn                 # list versions (* = current)
+    python -m model.modeling promote churn <version>    # roll forward / back
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from feat_eng.feature_engineering import build_churn_labels, build_customer_features, order_date_range
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.path.join("model", "artifacts")
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+
+# Loading a model version slower than this is logged as a warning (cold-start budget)
+COLD_START_TARGET_SECONDS = 2.0
+
+CHURN_MODEL_NAME = "churn"
+CHURN_SCORES_FILE = "scores.csv"
+
+# Shown when a model has not been published yet (the app never trains in the serving process)
+BOOTSTRAP_HINT = "Build the models with `python -m model.modeling bootstrap`."
+
+# Churn = no order in the next 12 months
+CHURN_HORIZON_DAYS = 365
+
+
+# --- Model Registry ---
+
+def _rss_bytes() -> int | None:
+    """Current resident set size of this process (Linux), or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@dataclass
+class LoadedModel:
+    """A model version loaded into this process, with its load cost."""
+    name: str
+    version: str
+    bundle: dict
+    metadata: dict
+    path: str
+    load_seconds: float
+    file_bytes: int
+    rss_delta_bytes: int | None = None
+    loaded_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+
+class ModelRegistry:
+    """Versioned model artifacts on disk: <root>/<name>/<version>/{model.joblib, metadata.json, ...}."""
+
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+
+    def model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def version_dir(self, name: str, version: str) -> str:
+        return os.path.join(self.model_dir(name), version)
+
+    def versions(self, name: str) -> list[str]:
+        """Published versions, oldest first (version ids sort chronologically)."""
+        directory = self.model_dir(name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            entry for entry in os.listdir(directory)
+            if not entry.startswith(".") and os.path.isfile(os.path.join(directory, entry, MODEL_FILE))
+        )
+
+    def current_version(self, name: str) -> str | None:
+        """The version named in CURRENT, falling back to the newest published version."""
+        try:
+            with open(os.path.join(self.model_dir(name), CURRENT_FILE)) as current:
+                version = current.read().strip()
+            if version:
+                return version
+        except FileNotFoundError:
+            pass
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def promote(self, name: str, version: str):
+        """Points CURRENT at `version` with an atomic rename."""
+        if not os.path.isfile(os.path.join(self.version_dir(name, version), MODEL_FILE)):
+            raise FileNotFoundError(f"Model '{name}' has no version '{version}'.")
+        pointer = os.path.join(self.model_dir(name), CURRENT_FILE)
+        tmp_pointer = f"{pointer}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_pointer, "w") as tmp:
+            tmp.write(version)
+        os.replace(tmp_pointer, pointer)
+
+    def publish(self, name: str, bundle: dict, metadata: dict | None = None, frames: dict | None = None, promote: bool = True) -> str:
+        """Writes a new version (model + metadata + optional CSV frames) and optionally promotes it.
+
+        The version is assembled in a hidden temp directory and renamed into
+        place, so readers never see a half-written version. The model is saved
+        uncompressed so its NumPy arrays can be memory-mapped on load.
+        """
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        final_dir = self.version_dir(name, version)
+        tmp_dir = os.path.join(self.model_dir(name), f".{version}.tmp")
+        os.makedirs(tmp_dir)
+        # joblib / scikit-learn are imported on first use, keeping them off the app's startup path
+        import joblib
+
+        try:
+            joblib.dump(bundle, os.path.join(tmp_dir, MODEL_FILE))
+            for filename, frame in (frames or {}).items():
+                frame.to_csv(os.path.join(tmp_dir, filename), index=False)
+            with open(os.path.join(tmp_dir, METADATA_FILE), "w") as meta:
+                json.dump({"name": name, "version": version, **(metadata or {})}, meta, indent=2, default=str)
+            os.rename(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        if promote:
+            self.promote(name, version)
+        return version
+
+    def load(self, name: str, version: str | None = None, mmap_mode: str | None = "r") -> LoadedModel:
+        """Loads a version from disk (NumPy arrays memory-mapped read-only by default)."""
+        version = version or self.current_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No published versions of model '{name}' in {self.root}.")
+        directory = self.version_dir(name, version)
+        path = os.path.join(directory, MODEL_FILE)
+        import joblib
+
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        bundle = joblib.load(path, mmap_mode=mmap_mode)
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        metadata_path = os.path.join(directory, METADATA_FILE)
+        metadata = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as meta:
+                metadata = json.load(meta)
+        return LoadedModel(
+            name=name,
+            version=version,
+            bundle=bundle,
+            metadata=metadata,
+            path=path,
+            load_seconds=load_seconds,
+            file_bytes=os.path.getsize(path),
+            rss_delta_bytes=None if rss_before is None or rss_after is None else rss_after - rss_before,
+        )
+
+
+_load_stats: list[dict] = []
+_load_stats_lock = threading.Lock()
+
+
+def get_model_load_stats() -> list[dict]:
+    """Load time / footprint of every model version loaded by this process."""
+    with _load_stats_lock:
+        return list(_load_stats)
+
+
+@st.cache_resource(max_entries=8)
+def _load_model_version(name: str, version: str) -> LoadedModel:
+    """Loads one model version once per process; shared by every session."""
+    loaded = ModelRegistry().load(name, version)
+    with _load_stats_lock:
+        _load_stats.append({
+            "name": name,
+            "version": version,
+            "load_seconds": loaded.load_seconds,
+            "file_bytes": loaded.file_bytes,
+            "rss_delta_bytes": loaded.rss_delta_bytes,
+            "loaded_at": loaded.loaded_at,
+        })
+    if loaded.load_seconds > COLD_START_TARGET_SECONDS:
+        logger.warning(
+            "Loading model %s@%s took %.2fs (target %.2fs).",
+            name, version, loaded.load_seconds, COLD_START_TARGET_SECONDS,
+        )
+    return loaded
+
+
+def get_model(name: str) -> LoadedModel:
+    """Returns the current version of a model, loading it at most once per process.
+
+    The CURRENT pointer is re-read on every call (one tiny file read), so a newly
+    promoted version is served from the next rerun on, without restarting the server.
+    """
+    version = ModelRegistry().current_version(name)
+    if version is None:
+        raise FileNotFoundError(f"No published versions of model '{name}'. {BOOTSTRAP_HINT}")
+    return _load_model_version(name, version)
+
+
+# --- Churn Model ---
+
+
+def train_churn_model(horizon_days: int = CHURN_HORIZON_DAYS) -> dict:
+    """Trains the churn classifier on a historical cutoff and returns the model bundle.
+
+    Features are computed as of `last order date - horizon_days` for customers
+    who had ordered by then; the label is whether they ordered again within the horizon.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    first_order, last_order = order_date_range()
+    cutoff = last_order - pd.Timedelta(days=horizon_days)
+    if cutoff <= first_order:
+        raise ValueError(f"Order history is shorter than the {horizon_days}-day churn horizon.")
+
+    features = build_customer_features(as_of=cutoff)
+    features = features[features["frequency"] > 0]
+    labels = build_churn_labels(features.index, cutoff, horizon_days)
+
+    # Trees do not extrapolate linearly, which matters because customers are scored a
+    # full horizon later than the training cutoff (more orders, longer tenure).
+    model = RandomForestClassifier(n_estimators=300, min_samples_leaf=3, class_weight="balanced", random_state=42)
+    feature_columns = list(features.columns)
+    X, y = features[feature_columns].to_numpy(), labels.to_numpy()
+
+    metrics = {"n_customers": int(len(y)), "churn_rate": float(y.mean())}
+    n_splits = min(5, int(np.bincount(y, minlength=2).min()))
+    if n_splits >= 2:
+        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        metrics["cv_roc_auc"] = float(cross_val_score(model, X, y, cv=cv, scoring="roc_auc").mean())
+    model.fit(X, y)
+
+    return {
+        "model": model,
+        "feature_columns": feature_columns,
+        "cutoff": cutoff.strftime("%Y-%m-%d"),
+        "horizon_days": horizon_days,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "metrics": metrics,
+    }
+
+
+def score_customers(bundle: dict, features: pd.DataFrame) -> pd.DataFrame:
+    """Scores every customer in one batch; returns customerNumber + churn_score.
+
+    Customers without any order have nothing to churn from and get a NaN score.
+    """
+    # Product lines unseen at training time are dropped, missing ones are zero shares
+    X = features.reindex(columns=bundle["feature_columns"], fill_value=0.0).to_numpy()
+    scores = bundle["model"].predict_proba(X)[:, 1]
+    scores = np.where(features["frequency"].to_numpy() > 0, scores, np.nan)
+    return pd.DataFrame({"customerNumber": features.index.to_numpy(), "churn_score": scores})
+
+
+def churn_scores_frame(bundle: dict) -> pd.DataFrame:
+    """Scores all customers as of the latest order, with the RFM values shown on the page."""
+    features = build_customer_features()
+    scores = score_customers(bundle, features)
+    return scores.join(features[["recency_days", "frequency", "monetary"]], on="customerNumber")
+
+
+def publish_churn_model(bundle: dict, registry: ModelRegistry | None = None) -> str:
+    """Scores every customer with `bundle` and publishes model + scores as a new current version."""
+    registry = registry or ModelRegistry()
+    metadata = {key: bundle[key] for key in ("cutoff", "horizon_days", "trained_at", "metrics")}
+    return registry.publish(CHURN_MODEL_NAME, bundle, metadata, frames={CHURN_SCORES_FILE: churn_scores_frame(bundle)})
+
+
+@st.cache_resource(max_entries=2)
+def _churn_scores_for_version(version: str) -> dict[int, dict]:
+    path = os.path.join(ModelRegistry().version_dir(CHURN_MODEL_NAME, version), CHURN_SCORES_FILE)
+    return pd.read_csv(path).set_index("customerNumber").to_dict(orient="index")
+
+
+def get_churn_scores() -> dict[int, dict]:
+    """Returns {customerNumber: {churn_score, recency_days, frequency, monetary}} for every customer.
+
+    Scores are precomputed per model version and loaded once per process, so the
+    page only does a dictionary lookup per selection; promoting a new version
+    swaps them on the next rerun.
+    """
+    version = ModelRegistry().current_version(CHURN_MODEL_NAME)
+    if version is None:
+        raise FileNotFoundError(f"No published versions of model '{CHURN_MODEL_NAME}'. {BOOTSTRAP_HINT}")
+    return _churn_scores_for_version(version)
+
+
+def bootstrap_models(registry: ModelRegistry | None = None) -> dict[str, str]:
+    """Trains and publishes every model that has no current version (deploy step); returns {name: version}."""
+    # Imported here: the recommender module builds on this one
+    from model.recommender import RECO_MODEL_NAME, build_recommender, publish_recommender
+
+    registry = registry or ModelRegistry()
+    published = {}
+    if registry.current_version(CHURN_MODEL_NAME) is None:
+        published[CHURN_MODEL_NAME] = publish_churn_model(train_churn_model(), registry)
+    if registry.current_version(RECO_MODEL_NAME) is None:
+        published[RECO_MODEL_NAME] = publish_recommender(build_recommender(), registry, mode="full")
+    return published
+
+
+def warm_models():
+    """Loads the published model versions and their scores into the process-wide caches."""
+    from model.recommender import RECO_MODEL_NAME
+
+    registry = ModelRegistry()
+    if registry.current_version(CHURN_MODEL_NAME) is not None:
+        get_churn_scores()
+        get_model(CHURN_MODEL_NAME)
+    if registry.current_version(RECO_MODEL_NAME) is not None:
+        get_model(RECO_MODEL_NAME)
+
+
+@st.cache_resource
+def start_background_warmup() -> threading.Thread:
+    """Starts warm_models() on a daemon thread once per process (first page view)."""
+    def _warm():
+        try:
+            warm_models()
+        except Exception:
+            # The ML pages load (and report errors) on demand if warming fails
+            logger.exception("Model warm-up failed.")
+
+    thread = threading.Thread(target=_warm, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["bootstrap", "train-churn", "score-churn", "list", "promote"])
+    parser.add_argument("name", nargs="?", default=CHURN_MODEL_NAME, help="model name (list / promote)")
+    parser.add_argument("version", nargs="?", help="version to promote")
+    args = parser.parse_args()
+    registry = ModelRegistry()
+
+    if args.command == "bootstrap":
+        published = bootstrap_models(registry)
+        for name, version in published.items():
+            print(f"Published {name} {version}")
+        if not published:
+            print("Every model already has a current version.")
+    elif args.command == "train-churn":
+        bundle = train_churn_model()
+        version = publish_churn_model(bundle, registry)
+        print(f"Published churn model {version} (cutoff {bundle['cutoff']}): {bundle['metrics']}")
+    elif args.command == "score-churn":
+        loaded = registry.load(CHURN_MODEL_NAME, mmap_mode=None)
+        version = publish_churn_model(loaded.bundle, registry)
+        print(f"Re-scored customers with {loaded.version}; published as {version}")
+    elif args.command == "list":
+        current = registry.current_version(args.name)
+        for version in registry.versions(args.name):
+            print(f"{'*' if version == current else ' '} {version}")
+    else:
+        if not args.version:
+            parser.error("promote needs a version")
+        registry.promote(args.name, args.version)
+        print(f"{args.name} -> {args.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Item-based collaborative-filtering recommender for the product recommendation page.
+
+Purchases are kept as a sparse customer x product quantity matrix built from
+orderdetails. Products are compared by cosine similarity of their (log-scaled)
+purchase columns, and the top-K most similar products of every product are
+precomputed. A customer's score for a product is the similarity-weighted sum of
+what they already bought; recommendations for every customer are produced in one
+sparse matrix product and stored, so serving a customer is an O(K) row read.
+
+New orders are folded in incrementally: only the similarities involving the
+products those orders touched are recomputed, and only customers whose
+neighbourhoods changed are re-scored. Run a full build from time to time to
+drop the small drift this introduces (see ItemKNNRecommender.update).
+
+Usage:
+    python -m model.recommender build     # full build, publish a new version
+    python -m model.recommender update    # fold in orders above the stored watermark
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from model.modeling import ModelRegistry, get_model
+from utils.db_connector import run_query
+
+RECO_MODEL_NAME = "recommender"
+
+# Neighbours kept per product; extra candidates are stored so an incremental update
+# that pushes a neighbour out of the top K still has the next best ones at hand
+DEFAULT_K_NEIGHBORS = 20
+CANDIDATE_FACTOR = 2
+
+# Recommendations precomputed per customer
+DEFAULT_N_RECOMMENDATIONS = 10
+
+# Rows densified at a time when selecting top-K (bounds memory for large catalogues)
+TOPK_CHUNK_ROWS = 1024
+
+
+def _top_k_rows(matrix: sp.csr_matrix, k: int, exclude: sp.csr_matrix | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Top-k columns per row of a sparse matrix, as (n_rows, k) indices / scores padded with -1 / 0.
+
+    Entries present in `exclude` (same shape) are skipped; only positive scores are kept.
+    """
+    n_rows, n_cols = matrix.shape
+    indices = np.full((n_rows, k), -1, dtype=np.int32)
+    scores = np.zeros((n_rows, k), dtype=np.float32)
+    k = min(k, n_cols)
+    if k == 0:
+        return indices, scores
+    for start in range(0, n_rows, TOPK_CHUNK_ROWS):
+        stop = min(start + TOPK_CHUNK_ROWS, n_rows)
+        block = matrix[start:stop].toarray()
+        if exclude is not None:
+            block[exclude[start:stop].toarray() != 0] = 0.0
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        keep = top_scores > 0
+        indices[start:stop, :k] = np.where(keep, top, -1)
+        scores[start:stop, :k] = np.where(keep, top_scores, 0.0)
+    return indices, scores
+
+
+def _neighbor_matrix(neighbors: np.ndarray, sims: np.ndarray, k: int, n_items: int) -> sp.csr_matrix:
+    """Sparse item x item matrix holding only each item's top-k similarities."""
+    neighbors, sims = neighbors[:, :k], sims[:, :k]
+    rows = np.repeat(np.arange(len(neighbors)), neighbors.shape[1])
+    valid = neighbors.ravel() >= 0
+    return sp.csr_matrix(
+        (sims.ravel()[valid], (rows[valid], neighbors.ravel()[valid])), shape=(n_items, n_items), dtype=np.float32
+    )
+
+
+class ItemKNNRecommender:
+    """Item-item cosine kNN over a sparse customer x product quantity matrix."""
+
+    def __init__(self, k_neighbors: int = DEFAULT_K_NEIGHBORS, n_recommendations: int = DEFAULT_N_RECOMMENDATIONS):
+        self.k_neighbors = k_neighbors
+        self.n_recommendations = n_recommendations
+        self.customer_ids = np.empty(0, dtype=np.int64)
+        self.product_codes = np.empty(0, dtype=object)
+        self.quantities = sp.csr_matrix((0, 0), dtype=np.float64)
+        self.neighbors = np.empty((0, 0), dtype=np.int32)
+        self.neighbor_sims = np.empty((0, 0), dtype=np.float32)
+        self.rec_items = np.empty((0, 0), dtype=np.int32)
+        self.rec_scores = np.empty((0, 0), dtype=np.float32)
+        self.order_watermark = 0
+        self._customer_index = {}
+
+    # --- Building ---
+
+    def _weights(self) -> sp.csr_matrix:
+        """Log-scaled quantities, so one huge order does not dominate a product's profile."""
+        weights = self.quantities.copy()
+        weights.data = np.log1p(weights.data)
+        return weights
+
+    def _normalized_columns(self, weights: sp.csr_matrix) -> sp.csc_matrix:
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=0))).ravel()
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        return (weights @ sp.diags(inverse)).tocsc()
+
+    def _add_interactions(self, interactions: pd.DataFrame):
+        """Adds (customerNumber, productCode, quantity) rows to the matrix, growing it for new ids."""
+        new_customers = pd.Index(interactions["customerNumber"].unique()).difference(self.customer_ids)
+        new_products = pd.Index(interactions["productCode"].unique()).difference(self.product_codes)
+        self.customer_ids = np.concatenate([self.customer_ids, new_customers.to_numpy(dtype=np.int64)])
+        self.product_codes = np.concatenate([self.product_codes, new_products.to_numpy(dtype=object)])
+        shape = (len(self.customer_ids), len(self.product_codes))
+
+        rows = pd.Index(self.customer_ids).get_indexer(interactions["customerNumber"])
+        cols = pd.Index(self.product_codes).get_indexer(interactions["productCode"])
+        delta = sp.csr_matrix(
+            (interactions["quantity"].to_numpy(dtype=np.float64), (rows, cols)), shape=shape
+        )
+        current = self.quantities.tocoo()
+        self.quantities = (sp.csr_matrix((current.data, (current.row, current.col)), shape=shape) + delta).tocsr()
+        self.quantities.sum_duplicates()
+        self._grow_rows(len(new_customers), len(new_products))
+        self._customer_index = {int(customer): row for row, customer in enumerate(self.customer_ids)}
+        return np.unique(rows), np.unique(cols)
+
+    def _grow_rows(self, n_new_customers: int, n_new_products: int):
+        """Pads the precomputed arrays for customers / products seen for the first time."""
+        width = self.k_neighbors * CANDIDATE_FACTOR
+        if self.neighbors.shape[1] != width:
+            self.neighbors = np.full((len(self.neighbors), width), -1, dtype=np.int32)
+            self.neighbor_sims = np.zeros((len(self.neighbor_sims), width), dtype=np.float32)
+        if self.rec_items.shape[1] != self.n_recommendations:
+            self.rec_items = np.full((len(self.rec_items), self.n_recommendations), -1, dtype=np.int32)
+            self.rec_scores = np.zeros((len(self.rec_scores), self.n_recommendations), dtype=np.float32)
+        self.neighbors = np.vstack([self.neighbors, np.full((n_new_products, width), -1, dtype=np.int32)])
+        self.neighbor_sims = np.vstack([self.neighbor_sims, np.zeros((n_new_products, width), dtype=np.float32)])
+        self.rec_items = np.vstack([self.rec_items, np.full((n_new_customers, self.n_recommendations), -1, dtype=np.int32)])
+        self.rec_scores = np.vstack([self.rec_scores, np.zeros((n_new_customers, self.n_recommendations), dtype=np.float32)])
+
+    def _score_customers(self, rows: np.ndarray | None = None):
+        """Recomputes stored recommendations for `rows` (default: every customer) in one sparse product."""
+        weights = self._weights()
+        if rows is not None:
+            weights = weights[rows]
+        similarity = _neighbor_matrix(self.neighbors, self.neighbor_sims, self.k_neighbors, len(self.product_codes))
+        scores = (weights @ similarity).tocsr()
+        items, item_scores = _top_k_rows(scores, self.n_recommendations, exclude=weights)
+        if rows is None:
+            self.rec_items, self.rec_scores = items, item_scores
+        else:
+            self.rec_items[rows], self.rec_scores[rows] = items, item_scores
+
+    @classmethod
+    def fit(cls, interactions: pd.DataFrame, order_watermark: int, **kwargs) -> "ItemKNNRecommender":
+        """Full build from (customerNumber, productCode, quantity) rows."""
+        model = cls(**kwargs)
+        model._add_interactions(interactions)
+        normalized = model._normalized_columns(model._weights())
+        similarity = (normalized.T @ normalized).tocsr()
+        similarity.setdiag(0.0)
+        similarity.eliminate_zeros()
+        model.neighbors, model.neighbor_sims = _top_k_rows(similarity, model.k_neighbors * CANDIDATE_FACTOR)
+        model._score_customers()
+        model.order_watermark = int(order_watermark)
+        return model
+
+    def update(self, interactions: pd.DataFrame, order_watermark: int) -> dict:
+        """Folds new (customerNumber, productCode, quantity) rows into the model.
+
+        Only similarities involving a touched product can change, so those
+        products' neighbour lists are rebuilt in full and every other list has its
+        entries for touched products replaced and re-ranked. A list that dropped a
+        touched product refills from its stored extra candidates, which is exact
+        unless more than CANDIDATE_FACTOR * K candidates were displaced.
+        """
+        if interactions.empty:
+            self.order_watermark = int(order_watermark)
+            return {"customers": 0, "products": 0, "rescored": 0}
+        touched_customers, touched = self._add_interactions(interactions)
+        n_items = len(self.product_codes)
+        width = self.neighbors.shape[1]
+
+        normalized = self._normalized_columns(self._weights())
+        # Similarity of every product to each touched product (items x touched)
+        to_touched = (normalized.T @ normalized[:, touched]).toarray().astype(np.float32)
+        to_touched[touched, np.arange(len(touched))] = 0.0
+
+        # Touched products: rebuild their whole neighbour list (excluding themselves)
+        full_rows = (normalized[:, touched].T @ normalized).tocsr()
+        self_pairs = sp.csr_matrix((np.ones(len(touched)), (np.arange(len(touched)), touched)), shape=full_rows.shape)
+        self.neighbors[touched], self.neighbor_sims[touched] = _top_k_rows(full_rows, width, exclude=self_pairs)
+
+        # Other products: drop stale entries for touched products, merge the fresh ones, re-rank
+        others = np.setdiff1d(np.arange(n_items), touched)
+        candidates = np.concatenate([self.neighbors[others], np.broadcast_to(touched, (len(others), len(touched)))], axis=1)
+        stale = np.isin(self.neighbors[others], touched)
+        candidate_sims = np.concatenate(
+            [np.where(stale, 0.0, self.neighbor_sims[others]), to_touched[others]], axis=1
+        ).astype(np.float32)
+        candidate_sims[candidates < 0] = 0.0
+        order = np.argsort(-candidate_sims, axis=1, kind="stable")[:, :width]
+        before = self.neighbors[others, :self.k_neighbors].copy()
+        self.neighbors[others] = np.where(
+            np.take_along_axis(candidate_sims, order, axis=1) > 0, np.take_along_axis(candidates, order, axis=1), -1
+        )
+        self.neighbor_sims[others] = np.take_along_axis(candidate_sims, order, axis=1)
+
+        # Re-score customers who bought a product whose top-K changed, plus the new buyers
+        changed = np.union1d(touched, others[(before != self.neighbors[others, :self.k_neighbors]).any(axis=1)])
+        affected = np.union1d(touched_customers, np.unique(self.quantities[:, changed].tocoo().row))
+        self._score_customers(affected)
+        self.order_watermark = int(order_watermark)
+        return {"customers": len(touched_customers), "products": len(touched), "rescored": len(affected)}
+
+    # --- Serving ---
+
+    def recommend(self, customer_id: int, n: int | None = None) -> list[tuple[str, float]]:
+        """Precomputed (productCode, score) recommendations for a customer, best first."""
+        row = self._customer_index.get(int(customer_id))
+        if row is None:
+            return []
+        n = self.n_recommendations if n is None else n
+        items, scores = self.rec_items[row, :n], self.rec_scores[row, :n]
+        return [(self.product_codes[item], float(score)) for item, score in zip(items, scores) if item >= 0]
+
+    def similar_products(self, product_code: str, k: int | None = None) -> list[tuple[str, float]]:
+        """Top-k most similar products to `product_code`."""
+        matches = np.flatnonzero(self.product_codes == product_code)
+        if not len(matches):
+            return []
+        k = self.k_neighbors if k is None else k
+        items, sims = self.neighbors[matches[0], :k], self.neighbor_sims[matches[0], :k]
+        return [(self.product_codes[item], float(sim)) for item, sim in zip(items, sims) if item >= 0]
+
+    def recommendations_frame(self) -> pd.DataFrame:
+        """All precomputed recommendations as (customerNumber, rank, productCode, score) rows."""
+        rows, ranks = np.nonzero(self.rec_items >= 0)
+        return pd.DataFrame({
+            "customerNumber": self.customer_ids[rows],
+            "rank": ranks + 1,
+            "productCode": self.product_codes[self.rec_items[rows, ranks]],
+            "score": self.rec_scores[rows, ranks],
+        })
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Memory-mapped arrays are read-only; updates copy them before writing
+        for name in ("neighbors", "neighbor_sims", "rec_items", "rec_scores"):
+            array = getattr(self, name)
+            if not array.flags.writeable:
+                setattr(self, name, np.array(array))
+
+
+# --- Training / Publishing ---
+
+def build_recommender(**kwargs) -> ItemKNNRecommender:
+    """Full build over every order in the database."""
+    watermark = int(run_query("reco_order_watermark").iloc[0]["max_order"])
+    interactions = run_query("reco_interactions", after_order=0)
+    return ItemKNNRecommender.fit(interactions, watermark, **kwargs)
+
+
+def update_recommender(model: ItemKNNRecommender) -> dict:
+    """Folds orders above the model's watermark into it (in place)."""
+    watermark = int(run_query("reco_order_watermark").iloc[0]["max_order"])
+    if watermark <= model.order_watermark:
+        return {"customers": 0, "products": 0, "rescored": 0}
+    interactions = run_query("reco_interactions", after_order=model.order_watermark)
+    return model.update(interactions, watermark)
+
+
+def publish_recommender(model: ItemKNNRecommender, registry: ModelRegistry | None = None, **metadata) -> str:
+    registry = registry or ModelRegistry()
+    metadata = {
+        "order_watermark": model.order_watermark,
+        "n_customers": len(model.customer_ids),
+        "n_products": len(model.product_codes),
+        "nnz": int(model.quantities.nnz),
+        "k_neighbors": model.k_neighbors,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **metadata,
+    }
+    return registry.publish(RECO_MODEL_NAME, {"model": model}, metadata)
+
+
+def get_recommender() -> ItemKNNRecommender:
+    """The current recommender version, loaded once per process and shared by every session.
+
+    Raises FileNotFoundError until a version has been published (model.modeling bootstrap).
+    """
+    return get_model(RECO_MODEL_NAME).bundle["model"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "update"])
+    parser.add_argument("--k", type=int, default=DEFAULT_K_NEIGHBORS, help="neighbours per product (build)")
+    args = parser.parse_args()
+    registry = ModelRegistry()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        model = build_recommender(k_neighbors=args.k)
+        report = {"mode": "full"}
+    else:
+        model = registry.load(RECO_MODEL_NAME, mmap_mode=None).bundle["model"]
+        report = {"mode": "incremental", **update_recommender(model)}
+    version = publish_recommender(model, registry, **report)
+    print(
+        f"Published recommender {version} ({report}): {len(model.customer_ids)} customers x "
+        f"{len(model.product_codes)} products, orders through {model.order_watermark} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
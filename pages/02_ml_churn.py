@@ -1,88 +1,149 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.db_connector import get_data
+from utils import profiling
+from utils.customer_dimension import get_customer_dimension
+from utils.db_connector import run_query
+from utils.prefetch import prefetch_adjacent
+from feat_eng.feature_engineering import order_date_range
+from model.churn_windows import WINDOWS, activity_risk, window_bounds
+from model.modeling import get_churn_scores
+
+profiling.set_page("02_ml_churn")
 
 st.title("⚙️ ML Prediction: Customer Churn Risk")
 st.header("Identifying and Retaining High-Value Customers")
 
 st.markdown("""
-This model aims to predict the likelihood of a customer churning (i.e., not placing an order 
+This model predicts the likelihood of a customer churning (i.e., not placing an order 
 within the next 12 months). This allows the sales team to launch targeted retention campaigns.
 """)
 
 st.markdown("---")
 
-# --- Dummy Model/Data Setup ---
-# In a real application, you would load a trained model here:
-# model = joblib.load('models/churn_model.pkl')
+# --- Model Scores ---
+# Every customer is scored in one batch by the trained model (model/modeling.py);
+# the scores are shared by all sessions, so each selection is a dictionary lookup.
+try:
+    with profiling.section("Churn scores", "model"):
+        churn_scores = get_churn_scores()
+except FileNotFoundError as e:
+    # Models are built by a deploy step, never inside the serving process
+    st.warning(str(e))
+    st.stop()
 
-# Get the list of customers for the selection box
-df_customers = get_data("SELECT customerNumber, customerName, creditLimit FROM customers ORDER BY customerName;")
-customer_options = {row['customerNumber']: f"{row['customerName']} (ID: {row['customerNumber']})" 
-                    for index, row in df_customers.iterrows()}
+# Customers for the selection box: one shared, precomputed dimension for all sessions
+customers = get_customer_dimension()
 
 
 # --- Prediction Interface ---
-st.subheader("Simulate Churn Risk Prediction")
+st.subheader("Churn Risk Prediction")
 
 customer_id_selected = st.selectbox(
     "Select a Customer to Analyze:",
-    options=list(customer_options.keys()),
-    format_func=lambda x: customer_options[x]
+    options=customers.options,
+    format_func=customers.label
 )
 
 if customer_id_selected:
-    # Fetch the actual credit limit for the selected customer
-    customer_info = df_customers[df_customers['customerNumber'] == customer_id_selected].iloc[0]
+    # Fetch the actual credit limit for the selected customer (indexed point lookup)
+    customer_info = run_query("customer_profile", customer_id=int(customer_id_selected)).iloc[0]
     credit_limit = customer_info['creditLimit']
-    
-    # --- DUMMY CHURN LOGIC (Simulating Model Output) ---
-    # Low credit limit = higher assumed churn risk (less commitment)
-    # High credit limit = lower assumed churn risk (high commitment, easier to retain)
-    
-    if credit_limit < 50000:
-        # High Risk 
-        churn_risk_score = np.random.uniform(0.65, 0.95)
-        risk_level = "HIGH"
-        color = "normal"
-        action = "Immediate contact by Sales Manager with a personalized discount offer."
-    elif credit_limit >= 50000 and credit_limit < 100000:
-        # Medium Risk
-        churn_risk_score = np.random.uniform(0.35, 0.65)
-        risk_level = "MEDIUM"
-        color = "inverse"
-        action = "Send a targeted email campaign showcasing new Classic Car models."
-    else:
-        # Low Risk
-        churn_risk_score = np.random.uniform(0.05, 0.35)
-        risk_level = "LOW"
-        color = "off"
-        action = "Monitor passively and include in standard loyalty communications."
-        
-    
+    customer_score = churn_scores.get(int(customer_id_selected), {})
+    churn_risk_score = customer_score.get('churn_score', np.nan)
+
     st.markdown("---")
     st.subheader(f"Analysis for: {customer_info['customerName']}")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
+
+    if pd.isna(churn_risk_score):
         st.metric(label="Current Credit Limit", value=f"${credit_limit:,.2f}")
-    
-    with col2:
-        st.metric(
-            label="Predicted Churn Risk Score (0-1)", 
-            value=f"{churn_risk_score:.2f}",
-            delta=risk_level,
-            delta_color=color
-        )
+        st.warning("This customer has no order history, so there is no purchasing behaviour to score for churn.")
+    else:
+        if churn_risk_score >= 0.65:
+            # High Risk 
+            risk_level = "HIGH"
+            color = "normal"
+            action = "Immediate contact by Sales Manager with a personalized discount offer."
+        elif churn_risk_score >= 0.35:
+            # Medium Risk
+            risk_level = "MEDIUM"
+            color = "inverse"
+            action = "Send a targeted email campaign showcasing new Classic Car models."
+        else:
+            # Low Risk
+            risk_level = "LOW"
+            color = "off"
+            action = "Monitor passively and include in standard loyalty communications."
+
+        col1, col2 = st.columns(2)
         
-    st.markdown("#### Recommended Retention Strategy")
-    st.markdown(f"**Risk Level:** :point_right: <span style='color:{color}; font-weight:bold;'>{risk_level}</span>", unsafe_allow_html=True)
-    st.success(f"**Action:** {action}")
+        with col1:
+            st.metric(label="Current Credit Limit", value=f"${credit_limit:,.2f}")
+        
+        with col2:
+            st.metric(
+                label="Predicted Churn Risk Score (0-1)", 
+                value=f"{churn_risk_score:.2f}",
+                delta=risk_level,
+                delta_color=color
+            )
+
+        col3, col4, col5 = st.columns(3)
+        col3.metric(label="Recency (days since last order)", value=f"{customer_score['recency_days']:,.0f}")
+        col4.metric(label="Frequency (orders)", value=f"{customer_score['frequency']:,.0f}")
+        col5.metric(label="Monetary (total spend)", value=f"${customer_score['monetary']:,.2f}")
+            
+        st.markdown("#### Recommended Retention Strategy")
+        st.markdown(f"**Risk Level:** :point_right: <span style='color:{color}; font-weight:bold;'>{risk_level}</span>", unsafe_allow_html=True)
+        st.success(f"**Action:** {action}")
     
+    # --- Activity Trend ---
+    # Rolling 30/90/365-day windows maintained incrementally by `python -m model.churn_windows`
+    # (live per-customer queries until the tables exist): one primary-key lookup per selection.
+    st.markdown("#### Activity Trend")
+    _, last_order_date = order_date_range()
+    window_params = dict(window_bounds(last_order_date), customer_id=int(customer_id_selected))
+    with profiling.section("Activity windows", "model"):
+        df_windows = run_query("churn_customer_windows", **window_params)
+        df_activity = run_query("churn_customer_activity", **window_params)
+
+    if df_windows.empty:
+        st.warning("Could not load the customer's activity windows.")
+    else:
+        windows = df_windows.iloc[0]
+        trend_risk = float(activity_risk(df_windows)[0])
+        window_cols = st.columns(len(WINDOWS) + 1)
+        for col, days in zip(window_cols, WINDOWS):
+            col.metric(
+                label=f"Orders, last {days} days",
+                value=f"{windows[f'orders_{days}']:,.0f}",
+                delta=f"${windows[f'spend_{days}']:,.0f} spend / ${windows[f'paid_{days}']:,.0f} paid",
+                delta_color="off"
+            )
+        window_cols[-1].metric(label="Activity-Trend Risk (0-1)", value=f"{trend_risk:.2f}")
+
+        # Monthly sparkline of the last 12 months, built from at most 365 daily rows
+        # (no rows: nothing to plot, or the query failed and its error is already shown)
+        if not df_activity.empty:
+            months = pd.date_range(end=last_order_date.to_period('M').to_timestamp(), periods=12, freq='MS')
+            df_activity['day'] = pd.to_datetime(df_activity['day'])
+            monthly = (
+                df_activity.set_index('day')[['spend', 'paid']]
+                .resample('MS').sum()
+                .reindex(months, fill_value=0)
+            )
+            st.line_chart(monthly, height=160)
+        st.caption(
+            f"Windows end on the latest order date ({last_order_date:%Y-%m-%d}). The trend risk compares the "
+            "customer's last 90 and 30 days with their own yearly order pace (0 = on pace, 1 = no orders in a year)."
+        )
+
     st.markdown("---")
     st.caption(
-        f"Disclaimer: This prediction is based on a dummy model using only Credit Limit as a feature. "
-        "A true ML model would incorporate Recency, Frequency, Monetary value (RFM), product line loyalty, and other factors."
-    )
\ No newline at end of file
+        "Disclaimer: Scores come from a random forest trained on Recency, Frequency, Monetary value (RFM), "
+        "tenure, credit limit and product line loyalty, with churn defined as no order in the following 12 months. "
+        "Retrain with `python -m model.modeling train-churn`."
+    )
+
+# Warm the query cache for the neighbouring pages now that this one has rendered
+prefetch_adjacent("02_ml_churn")
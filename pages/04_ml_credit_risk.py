@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from utils.db_connector import get_data
+from model.credit_risk import (
+    PAYMENT_HISTORY_OPTIONS, REQUEST_COLUMNS, customer_book_requests, score_credit_requests
+)
+from utils import profiling
+from utils.db_connector import run_query
+from utils.prefetch import prefetch_adjacent
+
+profiling.set_page("04_ml_credit_risk")
 
 st.title("💰 ML Prediction: Credit Risk Assessment")
 st.header("Quantifying Financial Exposure for Credit Decisions")
@@ -15,116 +21,156 @@ st.markdown("---")
 
 # --- Data for Simulation Setup ---
 # Get all unique countries from the customers table
-df_countries = get_data("SELECT DISTINCT country FROM customers ORDER BY country;")
+df_countries = run_query("customer_countries")
 country_list = df_countries['country'].tolist()
 
-# Define hardcoded risk factors for simulation (in a real app, this would be model output)
-RISK_FACTORS = {
-    'USA': 0.05,
-    'France': 0.10,
-    'Spain': 0.10,
-    'UK': 0.15,
-    'Italy': 0.20,
-    'Germany': 0.25,
-    # Assign a higher base risk to small/new markets
-    'Japan': 0.40, 
-    'Australia': 0.30
-}
+# Country base risks, limit/revenue and payment-history adjustments live in model/credit_risk.py,
+# shared by the single-request form and the batch modes below.
+
+mode = st.radio(
+    "Scoring Mode:",
+    options=["Single request", "Batch (CSV upload)", "Entire customer book"],
+    horizontal=True
+)
+
+
+def show_batch_results(scored: pd.DataFrame, file_name: str):
+    """Decision summary, result table and CSV download for a scored batch."""
+    counts = scored['decision'].value_counts()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Requests Scored", f"{len(scored):,}")
+    col2.metric("LOW Risk", f"{counts.get('LOW Risk', 0):,}")
+    col3.metric("MODERATE Risk", f"{counts.get('MODERATE Risk', 0):,}")
+    col4.metric("HIGH Risk", f"{counts.get('HIGH Risk', 0):,}")
+
+    st.dataframe(scored.sort_values('risk_score', ascending=False), hide_index=True)
+    st.download_button(
+        "Download Scored Requests (CSV)",
+        data=scored.to_csv(index=False).encode('utf-8'),
+        file_name=file_name,
+        mime="text/csv"
+    )
+
+
+# --- Batch Modes ---
+if mode == "Batch (CSV upload)":
+    st.subheader("Score a File of Credit Requests")
+    st.markdown(f"Upload a CSV with the columns `{'`, `'.join(REQUEST_COLUMNS)}`; any extra columns are kept in the output.")
+    template = pd.DataFrame([['USA', 150000, 75000, 'Excellent'], ['Japan', 80000, 60000, 'Poor']], columns=REQUEST_COLUMNS)
+    st.download_button(
+        "Download CSV Template",
+        data=template.to_csv(index=False).encode('utf-8'),
+        file_name="credit_requests_template.csv",
+        mime="text/csv"
+    )
+
+    uploaded = st.file_uploader("Credit requests (CSV)", type="csv")
+    if uploaded is not None:
+        try:
+            with profiling.section("Batch scoring (CSV)", "model"):
+                scored = score_credit_requests(pd.read_csv(uploaded))
+        # Not UTF-8, malformed CSV, empty file or missing columns (UnicodeDecodeError is listed for clarity)
+        except (UnicodeDecodeError, pd.errors.ParserError, ValueError) as e:
+            st.error(
+                f"Could not score the file: {e}. Upload a UTF-8 CSV with the columns "
+                f"`{'`, `'.join(REQUEST_COLUMNS)}` (see the template above)."
+            )
+        else:
+            show_batch_results(scored, "credit_requests_scored.csv")
+
+elif mode == "Entire customer book":
+    st.subheader("Score Every Existing Customer")
+    st.markdown(
+        "Each customer is scored for their current credit limit. Average yearly purchases stand in for revenue, "
+        "and the share of ordered value already paid sets the payment history."
+    )
+    with profiling.section("Batch scoring (customer book)", "model"):
+        scored = score_credit_requests(customer_book_requests())
+    show_batch_results(scored, "customer_book_scored.csv")
 
 # --- Prediction Interface: User Input Form ---
-st.subheader("Simulate New Credit Request")
-
-with st.form("credit_risk_form"):
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        customer_country = st.selectbox(
-            "Customer Country (Proxy for Economic Stability):",
-            options=country_list,
-            index=country_list.index('USA') if 'USA' in country_list else 0
-        )
-        
-        annual_revenue = st.number_input(
-            "Customer Annual Revenue ($):",
-            min_value=10000,
-            value=150000,
-            step=10000,
-            help="Higher revenue suggests greater financial capacity."
-        )
+else:
+    st.subheader("Simulate New Credit Request")
 
-    with col2:
-        requested_credit_limit = st.number_input(
-            "Requested Credit Limit ($):",
-            min_value=1000,
-            value=75000,
-            step=5000,
-            help="The amount of credit the customer is requesting."
-        )
-        
-        payment_history = st.selectbox(
-            "Historical Payment Record:",
-            options=['Excellent (Always on time)', 'Good (Rare late payment)', 'Poor (Frequent delays)'],
-            index=0
+    with st.form("credit_risk_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            customer_country = st.selectbox(
+                "Customer Country (Proxy for Economic Stability):",
+                options=country_list,
+                index=country_list.index('USA') if 'USA' in country_list else 0
+            )
+
+            annual_revenue = st.number_input(
+                "Customer Annual Revenue ($):",
+                min_value=10000,
+                value=150000,
+                step=10000,
+                help="Higher revenue suggests greater financial capacity."
+            )
+
+        with col2:
+            requested_credit_limit = st.number_input(
+                "Requested Credit Limit ($):",
+                min_value=1000,
+                value=75000,
+                step=5000,
+                help="The amount of credit the customer is requesting."
+            )
+
+            payment_history = st.selectbox(
+                "Historical Payment Record:",
+                options=PAYMENT_HISTORY_OPTIONS,
+                index=0
+            )
+
+        submitted = st.form_submit_button("Assess Risk")
+
+    # --- Risk Assessment Logic ---
+    if submitted:
+        # Same scorer as the batch modes, on a one-row batch (with a little noise for realism)
+        request = pd.DataFrame([{
+            'country': customer_country,
+            'annual_revenue': annual_revenue,
+            'requested_credit_limit': requested_credit_limit,
+            'payment_history': payment_history,
+        }])
+        with profiling.section("Single request scoring", "model"):
+            result = score_credit_requests(request, noise=0.05).iloc[0]
+        final_risk_score = result['risk_score']
+        decision = result['decision']
+
+        # --- Output and Recommendation ---
+        st.markdown("---")
+        st.subheader("Credit Risk Decision")
+
+        if decision == "LOW Risk":
+            advice = "Recommended. Approve the requested limit, or slightly higher."
+            color = "green"
+        elif decision == "MODERATE Risk":
+            advice = f"Proceed with caution. Approve a reduced limit of **${result['suggested_limit']:,.2f}** and monitor payments closely."
+            color = "orange"
+        else:
+            advice = "Not Recommended. Reject the request or approve only a minimal limit with strict pre-payment terms."
+            color = "red"
+
+        st.metric(
+            label="Predicted Default Risk Score (0=Low, 1=High)",
+            value=f"{final_risk_score:.2f}",
+            delta=decision,
+            delta_color=color
         )
-        
-    submitted = st.form_submit_button("Assess Risk")
-
-# --- Risk Assessment Logic ---
-if submitted:
-    
-    # 1. Base Risk (from country)
-    base_risk = RISK_FACTORS.get(customer_country, 0.50) # Default high risk for unknown country
-    
-    # 2. Limit and Revenue Adjustment
-    # High limit relative to revenue increases risk
-    limit_to_revenue_ratio = requested_credit_limit / annual_revenue
-    limit_risk_factor = min(0.4, limit_to_revenue_ratio * 0.5) # Cap at 40% influence
-
-    # 3. Payment History Adjustment
-    if payment_history == 'Excellent (Always on time)':
-        history_adjustment = -0.10
-    elif payment_history == 'Poor (Frequent delays)':
-        history_adjustment = 0.20
-    else:
-        history_adjustment = 0.00
-        
-    # 4. Final Predicted Risk Score (Simulated)
-    raw_risk_score = base_risk + limit_risk_factor + history_adjustment
-    # Bound the score between 0.05 and 0.95 and add noise for realism
-    final_risk_score = np.clip(raw_risk_score, 0.05, 0.95) + np.random.uniform(-0.05, 0.05)
-    final_risk_score = np.clip(final_risk_score, 0.0, 1.0)
-    
-    # --- Output and Recommendation ---
-    st.markdown("---")
-    st.subheader("Credit Risk Decision")
-    
-    if final_risk_score < 0.30:
-        decision = "LOW Risk"
-        advice = "Recommended. Approve the requested limit, or slightly higher."
-        color = "green"
-    elif final_risk_score < 0.60:
-        decision = "MODERATE Risk"
-        advice = f"Proceed with caution. Approve a reduced limit of **${requested_credit_limit * 0.75:,.2f}** and monitor payments closely."
-        color = "orange"
-    else:
-        decision = "HIGH Risk"
-        advice = "Not Recommended. Reject the request or approve only a minimal limit with strict pre-payment terms."
-        color = "red"
-        
-    
-    st.metric(
-        label="Predicted Default Risk Score (0=Low, 1=High)",
-        value=f"{final_risk_score:.2f}",
-        delta=decision,
-        delta_color=color
-    )
-    
-    st.markdown("#### Finance Department Recommendation")
-    st.markdown(f"**Risk Profile:** :point_right: <span style='color:{color}; font-weight:bold;'>{decision}</span>", unsafe_allow_html=True)
-    st.success(f"**Suggested Action:** {advice}")
+
+        st.markdown("#### Finance Department Recommendation")
+        st.markdown(f"**Risk Profile:** :point_right: <span style='color:{color}; font-weight:bold;'>{decision}</span>", unsafe_allow_html=True)
+        st.success(f"**Suggested Action:** {advice}")
 
 st.markdown("---")
 st.caption(
     "Disclaimer: This risk assessment is based on a simulated model using simplified proxies. "
     "A production system would use features like accounts payable turnover, historical delinquencies, and third-party credit scores."
-)
\ No newline at end of file
+)
+
+# Warm the query cache for the neighbouring pages now that this one has rendered
+prefetch_adjacent("04_ml_credit_risk")
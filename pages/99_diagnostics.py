@@ -0,0 +1,107 @@
+import hmac
+import os
+
+import streamlit as st
+import pandas as pd
+from utils import profiling, startup
+from utils.db_connector import get_cache_stats, get_disk_cache_stats
+from utils.prefetch import prefetch_stats
+from model.modeling import get_model_load_stats
+
+st.title("🩺 Diagnostics: Query & Render Profiling")
+
+# --- Access ---
+# Not meant for business users: the page can switch profiling for every session, so it stays
+# locked unless the server enabled it (DASHBOARD_PROFILING=1 / DASHBOARD_DIAGNOSTICS=1) or the
+# URL carries ?diagnostics=<token> matching `diagnostics_token` in Streamlit secrets.
+def _diagnostics_token() -> str | None:
+    try:
+        return st.secrets.get("diagnostics_token")
+    except Exception:
+        # No secrets file
+        return None
+
+
+token = _diagnostics_token()
+supplied = st.query_params.get("diagnostics")
+unlocked = (
+    profiling.is_enabled()
+    or os.environ.get("DASHBOARD_DIAGNOSTICS") == "1"
+    or (bool(token) and supplied is not None and hmac.compare_digest(str(supplied), str(token)))
+)
+if not unlocked:
+    st.info(
+        "Diagnostics are disabled. Start the app with `DASHBOARD_PROFILING=1` or `DASHBOARD_DIAGNOSTICS=1`, "
+        "or set `diagnostics_token` in the secrets and open this page with `?diagnostics=<token>`."
+    )
+    st.stop()
+
+# --- Controls ---
+col1, col2 = st.columns(2)
+with col1:
+    enabled = st.toggle(
+        "Record profiling data (all sessions)",
+        value=profiling.is_enabled(),
+        help="Times every query (execute / fetch), result size, cache outcome and chart section. "
+             "Off by default; the cost when off is a single flag check."
+    )
+    if enabled != profiling.is_enabled():
+        profiling.set_enabled(enabled)
+with col2:
+    if st.button("Clear recorded data"):
+        profiling.clear()
+
+# --- Startup ---
+# Recorded once per process (seconds since the interpreter started); measure cold
+# starts of every page from the command line with `python -m utils.startup`.
+st.subheader("Process Startup")
+startup_report = startup.startup_report()
+if startup_report:
+    st.dataframe(pd.DataFrame(startup_report), hide_index=True)
+else:
+    st.caption("The home page has not been loaded by this process yet.")
+
+records = profiling.records()
+if not records:
+    st.warning("No profiling records yet. Enable recording, then browse the dashboard pages.")
+    st.stop()
+
+# --- Summary ---
+st.subheader("Where the Time Goes")
+summary = pd.DataFrame(profiling.summarize(records))
+pages = sorted(summary['page'].unique())
+selected_pages = st.multiselect("Pages", options=pages, default=pages)
+summary = summary[summary['page'].isin(selected_pages)]
+
+st.markdown("#### Queries (SQL execute vs. DataFrame fetch)")
+query_summary = summary[summary['kind'] == 'query'].drop(columns=['kind', 'phase'])
+st.dataframe(query_summary.sort_values('total_ms', ascending=False), hide_index=True)
+
+st.markdown("#### Page Sections (figure build, render, model work)")
+section_summary = summary[summary['kind'] == 'section'].dropna(axis=1, how='all').drop(columns=['kind'])
+st.dataframe(section_summary.sort_values('total_ms', ascending=False), hide_index=True)
+
+# --- Caches and Models ---
+st.subheader("Caches and Models")
+st.json({"query_cache": get_cache_stats(), "disk_cache": get_disk_cache_stats(), "prefetch": prefetch_stats()})
+load_stats = get_model_load_stats()
+if load_stats:
+    st.dataframe(pd.DataFrame(load_stats), hide_index=True)
+
+# --- Raw Records and Export ---
+st.subheader("Recent Records")
+st.dataframe(pd.DataFrame(records[-200:][::-1]), hide_index=True)
+
+col3, col4 = st.columns(2)
+col3.download_button(
+    "Export JSON",
+    data=profiling.export_json(records),
+    file_name="dashboard_profile.json",
+    mime="application/json"
+)
+col4.download_button(
+    "Export OpenMetrics",
+    data=profiling.export_openmetrics(records),
+    file_name="dashboard_profile.txt",
+    mime="application/openmetrics-text"
+)
@@ -0,0 +1,87 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+SAMPLE_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "classicmodels.sqlite")
+
+
+@pytest.fixture
+def database(tmp_path) -> str:
+    """Path to a scratch copy of the sample database (the original is never written)."""
+    path = tmp_path / "classicmodels.sqlite"
+    shutil.copyfile(SAMPLE_DATABASE, path)
+    return str(path)
+
+
+@pytest.fixture
+def connection(database):
+    connection = sqlite3.connect(database)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def append_orders():
+    """Copies the last `count` orders (lines included) as new orders, dated `days_later` days after the originals.
+
+    With `new_customer`, the copies are placed by a new customer (added to the
+    customers table); payments matching the copied orders are appended as well.
+    """
+    def append(connection: sqlite3.Connection, count: int = 5, days_later: int = 0, new_customer: bool = False) -> list[int]:
+        with connection:
+            order_high = connection.execute("SELECT MAX(orderNumber) FROM orders;").fetchone()[0]
+            source = [row[0] for row in connection.execute(
+                "SELECT orderNumber FROM orders ORDER BY orderNumber DESC LIMIT ?;", (count,)
+            )]
+            customer = None
+            if new_customer:
+                customer = connection.execute("SELECT MAX(customerNumber) + 1 FROM customers;").fetchone()[0]
+                connection.execute(
+                    "INSERT INTO customers (customerNumber, customerName, country, creditLimit) VALUES (?, ?, 'Norway', 0);",
+                    (customer, f"Test customer {customer}"),
+                )
+            added = []
+            for offset, order in enumerate(sorted(source), start=1):
+                number = order_high + offset
+                connection.execute(
+                    "INSERT INTO orders (orderNumber, orderDate, requiredDate, shippedDate, status, comments, customerNumber) "
+                    "SELECT ?, date(orderDate, ?), date(requiredDate, ?), date(shippedDate, ?), status, comments, "
+                    "COALESCE(?, customerNumber) FROM orders WHERE orderNumber = ?;",
+                    (number, f"+{days_later} days", f"+{days_later} days", f"+{days_later} days", customer, order),
+                )
+                connection.execute(
+                    "INSERT INTO orderdetails (orderNumber, productCode, quantityOrdered, priceEach, orderLineNumber) "
+                    "SELECT ?, productCode, quantityOrdered, priceEach, orderLineNumber FROM orderdetails WHERE orderNumber = ?;",
+                    (number, order),
+                )
+                connection.execute(
+                    "INSERT INTO payments (customerNumber, checkNumber, paymentDate, amount) "
+                    "SELECT customerNumber, ?, orderDate, ? FROM orders WHERE orderNumber = ?;",
+                    (f"T{number}", 1000.0 + offset, number),
+                )
+                added.append(number)
+        return added
+
+    return append
+
+
+@pytest.fixture
+def dashboard(database, monkeypatch):
+    """utils.db_connector configured for the scratch database, with its resource caches reset around the test."""
+    from utils import db_connector
+
+    monkeypatch.setenv("DASHBOARD_DB_SQLITE_PATH", database)
+    monkeypatch.setenv("DASHBOARD_BACKEND", "sqlite")
+    monkeypatch.setattr(db_connector, "DISK_CACHE_DIR", None)
+    resources = (
+        db_connector.get_backend_config, db_connector.get_engine, db_connector.get_query_cache,
+        db_connector.get_disk_cache, db_connector.get_mirror_builder,
+    )
+    for resource in resources:
+        resource.clear()
+    yield db_connector
+    db_connector.get_engine().dispose()
+    for resource in resources:
+        resource.clear()
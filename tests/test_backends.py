@@ -0,0 +1,154 @@
+import re
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils import sqlite_shim
+from utils.backends import POOL_DEFAULTS, BackendConfig, build_url, create_backend_engine
+from utils.materialize import refresh_summaries
+from utils.queries import QUERY_REGISTRY
+
+REMOTE_BACKENDS = ("mysql", "mssql")
+
+# Bound parameter values for the registered queries
+PARAMS = {"customer_id": 141, "lo": 0.0, "width": 25000.0}
+
+VARIANTS = [
+    (query.name, dialect)
+    for query in QUERY_REGISTRY.values()
+    for dialect in query.variants
+    if dialect in REMOTE_BACKENDS
+]
+
+
+@pytest.fixture
+def summary_database(database) -> str:
+    """Scratch database with the materialized summary tables built."""
+    connection = sqlite3.connect(database)
+    refresh_summaries(connection)
+    connection.close()
+    return database
+
+
+def offline_engine(backend: str, database: str, **settings):
+    config = BackendConfig.from_mapping({"backend": backend, "host": "offline", "name": "classicmodels", **settings})
+    return create_backend_engine(config, **sqlite_shim.engine_kwargs(database))
+
+
+def raw_connection(connection) -> sqlite_shim.Connection:
+    return connection.connection.dbapi_connection
+
+
+# --- Dialect variants ---
+
+def test_variants_cover_every_backend():
+    assert {dialect for _, dialect in VARIANTS} == set(REMOTE_BACKENDS)
+
+
+@pytest.mark.parametrize("name, dialect", VARIANTS)
+def test_variant_matches_sqlite_query(summary_database, name, dialect):
+    query = QUERY_REGISTRY[name]
+    params = {param: PARAMS[param] for param in query.params}
+    engine = offline_engine(dialect, summary_database)
+    assert engine.dialect.name == dialect
+
+    with engine.connect() as connection:
+        actual = pd.read_sql_query(query.statement_for(dialect), connection, params=params)
+    engine.dispose()
+    connection = sqlite3.connect(summary_database)
+    expected = pd.read_sql_query(query.sql, connection, params=params)
+    connection.close()
+
+    assert len(expected)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_limit_queries_have_a_top_variant():
+    # SQL Server has no LIMIT
+    missing = [
+        query.name for query in QUERY_REGISTRY.values()
+        if re.search(r"\bLIMIT\b", query.sql) and "mssql" not in query.variants
+    ]
+    assert missing == []
+
+
+def test_shim_translates_top_only():
+    assert sqlite_shim.translate("SELECT TOP 3 a, b\nFROM t\nORDER BY a;\n") == "SELECT a, b\nFROM t\nORDER BY a LIMIT 3"
+    assert sqlite_shim.translate("SELECT a FROM t;") == "SELECT a FROM t;"
+
+
+# --- Statement timeouts ---
+
+def test_mysql_sets_max_execution_time(database):
+    engine = offline_engine("mysql", database, statement_timeout="12.5")
+    with engine.connect() as connection:
+        assert raw_connection(connection).session == {"MAX_EXECUTION_TIME": "12500"}
+    engine.dispose()
+
+
+@pytest.mark.parametrize("statement_timeout, expected", [("30", 30), ("12.5", 12), ("0.2", 1)])
+def test_mssql_sets_pyodbc_timeout(database, statement_timeout, expected):
+    engine = offline_engine("mssql", database, statement_timeout=statement_timeout)
+    with engine.connect() as connection:
+        assert raw_connection(connection).timeout == expected
+    engine.dispose()
+
+
+# --- Pool settings ---
+
+@pytest.mark.parametrize("backend", REMOTE_BACKENDS)
+def test_pool_defaults(database, backend):
+    engine = offline_engine(backend, database)
+    defaults = POOL_DEFAULTS[backend]
+    assert engine.pool.size() == defaults["pool_size"]
+    assert engine.pool._max_overflow == defaults["max_overflow"]
+    assert bool(engine.pool._pre_ping) == defaults["pool_pre_ping"]
+    assert engine.pool._recycle == BackendConfig.pool_recycle
+    engine.dispose()
+
+
+@pytest.mark.parametrize("backend", REMOTE_BACKENDS)
+def test_pool_overrides_from_strings(database, backend):
+    # Environment variables arrive as strings
+    engine = offline_engine(
+        backend, database, pool_size="2", max_overflow="1", pool_pre_ping="false", pool_recycle="60"
+    )
+    assert engine.pool.size() == 2
+    assert engine.pool._max_overflow == 1
+    assert not engine.pool._pre_ping
+    assert engine.pool._recycle == 60
+    engine.dispose()
+
+
+@pytest.mark.parametrize("backend", REMOTE_BACKENDS)
+def test_pre_ping_checks_pooled_connections(database, backend):
+    engine = offline_engine(backend, database)
+    with engine.connect() as connection:
+        raw = raw_connection(connection)
+        executed = len(raw.statements)
+    with engine.connect() as connection:
+        assert raw_connection(connection) is raw
+        assert len(raw.statements) > executed
+    engine.dispose()
+
+
+def test_sqlite_pool_settings(database):
+    engine = create_backend_engine(BackendConfig(sqlite_path=database, pool_size=3))
+    assert engine.dialect.name == "sqlite"
+    assert engine.pool.size() == 3
+    engine.dispose()
+
+
+# --- URLs ---
+
+def test_build_url():
+    mysql = build_url(BackendConfig(backend="mysql", host="db", name="sales", user="u", password="p"))
+    assert (mysql.drivername, mysql.port, mysql.database) == ("mysql+mysqlconnector", 3306, "sales")
+
+    mssql = build_url(BackendConfig(backend="mssql", host="db", name="sales", user="u", password="p"))
+    assert (mssql.drivername, mssql.port) == ("mssql+pyodbc", 1433)
+    assert mssql.query["driver"] == BackendConfig.odbc_driver
+    assert mssql.query["Encrypt"] == "yes"
+
+    assert build_url(BackendConfig(backend="mssql", url="mssql+pyodbc://dsn")) == "mssql+pyodbc://dsn"
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import suite  # noqa: E402
+from load_test import percentile  # noqa: E402
+from utils.index_advisor import sample_params  # noqa: E402
+from utils.queries import PAGE_QUERIES, QUERY_REGISTRY  # noqa: E402
+
+
+def result(cold_ms: float = 10.0, rerun_ms: float = 100.0, peak_rss_mb: float = 200.0, scale: str = "sample") -> dict:
+    """A stored suite result with one query and one page."""
+    return {"scales": [{
+        "scale": scale,
+        "peak_rss_mb": peak_rss_mb,
+        "queries": [{"query": "eda_country_counts", "cold_ms": cold_ms, "warm_ms": 0.1}],
+        "pages": [{"page": "pages/01_eda.py", "first_run_ms": 500.0, "rerun_ms": rerun_ms}],
+    }]}
+
+
+# --- Result comparison ---
+
+def test_flatten_names_every_compared_metric():
+    assert suite.flatten(result()) == {
+        "sample:peak_rss_mb": 200.0,
+        "sample:query:eda_country_counts:cold_ms": 10.0,
+        "sample:query:eda_country_counts:warm_ms": 0.1,
+        "sample:page:pages/01_eda.py:first_run_ms": 500.0,
+        "sample:page:pages/01_eda.py:rerun_ms": 100.0,
+    }
+
+
+def test_compare_reports_regressions_above_threshold_and_noise_floor():
+    regressions = suite.compare(result(cold_ms=20.0, rerun_ms=200.0), result(), threshold=0.25)
+    assert [line.split(":")[2] for line in regressions if ":query:" in line] == ["eda_country_counts"]
+    assert any(line.startswith("sample:page:pages/01_eda.py:rerun_ms") for line in regressions)
+    assert len(regressions) == 2
+
+
+def test_compare_ignores_noise_and_new_metrics():
+    # +50% but only +1 ms, below the cold_ms noise floor
+    assert suite.compare(result(cold_ms=3.0), result(cold_ms=2.0), threshold=0.25) == []
+    # Faster is never a regression
+    assert suite.compare(result(rerun_ms=50.0), result(), threshold=0.25) == []
+    # Scales missing from the baseline are not compared
+    assert suite.compare(result(cold_ms=500.0, scale="1m"), result(), threshold=0.25) == []
+
+
+def test_latest_result_skips_the_current_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(suite, "RESULTS_DIR", str(tmp_path))
+    assert suite.latest_result() is None
+    paths = [str(tmp_path / name) for name in ("20260101T000000Z_aaa.json", "20260102T000000Z_bbb.json")]
+    for path in paths:
+        open(path, "w").close()
+    assert suite.latest_result() == paths[1]
+    assert suite.latest_result(exclude=paths[1]) == paths[0]
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 51.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 95) == 7.0
+
+
+# --- Coverage of the registry ---
+
+def test_page_queries_are_registered():
+    assert {name for names in PAGE_QUERIES.values() for name in names} <= set(QUERY_REGISTRY)
+
+
+def test_every_query_gets_sample_params(connection):
+    for query in QUERY_REGISTRY.values():
+        params = sample_params(connection, query)
+        assert set(params) == set(query.params)
+        assert None not in params.values(), query.name
+
+
+# --- Worker ---
+
+def test_query_worker_times_every_registered_query(database, tmp_path):
+    # A fresh process, as the suite runs it: the Streamlit resource caches start empty
+    env = dict(os.environ, DASHBOARD_DB_SQLITE_PATH=database, DASHBOARD_BACKEND="sqlite", DASHBOARD_PREFETCH="0")
+    env["PYTHONPATH"] = os.pathsep.join([suite.ROOT, BENCHMARKS_DIR])
+    env.pop("DASHBOARD_DISK_CACHE_DIR", None)
+    modified = os.stat(database).st_mtime_ns
+    completed = subprocess.run(
+        [sys.executable, "-c", "import json, suite; print(json.dumps(suite.bench_queries(1)))"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    queries = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert {query["query"] for query in queries} == set(QUERY_REGISTRY)
+    for query in queries:
+        assert query["cold_ms"] >= 0 and query["warm_ms"] >= 0
+    # A run compared with itself has no regressions
+    report = {"scales": [{"scale": "sample", "peak_rss_mb": 1.0, "queries": queries, "pages": []}]}
+    assert suite.compare(report, json.loads(json.dumps(report)), threshold=0.0) == []
+    # The worker only reads the database
+    assert os.stat(database).st_mtime_ns == modified
@@ -0,0 +1,62 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from utils.chart_data import sql_histogram, top_n
+
+
+# --- Histograms ---
+
+def test_sql_histogram_matches_numpy(dashboard, database):
+    histogram = sql_histogram("eda_credit_limit_range", "eda_credit_limit_bins", nbins=20)
+
+    connection = sqlite3.connect(database)
+    limits = pd.read_sql_query("SELECT creditLimit FROM customers WHERE creditLimit IS NOT NULL;", connection)["creditLimit"]
+    connection.close()
+    counts, edges = np.histogram(limits, bins=20)
+
+    assert list(histogram.columns) == ["bin_start", "bin_end", "bin_mid", "count"]
+    assert histogram["count"].tolist() == counts.tolist()
+    np.testing.assert_allclose(histogram["bin_start"], edges[:-1])
+    np.testing.assert_allclose(histogram["bin_end"], edges[1:])
+    np.testing.assert_allclose(histogram["bin_mid"], (edges[:-1] + edges[1:]) / 2)
+
+
+def test_sql_histogram_of_a_single_value(dashboard, database):
+    connection = sqlite3.connect(database)
+    with connection:
+        connection.execute("UPDATE customers SET creditLimit = 5000;")
+    connection.close()
+
+    histogram = sql_histogram("eda_credit_limit_range", "eda_credit_limit_bins", nbins=4)
+    assert histogram["count"].tolist() == [122, 0, 0, 0]
+    assert histogram["bin_start"].iloc[0] == 5000.0
+
+
+def test_sql_histogram_without_values(dashboard, database):
+    connection = sqlite3.connect(database)
+    with connection:
+        connection.execute("UPDATE customers SET creditLimit = NULL;")
+    connection.close()
+
+    histogram = sql_histogram("eda_credit_limit_range", "eda_credit_limit_bins")
+    assert histogram.empty
+    assert list(histogram.columns) == ["bin_start", "bin_end", "bin_mid", "count"]
+
+
+# --- Top N ---
+
+def test_top_n_groups_the_rest_into_other():
+    df = pd.DataFrame({"line": list("abcdef"), "sold": [5, 30, 10, 30, 1, 2]})
+    result = top_n(df, "line", "sold", n=3)
+    # Ties keep their original order
+    assert result["line"].tolist() == ["b", "d", "c", "Other"]
+    assert result["sold"].tolist() == [30, 30, 10, 8]
+    assert result["sold"].sum() == df["sold"].sum()
+
+
+def test_top_n_leaves_short_frames_alone():
+    df = pd.DataFrame({"line": ["a", "b"], "sold": [1, 2], "extra": [0, 0]})
+    assert top_n(df, "line", "sold", n=2) is df
+    assert top_n(df.iloc[:0], "line", "sold", n=2).empty
@@ -0,0 +1,124 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from feat_eng.feature_engineering import (
+    BASE_FEATURES,
+    NO_ORDER_RECENCY_DAYS,
+    build_churn_labels,
+    build_customer_features,
+    compute_customer_features,
+)
+from model.modeling import churn_scores_frame, score_customers, train_churn_model
+
+PRODUCT_LINES = ["Classic Cars", "Motorcycles", "Planes", "Ships", "Trains", "Trucks and Buses", "Vintage Cars"]
+
+
+def read_sql(database: str, sql: str) -> pd.DataFrame:
+    connection = sqlite3.connect(database)
+    try:
+        return pd.read_sql_query(sql, connection)
+    finally:
+        connection.close()
+
+
+# --- Feature frame ---
+
+def test_compute_customer_features():
+    rfm = pd.DataFrame({
+        "customerNumber": [1, 2, 3],
+        "creditLimit": [1000.0, None, 500.0],
+        "frequency": [2, 1, 0],
+        "first_order_date": ["2005-01-01", "2005-05-01", None],
+        "last_order_date": ["2005-05-01", "2005-05-01", None],
+        "monetary": [300.0, 50.0, 0.0],
+    })
+    line_qty = pd.DataFrame({
+        "customerNumber": [1, 1, 2, 99],
+        "productLine": ["Ships", "Planes", "Ships", "Ships"],
+        "quantity": [30, 10, 5, 7],
+    })
+    features = compute_customer_features(rfm, line_qty, pd.Timestamp("2005-05-31"))
+
+    assert list(features.columns) == BASE_FEATURES + ["share_Planes", "share_Ships"]
+    assert features.index.tolist() == [1, 2, 3]
+    assert features["recency_days"].tolist() == [30, 30, NO_ORDER_RECENCY_DAYS]
+    assert features["tenure_days"].tolist() == [150, 30, 0]
+    assert features["avg_order_value"].tolist() == [150.0, 50.0, 0.0]
+    assert features["creditLimit"].tolist() == [1000.0, 0.0, 500.0]
+    assert features["product_line_loyalty"].tolist() == [0.75, 1.0, 0.0]
+    assert features["product_line_breadth"].tolist() == [2, 1, 0]
+    assert features["share_Planes"].tolist() == [0.25, 0.0, 0.0]
+
+
+def test_customer_features_on_the_sample_database(dashboard, database):
+    features = build_customer_features()
+    orders = read_sql(database, """
+        SELECT o.customerNumber, COUNT(DISTINCT o.orderNumber) AS frequency,
+               SUM(od.quantityOrdered * od.priceEach) AS monetary
+        FROM orders o JOIN orderdetails od ON od.orderNumber = o.orderNumber
+        GROUP BY o.customerNumber;
+    """).set_index("customerNumber")
+
+    assert list(features.columns) == BASE_FEATURES + [f"share_{line}" for line in PRODUCT_LINES]
+    assert len(features) == 122 and features.index.is_unique
+    assert not features.isna().any().any()
+
+    buyers = features.loc[orders.index]
+    assert buyers["frequency"].tolist() == orders["frequency"].tolist()
+    np.testing.assert_allclose(buyers["monetary"], orders["monetary"])
+    np.testing.assert_allclose(buyers.filter(like="share_").sum(axis=1), 1.0)
+    assert buyers["recency_days"].min() == 0
+
+    no_orders = features.drop(orders.index)
+    assert len(no_orders) == 24
+    assert (no_orders["recency_days"] == NO_ORDER_RECENCY_DAYS).all()
+    assert (no_orders[["frequency", "monetary", "product_line_breadth"]] == 0).all().all()
+
+
+def test_churn_labels(dashboard, database):
+    customers = [103, 112, 119, 141, 125]
+    labels = build_churn_labels(customers, pd.Timestamp("2004-06-01"), horizon_days=365)
+    ordered_again = set(read_sql(database, """
+        SELECT DISTINCT customerNumber FROM orders WHERE orderDate > '2004-06-01' AND orderDate <= '2005-06-01';
+    """)["customerNumber"])
+
+    assert labels.name == "churned"
+    assert labels.index.tolist() == customers
+    assert labels.to_dict() == {customer: int(customer not in ordered_again) for customer in customers}
+    assert set(labels) == {0, 1}
+
+
+# --- Scores ---
+
+def test_train_and_score_every_customer(dashboard, database):
+    bundle = train_churn_model()
+    trained_on = read_sql(database, "SELECT COUNT(DISTINCT customerNumber) AS n FROM orders WHERE orderDate <= '2004-05-31';")
+
+    assert bundle["cutoff"] == "2004-05-31"
+    assert bundle["horizon_days"] == 365
+    assert bundle["feature_columns"] == BASE_FEATURES + [f"share_{line}" for line in PRODUCT_LINES]
+    assert bundle["metrics"]["n_customers"] == trained_on["n"].iloc[0]
+    assert 0.0 < bundle["metrics"]["churn_rate"] < 1.0
+
+    frame = churn_scores_frame(bundle)
+    assert list(frame.columns) == ["customerNumber", "churn_score", "recency_days", "frequency", "monetary"]
+    assert len(frame) == 122 and frame["customerNumber"].is_unique
+    # Customers without orders are not scored
+    assert frame["churn_score"].isna().sum() == 24
+    assert frame.loc[frame["frequency"] == 0, "churn_score"].isna().all()
+    assert frame["churn_score"].dropna().between(0.0, 1.0).all()
+
+
+def test_scores_tolerate_unseen_and_missing_product_lines(dashboard):
+    from sklearn.tree import DecisionTreeClassifier
+
+    features = build_customer_features()
+    columns = list(features.columns)
+    labels = (features["recency_days"] > 180).astype(int)
+    bundle = {"model": DecisionTreeClassifier(max_depth=3, random_state=0).fit(features.to_numpy(), labels), "feature_columns": columns}
+
+    shifted = features.drop(columns="share_Ships").assign(share_Rockets=0.5)
+    expected = score_customers(bundle, features.assign(share_Ships=0.0))
+    pd.testing.assert_frame_equal(score_customers(bundle, shifted), expected)
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from model.churn_windows import WINDOW_COLUMNS, refresh_churn_windows
+from utils.materialize import get_watermark
+
+
+def snapshot(connection) -> tuple[pd.DataFrame, pd.DataFrame]:
+    windows = pd.read_sql_query(
+        f"SELECT customerNumber, {', '.join(WINDOW_COLUMNS)} FROM churn_windows ORDER BY customerNumber;", connection
+    )
+    daily = pd.read_sql_query("SELECT * FROM churn_daily_activity ORDER BY customerNumber, day;", connection)
+    return windows, daily
+
+
+def assert_matches_full_rebuild(connection):
+    incremental = snapshot(connection)
+    refresh_churn_windows(connection, full=True)
+    for actual, expected in zip(incremental, snapshot(connection)):
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-9, atol=1e-6)
+
+
+def test_new_orders_inside_the_windows(connection, append_orders):
+    refresh_churn_windows(connection)
+    as_of = get_watermark(connection, "churn_as_of")
+    append_orders(connection, count=6)
+
+    report = refresh_churn_windows(connection)
+    assert report["mode"] == "incremental"
+    assert get_watermark(connection, "churn_as_of") == as_of
+    assert_matches_full_rebuild(connection)
+
+
+def test_windows_slide_with_the_reference_day(connection, append_orders):
+    refresh_churn_windows(connection)
+    # Short, medium and long steps: days enter and leave each of the 30 / 90 / 365 day windows
+    for days_later in (10, 45, 200):
+        append_orders(connection, count=4, days_later=days_later)
+        report = refresh_churn_windows(connection)
+        assert report["mode"] == "incremental"
+        assert report["as_of"] > report["previous_as_of"]
+    assert_matches_full_rebuild(connection)
+
+
+def test_new_customer_gets_a_window_row(connection, append_orders):
+    refresh_churn_windows(connection)
+    append_orders(connection, count=2, days_later=5, new_customer=True)
+    refresh_churn_windows(connection)
+
+    customer = connection.execute("SELECT MAX(customerNumber) FROM customers;").fetchone()[0]
+    orders_30 = connection.execute("SELECT orders_30 FROM churn_windows WHERE customerNumber = ?;", (customer,)).fetchone()
+    assert orders_30 == (2,)
+    assert_matches_full_rebuild(connection)
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from utils.columnar import fetch_columnar, fetch_rows, iter_columnar
+from utils.engine_factory import create_sqlite_engine
+
+QUERIES = {
+    "wide join": """
+        SELECT o.orderNumber, o.orderDate, o.status, od.productCode, od.quantityOrdered, od.priceEach
+        FROM orders o JOIN orderdetails od ON od.orderNumber = o.orderNumber
+        ORDER BY o.orderNumber, od.orderLineNumber
+    """,
+    # Text columns with NULLs (addressLine2, state) and a float column
+    "nullable columns": "SELECT customerNumber, addressLine2, state, creditLimit FROM customers ORDER BY customerNumber",
+    "aggregate": "SELECT productLine, COUNT(*) AS n, AVG(buyPrice) AS avg_price FROM products GROUP BY productLine",
+    "empty": "SELECT customerNumber, customerName FROM customers WHERE customerNumber < 0",
+}
+
+
+@pytest.fixture
+def engine(database):
+    engine = create_sqlite_engine(database)
+    yield engine
+    engine.dispose()
+
+
+def read_sql(engine, sql: str) -> pd.DataFrame:
+    with engine.connect() as connection:
+        return pd.read_sql_query(text(sql), connection)
+
+
+@pytest.mark.parametrize("name", QUERIES)
+@pytest.mark.parametrize("batch_size", [7, 50_000])
+def test_columnar_matches_read_sql(engine, name, batch_size):
+    with engine.connect() as connection:
+        actual = fetch_columnar(connection.execute(text(QUERIES[name])), batch_size=batch_size)
+    expected = read_sql(engine, QUERIES[name])
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=len(expected) > 0)
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_columnar_matches_rows_path(engine, name):
+    with engine.connect() as connection:
+        actual = fetch_columnar(connection.execute(text(QUERIES[name])), batch_size=100)
+        expected = fetch_rows(connection.execute(text(QUERIES[name])))
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=len(expected) > 0)
+
+
+def test_declared_dtypes(engine):
+    sql = QUERIES["nullable columns"]
+    dtypes = {"customerNumber": "int32", "creditLimit": "float32", "state": "string"}
+    with engine.connect() as connection:
+        actual = fetch_columnar(connection.execute(text(sql)), dtypes=dtypes, batch_size=10)
+    expected = read_sql(engine, sql).astype(dtypes)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_rows_buffered_by_the_result_are_kept(engine):
+    # yield_per makes the Result read ahead into its own buffer; a caller peeking
+    # at the first row leaves the rest of that buffer unread on the DBAPI cursor
+    sql = QUERIES["wide join"]
+    with engine.connect() as connection:
+        result = connection.execute(text(sql)).yield_per(10)
+        first = result.fetchone()
+        rest = pd.concat(list(iter_columnar(result, batch_size=10)), ignore_index=True)
+    expected = read_sql(engine, sql)
+    assert tuple(first) == tuple(expected.iloc[0])
+    pd.testing.assert_frame_equal(rest, expected.iloc[1:].reset_index(drop=True))
+
+
+def test_stream_results_chunks(engine):
+    sql = QUERIES["wide join"]
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=100).execute(text(sql))
+        chunks = list(iter_columnar(result, batch_size=100))
+    expected = read_sql(engine, sql)
+    assert [len(chunk) for chunk in chunks[:-1]] == [100] * (len(chunks) - 1)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
@@ -0,0 +1,98 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.credit_risk import (
+    LIMIT_RISK_CAP,
+    REQUEST_COLUMNS,
+    SCORE_BOUNDS,
+    customer_book_requests,
+    score_credit_requests,
+)
+
+SCORE_COLUMNS = ['base_risk', 'limit_risk', 'history_adjustment', 'risk_score', 'decision', 'suggested_limit']
+
+
+def requests_frame(rows: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=['request_id'] + REQUEST_COLUMNS)
+
+
+# --- Request scoring ---
+
+def test_score_breakdown_and_decisions():
+    scored = score_credit_requests(requests_frame([
+        (1, 'USA', 150000, 75000, 'Excellent (Always on time)'),
+        (2, 'Japan', 80000, 60000, 'Poor'),
+        (3, 'France', 100000, 40000, 'good'),
+        (4, 'Norway', 0, 0, 'unknown'),
+        (5, 'Italy', None, 100, 'Excellent'),
+    ]))
+
+    assert list(scored.columns) == ['request_id'] + REQUEST_COLUMNS + SCORE_COLUMNS
+    assert scored['request_id'].tolist() == [1, 2, 3, 4, 5]
+    np.testing.assert_allclose(scored['base_risk'], [0.05, 0.40, 0.10, 0.50, 0.20])
+    np.testing.assert_allclose(scored['limit_risk'], [0.25, 0.375, 0.20, 0.0, LIMIT_RISK_CAP])
+    np.testing.assert_allclose(scored['history_adjustment'], [-0.10, 0.20, 0.0, 0.0, -0.10])
+    np.testing.assert_allclose(scored['risk_score'], [0.20, SCORE_BOUNDS[1], 0.30, 0.50, 0.50])
+    assert scored['decision'].tolist() == ['LOW Risk', 'HIGH Risk', 'MODERATE Risk', 'MODERATE Risk', 'MODERATE Risk']
+    np.testing.assert_allclose(scored['suggested_limit'], [75000, 0, 30000, 0, 75])
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(ValueError, match="payment_history"):
+        score_credit_requests(pd.DataFrame({'country': ['USA'], 'annual_revenue': [1], 'requested_credit_limit': [1]}))
+
+
+def test_noise_is_seeded_and_bounded():
+    requests = requests_frame([(i, 'UK', 100000, 10000 * i, 'Good') for i in range(50)])
+    exact = score_credit_requests(requests)['risk_score']
+    noisy = score_credit_requests(requests, noise=0.05, seed=7)['risk_score']
+
+    pd.testing.assert_series_equal(noisy, score_credit_requests(requests, noise=0.05, seed=7)['risk_score'])
+    assert (noisy - exact).abs().max() <= 0.05 + 1e-12
+    assert not np.allclose(noisy, exact)
+
+
+# --- Customer book ---
+
+def test_customer_book_scores(dashboard):
+    requests = customer_book_requests()
+    scored = score_credit_requests(requests)
+
+    assert list(requests.columns) == ['customerNumber', 'customerName'] + REQUEST_COLUMNS
+    assert list(scored.columns) == list(requests.columns) + SCORE_COLUMNS
+    assert len(scored) == 122 and scored['customerNumber'].is_unique
+    assert set(requests['payment_history']) == {'Excellent', 'Good', 'Poor'}
+    assert scored['risk_score'].between(*SCORE_BOUNDS).all()
+    assert set(scored['decision']) <= {'LOW Risk', 'MODERATE Risk', 'HIGH Risk'}
+
+    # Customers without orders have no revenue proxy: any limit is maximal limit risk
+    no_orders = requests['annual_revenue'] == 0
+    assert no_orders.sum() == 24
+    with_limit = no_orders & (requests['requested_credit_limit'] > 0)
+    assert (scored.loc[with_limit, 'limit_risk'] == LIMIT_RISK_CAP).all()
+    assert (scored.loc[no_orders & ~with_limit, 'limit_risk'] == 0).all()
+
+
+def test_customer_book_payment_history(dashboard, database):
+    connection = sqlite3.connect(database)
+    paid = pd.read_sql_query("""
+        SELECT o.customerNumber, o.ordered, COALESCE(p.paid, 0) AS paid
+        FROM (
+            SELECT ord.customerNumber, SUM(od.quantityOrdered * od.priceEach) AS ordered
+            FROM orders ord JOIN orderdetails od ON od.orderNumber = ord.orderNumber
+            GROUP BY ord.customerNumber
+        ) o
+        LEFT JOIN (SELECT customerNumber, SUM(amount) AS paid FROM payments GROUP BY customerNumber) p
+            ON p.customerNumber = o.customerNumber;
+    """, connection).set_index("customerNumber")
+    connection.close()
+    share = paid["paid"] / paid["ordered"]
+    expected = np.select([share >= 0.98, share >= 0.90], ['Excellent', 'Good'], 'Poor')
+
+    history = customer_book_requests().set_index("customerNumber")["payment_history"]
+    assert history.loc[paid.index].tolist() == expected.tolist()
+    # No orders: nothing unpaid
+    assert (history.drop(paid.index) == 'Excellent').all()
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+ORDER_LINES = """
+    SELECT orderNumber, productCode, quantityOrdered, priceEach
+    FROM orderdetails
+    WHERE quantityOrdered >= :min_quantity
+    ORDER BY orderNumber, orderLineNumber
+"""
+
+
+# --- Chunked reads ---
+
+@pytest.mark.parametrize("chunksize", [1000, 50_000])
+def test_iter_data_chunks_add_up_to_the_full_result(dashboard, chunksize):
+    params = {"min_quantity": 20}
+    chunks = list(dashboard.iter_data(ORDER_LINES, params=params, chunksize=chunksize))
+    expected = dashboard.get_data(ORDER_LINES, params=params, use_cache=False)
+
+    assert len(expected) > 1000
+    assert all(len(chunk) <= chunksize for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+def test_iter_data_declared_dtypes(dashboard):
+    dtypes = {"quantityOrdered": "int16", "priceEach": "float32"}
+    chunks = list(dashboard.iter_data(ORDER_LINES, params={"min_quantity": 0}, chunksize=500, dtypes=dtypes))
+    assert {str(chunk.dtypes["quantityOrdered"]) for chunk in chunks} == {"int16"}
+    assert sum(len(chunk) for chunk in chunks) == 2996
+
+
+# --- Analytical mirror ---
+
+@pytest.fixture
+def analytical(dashboard, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_ANALYTICAL_ENGINE", "duckdb")
+    return dashboard
+
+
+def test_mirror_is_built_in_the_background(analytical):
+    expected = analytical.run_query("eda_credit_limit_range")
+    # The first request starts the copy without waiting for it (SQLite answers)
+    builder = analytical.get_mirror_builder()
+    assert builder.wait(timeout=60)
+
+    mirror = analytical.get_analytical_mirror()
+    assert mirror is not None and mirror.tables["customers"] == 122
+    pd.testing.assert_frame_equal(analytical.run_query("eda_credit_limit_range"), expected, check_dtype=False)
+
+
+def test_mirror_is_rebuilt_after_a_data_change(analytical, connection, append_orders):
+    builder = analytical.get_mirror_builder()
+    analytical.get_analytical_mirror()
+    builder.wait(timeout=60)
+    assert analytical.get_analytical_mirror().tables["orders"] == 326
+
+    append_orders(connection, count=3)
+    # The stale copy is not served while the new one is built
+    assert analytical.get_analytical_mirror() is None
+    builder.wait(timeout=60)
+    assert analytical.get_analytical_mirror().tables["orders"] == 329
+
+
+def test_large_databases_are_not_mirrored(analytical, monkeypatch):
+    monkeypatch.setattr(analytical, "ANALYTICAL_MAX_BYTES", 1024)
+    analytical.get_mirror_builder.clear()
+
+    assert analytical.get_analytical_mirror() is None
+    assert analytical.get_mirror_builder().wait(timeout=0)
+    assert analytical.get_analytical_mirror() is None
+    assert "mirror limit" in analytical.get_mirror_builder().last_error
+    assert not analytical.run_query("eda_credit_limit_range").empty
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils import disk_cache  # noqa: E402
+from utils.disk_cache import DiskResultCache  # noqa: E402
+
+VERSION = ("db", 1)
+
+
+def frame(n: int = 1000, value: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(value, value + n), "b": [f"row {i}" for i in range(n)]})
+
+
+def result_files(directory) -> list[str]:
+    return sorted(name for name in os.listdir(directory) if name.endswith(disk_cache.SUFFIX))
+
+
+def tmp_files(directory) -> list[str]:
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+@pytest.fixture
+def cache(tmp_path) -> DiskResultCache:
+    return DiskResultCache(str(tmp_path / "results"), max_bytes=1 << 30, min_seconds=0)
+
+
+def test_round_trip_across_instances(cache):
+    cache.put(("q",), VERSION, frame())
+    reopened = DiskResultCache(cache.directory, max_bytes=cache.max_bytes)
+
+    pd.testing.assert_frame_equal(reopened.get(("q",), VERSION), frame())
+    assert reopened.current_bytes == cache.current_bytes > 0
+    assert reopened.stats()["hits"] == 1
+
+
+def test_new_version_misses(cache):
+    cache.put(("q",), VERSION, frame())
+    assert cache.get(("q",), ("db", 2)) is None
+    assert cache.get(("other",), VERSION) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_ttl_expires_by_write_time(cache):
+    cache.put(("q",), VERSION, frame())
+    path = cache.path_for(("q",), VERSION)
+    written = time.time() - 120
+    os.utime(path, (written, written))
+
+    assert cache.get(("q",), VERSION, ttl_seconds=600) is not None
+    assert cache.get(("q",), VERSION, ttl_seconds=60) is None
+    assert not os.path.exists(path)
+    assert cache.stats()["expirations"] == 1
+
+
+# --- Atomic writes ---
+
+def test_write_leaves_no_temporary_files(cache):
+    cache.put(("q",), VERSION, frame())
+    assert tmp_files(cache.directory) == []
+    assert result_files(cache.directory) == [os.path.basename(cache.path_for(("q",), VERSION))]
+
+
+def test_failed_write_leaves_no_partial_file(cache, monkeypatch):
+    def fail(*_):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(disk_cache.os, "replace", fail)
+    cache.put(("q",), VERSION, frame())
+
+    assert os.listdir(cache.directory) == []
+    assert cache.get(("q",), VERSION) is None
+    assert cache.stats()["errors"] == 1
+    assert cache.current_bytes == 0
+
+
+def test_concurrent_writers_and_readers_never_see_partial_files(cache):
+    key, expected = ("q",), frame(20_000)
+    failures = []
+
+    def write():
+        for _ in range(10):
+            cache.put(key, VERSION, expected)
+
+    def read():
+        for _ in range(50):
+            df = cache.get(key, VERSION)
+            if df is not None and not df.equals(expected):
+                failures.append(df)
+
+    threads = [threading.Thread(target=write) for _ in range(3)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    assert cache.stats()["errors"] == 0
+    assert tmp_files(cache.directory) == []
+    assert len(result_files(cache.directory)) == 1
+
+
+def test_unreadable_file_is_dropped(cache):
+    path = cache.path_for(("q",), VERSION)
+    with open(path, "wb") as f:
+        f.write(b"not an arrow file")
+
+    assert cache.get(("q",), VERSION) is None
+    assert not os.path.exists(path)
+    assert cache.stats()["errors"] == 1
+
+
+def test_stale_temporary_files_are_swept(cache):
+    stale, fresh = (os.path.join(cache.directory, name) for name in ("a.arrow.1.tmp", "b.arrow.2.tmp"))
+    for path in (stale, fresh):
+        open(path, "wb").close()
+    old = time.time() - disk_cache.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    cache.evict()
+    assert tmp_files(cache.directory) == ["b.arrow.2.tmp"]
+
+
+# --- Eviction ---
+
+def test_evicts_least_recently_read_files(tmp_path):
+    probe = DiskResultCache(str(tmp_path / "probe"), max_bytes=1 << 30, min_seconds=0)
+    probe.put(("q",), VERSION, frame(value=0))
+    size = probe.current_bytes
+
+    cache = DiskResultCache(str(tmp_path / "results"), max_bytes=int(size * 3.5), min_seconds=0)
+    now = time.time()
+    for age, key in enumerate("abc"):
+        cache.put((key,), VERSION, frame(value=ord(key)))
+        # Oldest access first: a, b, c
+        os.utime(cache.path_for((key,), VERSION), (now - 100 + age, now))
+    cache.get(("a",), VERSION)
+    cache.put(("d",), VERSION, frame(value=ord("d")))
+
+    remaining = {key for key in "abcd" if os.path.exists(cache.path_for((key,), VERSION))}
+    assert remaining == {"a", "c", "d"}
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes <= cache.max_bytes * disk_cache.EVICT_TO
+
+
+def test_frame_larger_than_budget_is_skipped(tmp_path):
+    cache = DiskResultCache(str(tmp_path / "results"), max_bytes=1024, min_seconds=0)
+    cache.put(("q",), VERSION, frame(10_000))
+    assert os.listdir(cache.directory) == []
+    assert cache.stats()["writes"] == 0
+
+
+def test_clear_removes_result_files(cache):
+    for key in "ab":
+        cache.put((key,), VERSION, frame())
+    cache.clear()
+    assert result_files(cache.directory) == []
+    assert cache.current_bytes == 0
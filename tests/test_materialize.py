@@ -0,0 +1,78 @@
+import pandas as pd
+
+from utils.materialize import SUMMARY_TABLES, get_watermark, refresh_summaries
+
+KEYS = {
+    "summary_product_line_sales": ["productLine"],
+    "summary_country_customers": ["country"],
+    "summary_customer_product_line": ["customerNumber", "productLine"],
+}
+
+
+def snapshot(connection) -> dict[str, pd.DataFrame]:
+    return {
+        table: pd.read_sql_query(f"SELECT * FROM {table};", connection).sort_values(KEYS[table], ignore_index=True)
+        for table in SUMMARY_TABLES
+    }
+
+
+def assert_same_tables(actual: dict, expected: dict):
+    for table in SUMMARY_TABLES:
+        pd.testing.assert_frame_equal(actual[table], expected[table], check_exact=False, rtol=1e-9)
+
+
+def test_first_refresh_builds_in_full(connection):
+    report = refresh_summaries(connection)
+    assert report["mode"] == "full"
+    assert get_watermark(connection, "orderNumber") == connection.execute("SELECT MAX(orderNumber) FROM orders;").fetchone()[0]
+    assert all(len(df) for df in snapshot(connection).values())
+
+
+def test_incremental_refresh_matches_full_rebuild(connection, append_orders):
+    refresh_summaries(connection)
+    append_orders(connection, count=8)
+    append_orders(connection, count=3, new_customer=True)
+
+    report = refresh_summaries(connection)
+    assert report["mode"] == "incremental"
+    incremental = snapshot(connection)
+
+    refresh_summaries(connection, full=True)
+    assert_same_tables(incremental, snapshot(connection))
+
+
+def test_upserts_fold_into_existing_rows(connection, append_orders):
+    refresh_summaries(connection)
+    before = snapshot(connection)["summary_product_line_sales"].set_index("productLine")
+    added = append_orders(connection, count=1)
+    added_quantity = connection.execute(
+        "SELECT p.productLine, SUM(od.quantityOrdered) FROM orderdetails od "
+        "JOIN products p ON od.productCode = p.productCode WHERE od.orderNumber = ? GROUP BY p.productLine;",
+        (added[0],),
+    ).fetchall()
+
+    refresh_summaries(connection)
+    after = snapshot(connection)["summary_product_line_sales"].set_index("productLine")
+    assert after.index.equals(before.index)
+    for product_line, quantity in added_quantity:
+        assert after.at[product_line, "TotalQuantitySold"] == before.at[product_line, "TotalQuantitySold"] + quantity
+
+
+def test_refresh_without_new_rows_changes_nothing(connection):
+    refresh_summaries(connection)
+    before = snapshot(connection)
+    assert refresh_summaries(connection)["mode"] == "incremental"
+    assert_same_tables(snapshot(connection), before)
+
+
+def test_shrunk_source_falls_back_to_full_rebuild(connection, append_orders):
+    added = append_orders(connection, count=2)
+    refresh_summaries(connection)
+    with connection:
+        connection.execute("DELETE FROM orderdetails WHERE orderNumber >= ?;", (added[0],))
+        connection.execute("DELETE FROM orders WHERE orderNumber >= ?;", (added[0],))
+
+    assert refresh_summaries(connection)["mode"] == "full"
+    rebuilt = snapshot(connection)
+    refresh_summaries(connection, full=True)
+    assert_same_tables(rebuilt, snapshot(connection))
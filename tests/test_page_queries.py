@@ -0,0 +1,86 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.page_queries import PageQueries
+
+CUSTOMERS = (103, 112, 114, 119, 121, 124)
+BAD_SQL = "SELECT missing_column FROM customers;"
+
+
+def page_batch(db_connector, max_concurrency: int) -> PageQueries:
+    """A page's worth of registry queries, with one customer profile per key."""
+    batch = PageQueries("test", max_concurrency=max_concurrency)
+    batch.submit("count", db_connector.run_query, "customer_count")
+    batch.submit("countries", db_connector.run_query, "eda_country_counts")
+    batch.submit("credit", db_connector.run_query, "eda_credit_limit_bins", lo=0.0, width=25000.0)
+    for customer in CUSTOMERS:
+        batch.submit(f"profile_{customer}", db_connector.run_query, "customer_profile", customer_id=customer)
+    return batch
+
+
+def expected_results(db_connector) -> dict[str, pd.DataFrame]:
+    """The page's results run one by one on the script thread (cache cleared afterwards)."""
+    results = dict(page_batch(db_connector, max_concurrency=0).as_completed())
+    db_connector.get_query_cache().clear()
+    return results
+
+
+@pytest.mark.parametrize("max_concurrency", [0, 1, 4, 8])
+def test_results_land_under_their_keys(dashboard, max_concurrency):
+    expected = expected_results(dashboard)
+    batch = page_batch(dashboard, max_concurrency)
+    results = dict(batch.as_completed())
+
+    assert results.keys() == expected.keys()
+    for key, df in results.items():
+        assert not df.empty, key
+        assert batch.errors(key) == []
+        pd.testing.assert_frame_equal(df, expected[key])
+    for customer in CUSTOMERS:
+        assert results[f"profile_{customer}"]["customerNumber"].tolist() == [customer]
+
+
+@pytest.mark.parametrize("max_concurrency", [0, 4])
+def test_failing_query_keeps_the_others(dashboard, max_concurrency):
+    expected = expected_results(dashboard)
+    batch = page_batch(dashboard, max_concurrency)
+    batch.submit("broken", dashboard.get_data, BAD_SQL)
+    results = dict(batch.as_completed())
+
+    assert results.keys() == expected.keys() | {"broken"}
+    assert results["broken"].empty
+    assert len(batch.errors("broken")) == 1
+    assert "missing_column" in batch.errors("broken")[0]
+    for key in expected:
+        assert batch.errors(key) == []
+        pd.testing.assert_frame_equal(results[key], expected[key])
+
+
+def test_queries_overlap(dashboard):
+    # Two queries that each wait for the other can only finish if they run at the same time
+    barrier = threading.Barrier(2, timeout=10)
+
+    def query(name):
+        barrier.wait()
+        return dashboard.run_query(name)
+
+    batch = PageQueries("test", max_concurrency=2)
+    batch.submit("count", query, "customer_count")
+    batch.submit("countries", query, "eda_country_counts")
+    assert {key for key, df in batch.as_completed() if not df.empty} == {"count", "countries"}
+
+
+def test_exceptions_are_raised_in_the_page(dashboard):
+    batch = PageQueries("test", max_concurrency=2)
+    batch.submit("missing_params", dashboard.run_query, "customer_profile")
+    with pytest.raises(ValueError, match="missing parameters"):
+        dict(batch.as_completed())
+
+
+def test_duplicate_keys_are_rejected():
+    batch = PageQueries("test", max_concurrency=0)
+    batch.submit("a", len, "x")
+    with pytest.raises(ValueError, match="Duplicate"):
+        batch.submit("a", len, "y")
@@ -0,0 +1,127 @@
+import pandas as pd
+import pytest
+
+from utils import query_cache
+from utils.query_cache import QueryCache, frame_nbytes, make_cache_key, normalize_sql
+
+
+def frame(n: int = 100, value: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(value, value + n)})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls time.monotonic as seen by the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+# --- Keys ---
+
+def test_normalize_sql_collapses_whitespace_and_semicolons():
+    assert normalize_sql("SELECT  *\n\tFROM orders ;; ") == "SELECT * FROM orders"
+    assert make_cache_key("SELECT 1;") == make_cache_key("  SELECT\n1 ")
+
+
+def test_normalize_sql_keeps_quoted_literals():
+    assert normalize_sql("SELECT *  FROM t WHERE name = 'a  b'") == "SELECT * FROM t WHERE name = 'a  b'"
+    assert normalize_sql("SELECT 'it''s  here',  \"my  col\"") == "SELECT 'it''s  here', \"my  col\""
+    assert make_cache_key("SELECT 'a b'") != make_cache_key("SELECT 'a  b'")
+
+
+def test_cache_key_includes_params_and_dtypes():
+    assert make_cache_key("SELECT :x", {"x": 1}) != make_cache_key("SELECT :x", {"x": 2})
+    assert make_cache_key("SELECT :x", {"x": 1, "y": 2}) == make_cache_key("SELECT :x", {"y": 2, "x": 1})
+    assert make_cache_key("SELECT 1", dtypes={"a": "int64"}) != make_cache_key("SELECT 1")
+
+
+# --- LRU / byte budget ---
+
+def test_evicts_least_recently_used_within_byte_budget():
+    size = frame_nbytes(frame())
+    cache = QueryCache(max_bytes=size * 3)
+    for key in "abc":
+        cache.put(key, frame())
+    cache.get("a")
+    cache.put("d", frame())
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes == size * 3
+
+
+def test_contains_does_not_refresh_lru_order():
+    cache = QueryCache(max_bytes=frame_nbytes(frame()) * 2)
+    cache.put("a", frame())
+    cache.put("b", frame())
+    assert cache.contains("a")
+    cache.put("c", frame())
+    assert not cache.contains("a")
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+
+def test_oversized_frame_is_not_stored():
+    cache = QueryCache(max_bytes=frame_nbytes(frame()) * 2)
+    cache.put("small", frame())
+    cache.put("huge", frame(10_000))
+    assert cache.get("huge") is None
+    assert cache.get("small") is not None
+
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = QueryCache()
+    cache.put("a", frame(100))
+    cache.put("a", frame(200))
+    assert cache.current_bytes == frame_nbytes(frame(200))
+    assert cache.stats()["entries"] == 1
+
+
+def test_returns_copies():
+    cache = QueryCache()
+    df = frame()
+    cache.put("a", df)
+    df.loc[0, "a"] = -1
+    copy = cache.get("a")
+    copy.loc[1, "a"] = -1
+    assert cache.get("a").equals(frame())
+
+
+# --- TTL ---
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(ttl_seconds=60)
+    cache.put("a", frame())
+    cache.put("b", frame(), ttl_seconds=600)
+
+    clock[0] += 61
+    assert not cache.contains("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.stats()["expirations"] == 1
+    assert cache.current_bytes == frame_nbytes(frame())
+
+
+# --- Version invalidation ---
+
+def test_version_change_drops_every_entry():
+    version = [1]
+    cache = QueryCache(version_probe=lambda: version[0])
+    cache.put("a", frame())
+    assert cache.get("a") is not None
+
+    version[0] = 2
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_sqlite_probe_sees_writes_from_other_connections(connection, database):
+    probe = query_cache.SQLiteVersionProbe(database)
+    before, file_before = probe(), probe.file_version()
+    with connection:
+        connection.execute("UPDATE customers SET creditLimit = creditLimit + 1 WHERE customerNumber = 103;")
+    assert probe() != before
+    assert probe.file_version() != file_before
+    assert probe() == probe()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.recommender import ItemKNNRecommender
+from utils.queries import get_query
+
+
+def interactions(connection, after_order: int = 0, through_order: int | None = None) -> pd.DataFrame:
+    """reco_interactions for orders in (after_order, through_order]."""
+    sql = get_query("reco_interactions").sql
+    bound = "WHERE o.orderNumber > :after_order"
+    assert bound in sql
+    df = pd.read_sql_query(
+        sql.replace(bound, f"{bound} AND o.orderNumber <= :through_order"),
+        connection,
+        params={"after_order": after_order, "through_order": through_order or 1 << 62},
+    )
+    assert len(df)
+    return df
+
+
+def order_high(connection) -> int:
+    return connection.execute("SELECT MAX(orderNumber) FROM orders;").fetchone()[0]
+
+
+def assert_same_model(actual: ItemKNNRecommender, expected: ItemKNNRecommender):
+    assert set(actual.customer_ids) == set(expected.customer_ids)
+    assert set(actual.product_codes) == set(expected.product_codes)
+    for product in expected.product_codes:
+        got, want = actual.similar_products(product), expected.similar_products(product)
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-5)
+        assert {p for p, _ in got} == {p for p, _ in want}
+    for customer in expected.customer_ids:
+        got, want = actual.recommend(customer), expected.recommend(customer)
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-4)
+        assert {p for p, _ in got} == {p for p, _ in want}
+
+
+@pytest.mark.parametrize("new_orders", [1, 10])
+def test_update_matches_full_build(connection, append_orders, new_orders):
+    watermark = order_high(connection)
+    model = ItemKNNRecommender.fit(interactions(connection), watermark)
+    append_orders(connection, count=new_orders)
+    append_orders(connection, count=2, new_customer=True)
+
+    report = model.update(interactions(connection, after_order=watermark), order_high(connection))
+    assert report["products"] > 0 and report["customers"] > 0
+    assert model.order_watermark == order_high(connection)
+    assert_same_model(model, ItemKNNRecommender.fit(interactions(connection), order_high(connection)))
+
+
+def test_successive_updates_match_full_build(connection):
+    high = order_high(connection)
+    # Replay the last 30 orders of the sample in batches of 10
+    start = high - 30
+    model = ItemKNNRecommender.fit(interactions(connection, through_order=start), start)
+    for through in range(start + 10, high + 1, 10):
+        model.update(interactions(connection, after_order=through - 10, through_order=through), through)
+    assert_same_model(model, ItemKNNRecommender.fit(interactions(connection), high))
+
+
+def test_empty_update_only_moves_the_watermark(connection):
+    high = order_high(connection)
+    model = ItemKNNRecommender.fit(interactions(connection), high)
+    before = model.recommendations_frame()
+
+    report = model.update(interactions(connection).iloc[:0], high + 5)
+    assert report == {"customers": 0, "products": 0, "rescored": 0}
+    assert model.order_watermark == high + 5
+    pd.testing.assert_frame_equal(model.recommendations_frame(), before)
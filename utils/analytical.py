@@ -0,0 +1,180 @@
+"""Optional analytical execution mode: aggregate queries on an in-process DuckDB mirror.
+
+SQLite runs the EDA / feature GROUP BY scans row at a time on one core. With
+`analytical_engine = "duckdb"` in the [database] secrets section (or
+DASHBOARD_DB_ANALYTICAL_ENGINE=duckdb), the SQLite tables are mirrored into
+an in-memory DuckDB database: columnar, vectorized and multi-threaded. Queries
+registered with `analytical=True` then run there, while point lookups and
+everything else stay on SQLite.
+
+Copying the tables takes time and memory that grow with the database (about
+4 s and 500 MB for the 1M-row benchmark database), so MirrorBuilder makes the
+copy on a background thread whenever the SQLite file changes; queries keep
+running on SQLite until it is ready (see db_connector.get_analytical_mirror).
+
+Column types follow the SQLite declarations: integers and floats keep their
+numeric types, and TEXT / DATE columns stay strings (SQLite stores dates as
+text). Results therefore compare and sort the same way on both engines.
+"""
+import importlib.util
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ANALYTICAL_ENGINES = ("duckdb",)
+# duckdb is an optional dependency (the "analytical" extra)
+INSTALL_HINT = "pip install duckdb (or poetry install --extras analytical)"
+
+# Rows copied per batch while mirroring (bounded memory for large tables)
+MIRROR_CHUNK_ROWS = 500_000
+
+# :name bind parameters (not :: casts) -> DuckDB's $name
+_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+
+def engine_available(engine: str) -> bool:
+    """True if the package behind an analytical engine can be imported (without importing it)."""
+    return importlib.util.find_spec(engine) is not None
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError(f"The analytical mode needs duckdb: {INSTALL_HINT}") from e
+    return duckdb
+
+
+def _column_type(declared: str) -> str:
+    """DuckDB type for a SQLite declared column type."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+def to_duckdb_sql(sql: str) -> str:
+    """Rewrites :name bind parameters as $name."""
+    return _PARAM.sub(r"$\1", sql)
+
+
+class AnalyticalMirror:
+    """In-memory DuckDB copy of every table in a SQLite database."""
+
+    def __init__(self, sqlite_path: str, chunk_rows: int = MIRROR_CHUNK_ROWS):
+        duckdb = _duckdb()
+        self.sqlite_path = sqlite_path
+        self.connection = duckdb.connect(":memory:")
+        self.tables: dict[str, int] = {}
+        start = time.perf_counter()
+        source = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+        try:
+            names = [row[0] for row in source.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';"
+            )]
+            for table in names:
+                self.tables[table] = self._copy_table(source, table, chunk_rows)
+        finally:
+            source.close()
+        self.build_seconds = time.perf_counter() - start
+
+    def _copy_table(self, source: sqlite3.Connection, table: str, chunk_rows: int) -> int:
+        columns = [(row[1], _column_type(row[2])) for row in source.execute(f'PRAGMA table_info("{table}");')]
+        names = [name for name, _ in columns]
+        definitions = ", ".join(f'"{name}" {kind}' for name, kind in columns)
+        self.connection.execute(f'CREATE TABLE "{table}" ({definitions});')
+        rows = 0
+        cursor = source.execute(f'SELECT * FROM "{table}";')
+        while batch := cursor.fetchmany(chunk_rows):
+            chunk = pd.DataFrame.from_records(batch, columns=names)
+            self.connection.register("mirror_chunk", chunk)
+            self.connection.execute(f'INSERT INTO "{table}" SELECT * FROM mirror_chunk;')
+            self.connection.unregister("mirror_chunk")
+            rows += len(chunk)
+        return rows
+
+    def query(self, sql: str, params: dict | None = None) -> pd.DataFrame:
+        """Runs SQLite-style SQL (with :name parameters) on the mirror and returns a DataFrame."""
+        used = set(_PARAM.findall(sql))
+        sql = to_duckdb_sql(sql)
+        # A cursor is a separate connection to the same database, safe to use from this thread
+        cursor = self.connection.cursor()
+        try:
+            result = cursor.execute(sql, {name: value for name, value in (params or {}).items() if name in used})
+            types = [str(column[1]) for column in result.description]
+            df = result.df()
+        finally:
+            cursor.close()
+        # SUM over integers is HUGEINT (128-bit), which pandas receives as float; SQLite returns int64
+        for name, kind in zip(df.columns, types):
+            if kind == "HUGEINT" and not df[name].hasnans:
+                df[name] = df[name].astype("int64")
+        return df
+
+    def stats(self) -> dict:
+        return {"engine": "duckdb", "tables": dict(self.tables), "build_seconds": self.build_seconds}
+
+
+class MirrorBuilder:
+    """Keeps an AnalyticalMirror of the current data, built on a background thread.
+
+    `get` never blocks: it returns the mirror of the requested data version, or
+    None while that mirror is being built (callers then run on SQLite). A build
+    that fails is not retried for the same version, and files larger than
+    `max_bytes` are not mirrored at all.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self.last_error: str | None = None
+        self._mirror: AnalyticalMirror | None = None
+        self._key: tuple | None = None
+        self._failed: tuple | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def get(self, sqlite_path: str, data_version: tuple) -> AnalyticalMirror | None:
+        """The mirror of `data_version`, or None (starting a build if none is running)."""
+        key = (sqlite_path, data_version)
+        with self._lock:
+            if self._key == key:
+                return self._mirror
+            # The old copy would answer with stale data; free its memory before building the next one
+            self._mirror = self._key = None
+            if key == self._failed or (self._thread is not None and self._thread.is_alive()):
+                return None
+            if self.max_bytes and os.path.getsize(sqlite_path) > self.max_bytes:
+                self._failed = key
+                self.last_error = f"{sqlite_path} is larger than the {self.max_bytes // 2**20} MB mirror limit"
+                logger.warning("Analytical mirror skipped: %s", self.last_error)
+                return None
+            self._thread = threading.Thread(target=self._build, args=(key,), name="analytical-mirror", daemon=True)
+            self._thread.start()
+            return None
+
+    def _build(self, key: tuple):
+        try:
+            mirror = AnalyticalMirror(key[0])
+        except Exception as e:
+            logger.warning("Analytical mirror build failed: %s", e)
+            with self._lock:
+                self._failed, self.last_error = key, str(e)
+            return
+        with self._lock:
+            self._mirror, self._key, self.last_error = mirror, key, None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for a running build; True if none is running afterwards."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return thread is None or not thread.is_alive()
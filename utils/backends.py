@@ -0,0 +1,180 @@
+import os
+from dataclasses import dataclass, fields, replace
+
+from sqlalchemy import URL, create_engine, event
+from sqlalchemy.engine import Engine
+
+from utils.analytical import ANALYTICAL_ENGINES, INSTALL_HINT, engine_available
+from utils.engine_factory import EngineConfig, create_sqlite_engine
+
+SUPPORTED_BACKENDS = ("sqlite", "mysql", "mssql")
+
+# Per-backend pool defaults: remote warehouses keep fewer, longer-lived connections
+# and validate them before use (pre-ping) because idle connections get dropped.
+POOL_DEFAULTS = {
+    "sqlite": {"pool_size": 8, "max_overflow": 8, "pool_pre_ping": False},
+    "mysql": {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": True},
+    "mssql": {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": True},
+}
+
+# Lists table names on each backend (used to detect optional summary tables)
+LIST_TABLES_SQL = {
+    "sqlite": "SELECT name FROM sqlite_master WHERE type = 'table';",
+    "mysql": "SELECT table_name AS name FROM information_schema.tables WHERE table_schema = DATABASE();",
+    "mssql": "SELECT TABLE_NAME AS name FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE';",
+}
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+# Non-string settings (secrets may already be typed; env vars are always strings)
+_CASTS = {
+    "port": int,
+    "pool_size": int,
+    "max_overflow": int,
+    "pool_pre_ping": _to_bool,
+    "pool_recycle": int,
+    "statement_timeout": float,
+}
+
+
+@dataclass(frozen=True)
+class BackendConfig:
+    """Selects and configures the database backend the dashboard reads from.
+
+    Loaded from the `[database]` section of Streamlit secrets when present,
+    otherwise from DASHBOARD_BACKEND / DASHBOARD_DB_* environment variables.
+    `url` (a full SQLAlchemy URL) takes precedence over the individual parts.
+    """
+    backend: str = "sqlite"
+    sqlite_path: str = os.path.join("data", "classicmodels.sqlite")
+    url: str | None = None
+    host: str | None = None
+    port: int | None = None
+    name: str | None = None
+    user: str | None = None
+    password: str | None = None
+    odbc_driver: str = "ODBC Driver 18 for SQL Server"
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_pre_ping: bool | None = None
+    pool_recycle: int = 1800
+    statement_timeout: float = 30.0
+    # "duckdb" runs aggregate queries on an in-memory columnar mirror (SQLite backend only)
+    analytical_engine: str | None = None
+
+    @classmethod
+    def from_mapping(cls, values: dict) -> "BackendConfig":
+        known = {field.name for field in fields(cls)}
+        kwargs = {}
+        for key, value in values.items():
+            key = key.lower()
+            if key not in known or value in (None, ""):
+                continue
+            kwargs[key] = _CASTS.get(key, str)(value)
+        config = cls(**kwargs)
+        if config.backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported backend '{config.backend}'. Choose one of {SUPPORTED_BACKENDS}.")
+        if config.analytical_engine not in (None, *ANALYTICAL_ENGINES):
+            raise ValueError(
+                f"Unsupported analytical engine '{config.analytical_engine}'. Choose one of {ANALYTICAL_ENGINES}."
+            )
+        if config.analytical_engine and not engine_available(config.analytical_engine):
+            # Fail on load with the fix, rather than with an ImportError on the first aggregate query
+            raise ValueError(
+                f"analytical_engine = '{config.analytical_engine}' needs the {config.analytical_engine} package, "
+                f"which is not installed: {INSTALL_HINT}."
+            )
+        return config
+
+    @classmethod
+    def from_env(cls) -> "BackendConfig":
+        values = {
+            field.name: os.environ.get(f"DASHBOARD_DB_{field.name.upper()}")
+            for field in fields(cls) if field.name != "backend"
+        }
+        values["backend"] = os.environ.get("DASHBOARD_BACKEND")
+        return cls.from_mapping(values)
+
+    def pool_settings(self) -> dict:
+        defaults = POOL_DEFAULTS[self.backend]
+        return {
+            "pool_size": self.pool_size if self.pool_size is not None else defaults["pool_size"],
+            "max_overflow": self.max_overflow if self.max_overflow is not None else defaults["max_overflow"],
+            "pool_pre_ping": self.pool_pre_ping if self.pool_pre_ping is not None else defaults["pool_pre_ping"],
+            "pool_recycle": self.pool_recycle,
+        }
+
+
+def load_backend_config() -> BackendConfig:
+    """Reads the backend config from Streamlit secrets ([database]) or the environment."""
+    try:
+        import streamlit as st
+        section = st.secrets.get("database")
+    except Exception:
+        # No secrets.toml (local runs, CLI tools): fall back to environment variables
+        section = None
+    if section:
+        return BackendConfig.from_mapping(dict(section))
+    return BackendConfig.from_env()
+
+
+def build_url(config: BackendConfig) -> str | URL:
+    """Builds the SQLAlchemy URL for a remote backend."""
+    if config.url:
+        return config.url
+    if config.backend == "mysql":
+        return URL.create(
+            "mysql+mysqlconnector",
+            username=config.user, password=config.password,
+            host=config.host, port=config.port or 3306, database=config.name,
+        )
+    if config.backend == "mssql":
+        # Azure SQL / Synapse dedicated or serverless SQL pools over ODBC
+        return URL.create(
+            "mssql+pyodbc",
+            username=config.user, password=config.password,
+            host=config.host, port=config.port or 1433, database=config.name,
+            query={"driver": config.odbc_driver, "Encrypt": "yes", "TrustServerCertificate": "no"},
+        )
+    raise ValueError(f"No URL builder for backend '{config.backend}'.")
+
+
+def create_backend_engine(config: BackendConfig, **engine_kwargs) -> Engine:
+    """Creates a pooled engine for the configured backend with statement timeouts applied.
+
+    `engine_kwargs` go to create_engine() for the remote backends, e.g. a DB-API
+    `module` and `creator` replacing the driver (utils/sqlite_shim.py).
+    """
+    pool = config.pool_settings()
+    if config.backend == "sqlite":
+        engine_config = replace(
+            EngineConfig.from_env(),
+            pool_size=pool["pool_size"],
+            max_overflow=pool["max_overflow"],
+            pool_recycle=pool["pool_recycle"],
+        )
+        return create_sqlite_engine(config.sqlite_path, engine_config)
+
+    engine = create_engine(build_url(config), **pool, **engine_kwargs)
+    timeout_ms = int(config.statement_timeout * 1000)
+
+    if config.backend == "mysql":
+        @event.listens_for(engine, "connect")
+        def _mysql_timeout(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            # Aborts read-only SELECTs that run longer than the timeout
+            cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {timeout_ms};")
+            cursor.close()
+
+    elif config.backend == "mssql":
+        @event.listens_for(engine, "connect")
+        def _mssql_timeout(dbapi_connection, _):
+            # pyodbc query timeout in seconds, applied to every statement on the connection
+            dbapi_connection.timeout = max(1, int(config.statement_timeout))
+
+    return engine
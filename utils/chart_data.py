@@ -0,0 +1,48 @@
+"""Chart data layer: aggregate on the server, send only the points a chart draws.
+
+Plotly receives its input as JSON, so handing it raw rows (e.g. every
+customer's credit limit for a histogram) makes payload size and render time
+grow with the table. These helpers keep them bounded instead:
+
+    sql_histogram     equal-width bins counted in SQL (only nbins rows come back)
+    top_n             largest N categories plus one "Other" bucket
+"""
+import numpy as np
+import pandas as pd
+
+from utils.db_connector import run_query
+
+
+def sql_histogram(stats_query: str, bins_query: str, nbins: int = 20, **params) -> pd.DataFrame:
+    """Counts values into `nbins` equal-width bins in the database.
+
+    `stats_query` returns one row with `lo`, `hi` (the value range); `bins_query`
+    takes :lo and :width and returns (bin, count) rows where bin is
+    floor((value - lo) / width). Returns bin_start, bin_end, bin_mid and count
+    for every bin, empty bins included.
+    """
+    stats = run_query(stats_query, **params)
+    if stats.empty or pd.isna(stats.iloc[0]["lo"]):
+        return pd.DataFrame(columns=["bin_start", "bin_end", "bin_mid", "count"])
+    lo, hi = float(stats.iloc[0]["lo"]), float(stats.iloc[0]["hi"])
+    width = (hi - lo) / nbins if hi > lo else 1.0
+
+    counts = run_query(bins_query, lo=lo, width=width, **params)
+    bins = np.zeros(nbins, dtype=np.int64)
+    if not counts.empty:
+        # The maximum lands exactly on the upper edge; fold it into the last bin
+        index = np.clip(counts["bin"].to_numpy(dtype=np.int64), 0, nbins - 1)
+        np.add.at(bins, index, counts["count"].to_numpy(dtype=np.int64))
+    starts = lo + width * np.arange(nbins)
+    return pd.DataFrame({"bin_start": starts, "bin_end": starts + width, "bin_mid": starts + width / 2, "count": bins})
+
+
+def top_n(df: pd.DataFrame, label: str, value: str, n: int = 10, other_label: str = "Other") -> pd.DataFrame:
+    """Keeps the `n` largest rows by `value` and sums the rest into one `other_label` row."""
+    if len(df) <= n:
+        return df
+    ranked = df.sort_values(value, ascending=False, kind="stable")
+    head, rest = ranked.iloc[:n], ranked.iloc[n:]
+    other = pd.DataFrame({label: [other_label], value: [rest[value].sum()]})
+    return pd.concat([head[[label, value]], other], ignore_index=True)
+
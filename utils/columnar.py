@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def fetch_rows(result) -> pd.DataFrame:
+    """Original fetch path: materializes every Row, then builds the DataFrame."""
+    columns = result.keys()
+    data = result.fetchall()
+    return pd.DataFrame(data, columns=columns)
+
+
+def _is_numpy_dtype(dtype) -> bool:
+    try:
+        return not isinstance(pd.api.types.pandas_dtype(dtype), pd.api.extensions.ExtensionDtype)
+    except TypeError:
+        return False
+
+
+def _iter_column_batches(result, dtypes: dict, batch_size: int):
+    """Yields one {column: ndarray} dict per batch read from `result`."""
+    columns = list(result.keys())
+    numpy_dtypes = {name: dtypes[name] for name in columns if name in dtypes and _is_numpy_dtype(dtypes[name])}
+
+    # Batches come from the Result, not its DBAPI cursor: rows the Result has
+    # already buffered (stream_results / yield_per read ahead) would be skipped.
+    try:
+        for batch in result.partitions(batch_size):
+            arrays = {}
+            for name, values in zip(columns, zip(*batch)):
+                arrays[name] = np.asarray(values, dtype=numpy_dtypes.get(name, object))
+            del batch
+            yield arrays
+    finally:
+        result.close()
+
+
+def _to_frame(columns: list, arrays: dict, dtypes: dict) -> pd.DataFrame:
+    """Wraps column arrays in a DataFrame, applying declared pandas dtypes or inference."""
+    frame = {}
+    for name in columns:
+        series = pd.Series(arrays.pop(name), name=name, copy=False)
+        if name in dtypes:
+            if series.dtype != pd.api.types.pandas_dtype(dtypes[name]):
+                series = series.astype(dtypes[name])
+        else:
+            series = series.infer_objects()
+        frame[name] = series
+    return pd.DataFrame(frame, columns=columns, copy=False)
+
+
+def iter_columnar(result, dtypes: dict | None = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yields the result as a sequence of DataFrame chunks of at most `batch_size` rows."""
+    dtypes = dtypes or {}
+    columns = list(result.keys())
+    for arrays in _iter_column_batches(result, dtypes, batch_size):
+        yield _to_frame(columns, arrays, dtypes)
+
+
+def fetch_columnar(result, dtypes: dict | None = None, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """Streams a result in batches straight into per-column NumPy buffers.
+
+    Only one batch of row tuples is alive at a time; each batch is transposed
+    into typed arrays immediately, so peak memory is roughly the size of the
+    final columns instead of columns + a Row object per record.
+
+    `dtypes` maps column names to NumPy dtypes (e.g. "int64", "float64") or
+    pandas dtypes ("Int64", "category", "string"). NULLs in float columns
+    become NaN; use a nullable pandas dtype ("Int64") for integer columns that
+    may contain NULLs. Undeclared columns are inferred at the end.
+    """
+    dtypes = dtypes or {}
+    columns = list(result.keys())
+    buffers = {name: [] for name in columns}
+
+    for arrays in _iter_column_batches(result, dtypes, batch_size):
+        for name in columns:
+            buffers[name].append(arrays[name])
+
+    merged = {}
+    for name in columns:
+        chunks = buffers.pop(name)
+        if not chunks:
+            dtype = dtypes.get(name)
+            merged[name] = np.empty(0, dtype=dtype if dtype is not None and _is_numpy_dtype(dtype) else object)
+        else:
+            merged[name] = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        del chunks
+
+    return _to_frame(columns, merged, dtypes)
+
+
+# Fetch engines selectable through get_data(fetch=...)
+FETCH_ENGINES = {
+    "rows": lambda result, dtypes, batch_size: fetch_rows(result),
+    "columnar": fetch_columnar,
+}
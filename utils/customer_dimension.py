@@ -0,0 +1,56 @@
+"""Process-wide customer dimension shared by every session and page.
+
+The churn and recommendation pages used to run the customer query and build
+their own {id: label} dicts (with iterrows) on every rerun of every session.
+The dimension is built once per data version with column operations, so
+memory grows with the number of customers rather than customers x sessions.
+Its columns are read-only NumPy arrays, and an id -> row index makes a
+name or label lookup O(1).
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.db_connector import get_data_version, run_query
+
+
+class CustomerDimension:
+    """Customer ids, names and selectbox labels, ordered by name."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.ids = df["customerNumber"].to_numpy(dtype=np.int64)
+        self.names = df["customerName"].to_numpy(dtype=object)
+        labels = df["customerName"] + " (ID: " + df["customerNumber"].astype(str) + ")"
+        self.labels = labels.to_numpy(dtype=object)
+        for column in (self.ids, self.names, self.labels):
+            column.flags.writeable = False
+        # Plain ints, built once: the selectbox options and the id -> row index
+        self.options = tuple(self.ids.tolist())
+        self._rows = {customer_id: row for row, customer_id in enumerate(self.options)}
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def __contains__(self, customer_id) -> bool:
+        return customer_id in self._rows
+
+    def row(self, customer_id: int) -> int:
+        """Row position of a customer (KeyError for unknown ids)."""
+        return self._rows[customer_id]
+
+    def name(self, customer_id: int) -> str:
+        return self.names[self._rows[customer_id]]
+
+    def label(self, customer_id: int) -> str:
+        """The selection box label, e.g. "Atelier graphique (ID: 103)"; usable directly as a format_func."""
+        return self.labels[self._rows[customer_id]]
+
+
+@st.cache_resource(max_entries=2)
+def _build_customer_dimension(data_version: tuple) -> CustomerDimension:
+    return CustomerDimension(run_query("customer_options"))
+
+
+def get_customer_dimension() -> CustomerDimension:
+    """The shared customer dimension for the current data version (rebuilt when the data changes)."""
+    return _build_customer_dimension(get_data_version())
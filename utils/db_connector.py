@@ -1,38 +1,337 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import streamlit as st
 
-DATABASE_FILE = "classicmodels.sqlite"
+from utils import profiling
+
+from utils.analytical import AnalyticalMirror, MirrorBuilder
+from utils.backends import LIST_TABLES_SQL, BackendConfig, create_backend_engine, load_backend_config
+from utils.columnar import DEFAULT_BATCH_SIZE, FETCH_ENGINES, iter_columnar
+from utils.disk_cache import DiskResultCache
+from utils.queries import DERIVED_TABLE_WATERMARKS, get_query
+from utils.query_cache import QueryCache, SQLiteVersionProbe, frame_nbytes, make_cache_key, normalize_sql
+
+# Result cache sizing: entries expire after the TTL and the least recently used
+# results are evicted once the memory budget is exceeded.
+QUERY_CACHE_TTL_SECONDS = 600
+QUERY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Persistent results shared by processes and restarts (utils/disk_cache.py): off unless a directory is set
+DISK_CACHE_DIR = os.environ.get("DASHBOARD_DISK_CACHE_DIR")
+DISK_CACHE_MAX_BYTES = int(os.environ.get("DASHBOARD_DISK_CACHE_MAX_MB", 1024)) * 1024 * 1024
+# The analytical mirror holds a copy of the data in memory: larger SQLite files are not mirrored (0: no limit)
+ANALYTICAL_MAX_BYTES = int(os.environ.get("DASHBOARD_ANALYTICAL_MAX_MB", 512)) * 1024 * 1024
+
+# Set while queries run off the script thread (utils/page_queries.py): errors are
+# collected there and shown by the page instead of calling st.error from a worker
+_query_errors: ContextVar[list | None] = ContextVar("dashboard_query_errors", default=None)
+
+@st.cache_resource
+def get_backend_config() -> BackendConfig:
+    """Returns the configured backend (secrets [database] section or DASHBOARD_* env vars)."""
+    return load_backend_config()
 
 @st.cache_resource
 def get_engine():
     """Initializes and returns the SQLAlchemy engine, cached for efficiency."""
-    # SQLite URL format: sqlite:///path/to/database.db
-    engine = create_engine(f"sqlite:///data/{DATABASE_FILE}")
+    # Pooled engine for the configured backend, shared by every session.
+    # SQLite (the default) is opened read-only; tune with DASHBOARD_DB_* env vars.
+    engine = create_backend_engine(get_backend_config())
     return engine
 
-def get_data(sql_query: str) -> pd.DataFrame:
-    """Executes an SQL query and returns the result as a pandas DataFrame."""
+def get_dialect() -> str:
+    """Returns the SQLAlchemy dialect name of the active backend ("sqlite", "mysql", "mssql")."""
+    return get_engine().dialect.name
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Returns the process-wide query result cache shared by all sessions."""
+    config = get_backend_config()
+    # Remote warehouses have no cheap change signal, so their results rely on the TTL alone
+    probe = SQLiteVersionProbe(config.sqlite_path) if config.backend == "sqlite" else None
+    return QueryCache(
+        ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+        max_bytes=QUERY_CACHE_MAX_BYTES,
+        version_probe=probe,
+    )
+
+def get_data_version() -> tuple:
+    """Returns a token that changes whenever the data changes.
+
+    SQLite reports file and data_version changes; remote warehouses have no cheap
+    change signal, so their token moves once per query cache TTL.
+    """
+    probe = get_query_cache().version_probe
+    if probe is not None:
+        return probe()
+    return (int(time.time() // QUERY_CACHE_TTL_SECONDS),)
+
+@st.cache_resource
+def get_disk_cache() -> DiskResultCache | None:
+    """Returns the on-disk result cache, or None when DASHBOARD_DISK_CACHE_DIR is not set."""
+    if not DISK_CACHE_DIR:
+        return None
+    return DiskResultCache(DISK_CACHE_DIR, max_bytes=DISK_CACHE_MAX_BYTES)
+
+def get_storage_version() -> tuple:
+    """Like get_data_version, but identical in every process reading the same data (keys disk cache files).
+
+    SQLite contributes the database file's path, size and mtime; remote
+    warehouses their address and the current query cache TTL bucket.
+    """
+    config = get_backend_config()
+    probe = get_query_cache().version_probe
+    if probe is not None:
+        return probe.file_version()
+    return (config.backend, config.url or config.host, config.port, config.name) + get_data_version()
+
+def analytical_enabled() -> bool:
+    """True when aggregate queries run on the analytical mirror (analytical_engine set, SQLite backend)."""
+    config = get_backend_config()
+    return config.analytical_engine is not None and config.backend == "sqlite"
+
+@st.cache_resource
+def get_mirror_builder() -> MirrorBuilder:
+    """Returns the process-wide builder of the analytical mirror."""
+    return MirrorBuilder(max_bytes=ANALYTICAL_MAX_BYTES or None)
+
+def get_analytical_mirror() -> AnalyticalMirror | None:
+    """Returns the DuckDB mirror of the current data when the analytical mode is enabled, else None.
+
+    Only the SQLite backend is mirrored (remote warehouses already scan columnar).
+    The mirror is rebuilt in the background when the database file changes;
+    None is returned until it is ready, so queries run on SQLite meanwhile.
+    """
+    if not analytical_enabled():
+        return None
+    return get_mirror_builder().get(get_backend_config().sqlite_path, get_data_version())
+
+def get_cache_stats() -> dict:
+    """Returns the hit/miss/eviction counters of the query result cache."""
+    return get_query_cache().stats()
+
+def get_disk_cache_stats() -> dict | None:
+    """Returns the counters of the on-disk result cache (None when it is disabled)."""
+    disk = get_disk_cache()
+    return disk.stats() if disk is not None else None
+
+@contextmanager
+def collect_query_errors():
+    """Collects query error messages into the yielded list instead of showing them with st.error."""
+    errors: list[str] = []
+    token = _query_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _query_errors.reset(token)
+
+def _report_error(message: str):
+    errors = _query_errors.get()
+    if errors is None:
+        st.error(message)
+    else:
+        errors.append(message)
+
+def _execute(
+    statement,
+    cache_key: tuple,
+    params: dict | None,
+    ttl: float | None,
+    use_cache: bool,
+    fetch: str,
+    dtypes: dict | None,
+    batch_size: int,
+    label: str,
+    mirror: AnalyticalMirror | None = None,
+) -> pd.DataFrame:
+    """Runs a prepared statement through the result cache and the selected fetch engine.
+
+    With `mirror`, the statement's SQL runs on the analytical (DuckDB) mirror instead.
+    """
+    fetch_engine = FETCH_ENGINES[fetch]
+    profile = profiling.is_enabled()
+    cache = get_query_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if profile:
+                profiling.record_query(label, "hit", len(cached), frame_nbytes(cached))
+            return cached
+    # Results written by other processes or before a restart, then promoted into memory
+    disk = get_disk_cache() if cache is not None else None
+    if disk is not None:
+        storage_version = get_storage_version()
+        stored = disk.get(cache_key, storage_version, ttl_seconds=ttl)
+        if stored is not None:
+            if profile:
+                profiling.record_query(label, "disk", len(stored), frame_nbytes(stored))
+            cache.put(cache_key, stored, ttl_seconds=ttl)
+            return stored
+
+    start = time.perf_counter()
+    try:
+        if mirror is not None:
+            # Vectorized engine: execution and fetch into a DataFrame are one call
+            df = mirror.query(statement.text, params)
+            if dtypes:
+                df = df.astype(dtypes)
+            executed = time.perf_counter() if profile else 0.0
+        else:
+            # We use a connection object for executing the query.
+            # The 'with' statement ensures the connection is closed and returned to the pool.
+            with get_engine().connect() as connection:
+                result = connection.execute(statement, params or {})
+                executed = time.perf_counter() if profile else 0.0
+
+                # Fetch the results and convert to DataFrame
+                df = fetch_engine(result, dtypes, batch_size)
+    except Exception as e:
+        if profile:
+            profiling.record_query(label, "miss" if cache is not None else "off", 0, 0, error=str(e))
+        _report_error(f"Database Query Error: {e}")
+        return pd.DataFrame()
+
+    if profile:
+        profiling.record_query(
+            label, "miss" if cache is not None else "off", len(df), frame_nbytes(df),
+            execute_seconds=executed - start, fetch_seconds=time.perf_counter() - executed,
+        )
+
+    # Only successful results are cached, so a transient error is retried on the next rerun
+    if cache is not None:
+        cache.put(cache_key, df, ttl_seconds=ttl)
+    if disk is not None and time.perf_counter() - start >= disk.min_seconds:
+        disk.put(cache_key, storage_version, df)
+    return df
+
+def get_data(
+    sql_query: str,
+    params: dict | None = None,
+    ttl: float | None = None,
+    use_cache: bool = True,
+    fetch: str = "rows",
+    dtypes: dict | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    analytical: bool = False,
+) -> pd.DataFrame:
+    """Executes an SQL query and returns the result as a pandas DataFrame.
+
+    Results are served from the shared query cache when possible; the cache is
+    invalidated automatically when the database file changes.
+    Use fetch="columnar" (optionally with declared `dtypes`) for large extracts:
+    rows are streamed in batches into typed column buffers instead of being
+    materialized as Row objects first.
+    Use analytical=True for aggregate scans: they run on the DuckDB mirror when
+    the analytical mode is enabled (SQLite otherwise).
+    """
+    mirror = get_analytical_mirror() if analytical else None
+    # The text() construct is used to execute literal SQL strings
+    return _execute(
+        text(sql_query), make_cache_key(sql_query, params, dtypes) + (("duckdb",) if mirror else ()),
+        params, ttl, use_cache, fetch, dtypes, batch_size,
+        # Ad-hoc SQL is labelled with its first characters in profiling records
+        label=normalize_sql(sql_query)[:60] + (" [duckdb]" if mirror else ""),
+        mirror=mirror,
+    )
+
+def existing_tables() -> set[str]:
+    """Returns the names of the tables in the database (cached with the query results)."""
+    df = get_data(LIST_TABLES_SQL[get_dialect()])
+    return set(df["name"]) if not df.empty else set()
+
+def stale_tables(tables) -> set[str]:
+    """The derived tables among `tables` whose refresh watermarks are behind their source tables.
+
+    Both lookups go through the result cache, which is invalidated when the data
+    changes, so this costs two dictionary hits per call while the data is unchanged.
+    """
+    derived = [table for table in tables if table in DERIVED_TABLE_WATERMARKS]
+    if not derived:
+        return set()
+    watermarks = run_query("derived_table_watermarks")
+    highs = run_query("derived_source_highs")
+    if highs.empty:
+        return set(derived)
+    stored = dict(zip(watermarks["name"], watermarks["value"])) if not watermarks.empty else {}
+    return {
+        table for table in derived
+        if any(stored.get(name, -1) < highs.iloc[0][source] for name, source in DERIVED_TABLE_WATERMARKS[table].items())
+    }
+
+def tables_ready(tables) -> bool:
+    """True if every table exists and none is a derived table that fell behind its sources."""
+    return set(tables) <= existing_tables() and not stale_tables(tables)
+
+def run_query(
+    name: str,
+    fetch: str = "rows",
+    dtypes: dict | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    **params,
+) -> pd.DataFrame:
+    """Executes a query from the registry in utils/queries.py with bound parameters.
+
+    The statement is prepared once at registration (with per-dialect variants
+    for non-SQLite backends) and the query's own cache policy (TTL / no-cache) is applied, e.g. run_query("customer_profile", customer_id=103).
+    """
+    query = get_query(name)
+    # Missing or stale materialized tables: run the live query instead
+    if query.requires and not tables_ready(query.requires):
+        return run_query(query.fallback, fetch=fetch, dtypes=dtypes, batch_size=batch_size, **params)
+    missing = set(query.params) - set(params)
+    if missing:
+        raise ValueError(f"Query '{name}' is missing parameters: {sorted(missing)}")
+    mirror = get_analytical_mirror() if query.analytical else None
+    if mirror is not None:
+        return _execute(
+            query.statement_for("duckdb"), make_cache_key(query.sql_for("duckdb"), params, dtypes) + ("duckdb",),
+            params, query.ttl, query.cache, fetch, dtypes, batch_size, label=f"{name} [duckdb]", mirror=mirror,
+        )
+    dialect = get_dialect()
+    return _execute(
+        query.statement_for(dialect), make_cache_key(query.sql_for(dialect), params, dtypes),
+        params, query.ttl, query.cache, fetch, dtypes, batch_size, label=name,
+    )
+
+def is_cached(name: str, **params) -> bool:
+    """True if run_query(name, **params) would currently be answered from the result cache."""
+    query = get_query(name)
+    if query.requires and not tables_ready(query.requires):
+        return is_cached(query.fallback, **params)
+    if not query.cache:
+        return False
+    if query.analytical and analytical_enabled():
+        return get_query_cache().contains(make_cache_key(query.sql_for("duckdb"), params, None) + ("duckdb",))
+    return get_query_cache().contains(make_cache_key(query.sql_for(get_dialect()), params, None))
+
+def iter_data(
+    sql_query: str,
+    params: dict | None = None,
+    chunksize: int = DEFAULT_BATCH_SIZE,
+    dtypes: dict | None = None,
+):
+    """Executes an SQL query and yields the result as DataFrame chunks of at most `chunksize` rows.
+
+    Only one chunk is held in memory at a time, so results larger than RAM can be
+    processed. Chunks are not cached. The connection stays open until the generator is exhausted or closed.
+    """
     engine = get_engine()
-    
-    # We use a connection object for executing the query.
-    # The 'with' statement ensures the connection is closed and returned to the pool.
+
     with engine.connect() as connection:
         try:
-            # The text() construct is used to execute literal SQL strings
-            result = connection.execute(text(sql_query))
-            
-            # Fetch all results and column names
-            columns = result.keys()
-            data = result.fetchall()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(data, columns=columns)
-            return df
+            # stream_results asks the driver for a server-side cursor where supported
+            result = connection.execution_options(stream_results=True, max_row_buffer=chunksize).execute(
+                text(sql_query), params or {}
+            )
         except Exception as e:
             st.error(f"Database Query Error: {e}")
-            return pd.DataFrame()
+            return
+        yield from iter_columnar(result, dtypes, chunksize)
 
 # The engine can be disposed manually if needed, but Streamlit handles resource cleanup.
 # def dispose_engine():
-#     get_engine().dispose()
\ No newline at end of file
+#     get_engine().dispose()
@@ -0,0 +1,216 @@
+"""Persistent query result cache on disk, shared by processes and restarts.
+
+The in-memory QueryCache lives and dies with one Streamlit process, so every
+redeploy and every additional replica recomputes the EDA / recommendation
+queries from cold. With DASHBOARD_DISK_CACHE_DIR set, results are also
+written as Arrow IPC files to that directory. Another process (or the same one
+after a restart) pointed at the same directory then reads them back instead
+of running the query again. get_data / run_query consult it after a memory
+miss and promote disk hits into the memory cache.
+
+    key        sha256 of the query's cache key (normalized SQL, bound parameters,
+               dtypes) and a storage version: the SQLite file's identity, size
+               and mtime, or the TTL bucket of a remote backend. A data change
+               simply leads to new file names; stale files age out.
+    reads      memory-mapped (pyarrow.memory_map) and converted to a DataFrame
+    writes     to a temporary file in the same directory, then os.replace():
+               concurrent writers and readers never see a partial file
+    eviction   when the directory grows past its byte budget, the least recently
+               read files are removed down to EVICT_TO of the budget. Sizes are
+               tracked per process and re-scanned on eviction, so the budget is
+               approximate while several processes write at once.
+
+Only results that took at least `min_seconds` to compute are written: cheaper
+ones are faster to run again than to read back. Needs pyarrow.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+# Part of every key: bump when the file layout changes (old files are never hit again)
+FORMAT_VERSION = 1
+SUFFIX = ".arrow"
+# Eviction trims the directory to this share of the budget so it does not run on every write
+EVICT_TO = 0.9
+# Temporary files older than this were left by a crashed writer
+STALE_TMP_SECONDS = 3600
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("The disk result cache needs pyarrow: pip install pyarrow") from e
+    return pa
+
+
+class DiskResultCache:
+    """Directory of Arrow IPC result files with size-bounded LRU eviction."""
+
+    def __init__(self, directory: str, max_bytes: int, min_seconds: float = 0.005):
+        self.pa = _pyarrow()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_seconds = min_seconds
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._evicting = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+        self.current_bytes = self._scan()[1]
+
+    def path_for(self, key: tuple, version: tuple) -> str:
+        digest = hashlib.sha256(repr((FORMAT_VERSION, key, version)).encode()).hexdigest()
+        return os.path.join(self.directory, digest + SUFFIX)
+
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            # Already evicted by another process
+            pass
+
+    def get(self, key: tuple, version: tuple, ttl_seconds: float | None = None) -> pd.DataFrame | None:
+        """Returns the stored DataFrame for `key` at `version`, or None on a miss.
+
+        With `ttl_seconds`, files written longer ago than that count as misses.
+        """
+        path = self.path_for(key, version)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._count("misses")
+            return None
+        if ttl_seconds is not None and time.time() - stat.st_mtime > ttl_seconds:
+            self._remove(path)
+            self._count("expirations")
+            self._count("misses")
+            return None
+        try:
+            table = self.pa.ipc.open_file(self.pa.memory_map(path, "r")).read_all()
+            df = table.to_pandas()
+        except FileNotFoundError:
+            # Evicted by another process since the stat()
+            self._count("misses")
+            return None
+        except (OSError, self.pa.ArrowException):
+            # Unreadable file (e.g. written by an incompatible version): drop it and recompute
+            self._remove(path)
+            self._count("errors")
+            self._count("misses")
+            return None
+        try:
+            # Mark as recently used for eviction (atime), keeping mtime as the write time
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        self._count("hits")
+        return df
+
+    def put(self, key: tuple, version: tuple, df: pd.DataFrame):
+        """Stores a DataFrame atomically; frames Arrow cannot represent are skipped."""
+        pa = self.pa
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=None)
+        except (pa.ArrowException, ValueError, TypeError):
+            self._count("errors")
+            return
+        path = self.path_for(key, version)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            size = os.path.getsize(tmp_path)
+            if size > self.max_bytes:
+                self._remove(tmp_path)
+                return
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowException):
+            self._remove(tmp_path)
+            self._count("errors")
+            return
+        with self._lock:
+            self.writes += 1
+            self.current_bytes += size
+            over_budget = self.current_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], int]:
+        """(atime, size, path) of every result file, oldest first, and their total size."""
+        entries, total = [], 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith(".tmp"):
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    self._remove(entry.path)
+                continue
+            if entry.name.endswith(SUFFIX):
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        return entries, total
+
+    def evict(self):
+        """Removes the least recently read files until the directory is within EVICT_TO of the budget."""
+        # One eviction pass per process at a time; others just keep writing
+        if not self._evicting.acquire(blocking=False):
+            return
+        try:
+            entries, total = self._scan()
+            removed = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICT_TO
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    self._remove(path)
+                    total -= size
+                    removed += 1
+            with self._lock:
+                self.current_bytes = total
+                self.evictions += removed
+        finally:
+            self._evicting.release()
+
+    def clear(self):
+        """Removes every result file (counters are kept)."""
+        for _, _, path in self._scan()[0]:
+            self._remove(path)
+        with self._lock:
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Returns hit/miss/write/eviction counters and the tracked directory size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "errors": self.errors,
+            }
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+from dataclasses import dataclass, fields
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Connection and pool settings for serving the dashboard from SQLite.
+
+    Every field can be overridden with an environment variable named
+    DASHBOARD_DB_<FIELD> (e.g. DASHBOARD_DB_POOL_SIZE=16).
+    """
+    read_only: bool = True
+    # journal_mode=WAL is persistent in the file; it can only be switched by a writer
+    # (see enable_wal), read-only connections then read without blocking on writers.
+    wal: bool = True
+    mmap_size: int = 256 * 1024 * 1024
+    # Negative cache_size is in KiB (SQLite convention): -65536 = 64 MB page cache per connection
+    cache_size: int = -65536
+    busy_timeout_ms: int = 5000
+    pool_size: int = 8
+    max_overflow: int = 8
+    pool_timeout: float = 30.0
+    pool_recycle: int = 3600
+
+    @classmethod
+    def from_env(cls, prefix: str = "DASHBOARD_DB_") -> "EngineConfig":
+        """Builds a config from defaults overridden by environment variables."""
+        overrides = {}
+        for field in fields(cls):
+            value = os.environ.get(prefix + field.name.upper())
+            if value is None:
+                continue
+            if field.type in (bool, "bool"):
+                overrides[field.name] = value.strip().lower() in ("1", "true", "yes", "on")
+            elif field.type in (float, "float"):
+                overrides[field.name] = float(value)
+            else:
+                overrides[field.name] = int(value)
+        return cls(**overrides)
+
+
+def enable_wal(database_path: str) -> str:
+    """Switches the database file to WAL journaling (needs write access) and returns the mode."""
+    connection = sqlite3.connect(database_path)
+    try:
+        return connection.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def create_sqlite_engine(database_path: str, config: EngineConfig | None = None) -> Engine:
+    """Creates a pooled, thread-safe SQLAlchemy engine tuned for concurrent readers."""
+    config = config or EngineConfig()
+    if config.read_only:
+        # URI form lets SQLite open the file with mode=ro (no write locks, no accidental writes)
+        url = f"sqlite:///file:{database_path}?mode=ro&uri=true"
+    else:
+        url = f"sqlite:///{database_path}"
+
+    engine = create_engine(
+        url,
+        # Streamlit runs each session's script on its own thread
+        connect_args={"check_same_thread": False, "timeout": config.busy_timeout_ms / 1000},
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        # LIFO hands the most recently returned (warm page cache / mmap) connection back first
+        pool_use_lifo=True,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        if config.wal and not config.read_only:
+            cursor.execute("PRAGMA journal_mode = WAL;")
+        cursor.execute(f"PRAGMA mmap_size = {int(config.mmap_size)};")
+        cursor.execute(f"PRAGMA cache_size = {int(config.cache_size)};")
+        cursor.execute(f"PRAGMA busy_timeout = {int(config.busy_timeout_ms)};")
+        cursor.execute("PRAGMA temp_store = MEMORY;")
+        if config.read_only:
+            cursor.execute("PRAGMA query_only = ON;")
+        cursor.close()
+
+    return engine
@@ -0,0 +1,72 @@
+"""Background database health check with a cached result.
+
+The home page used to run its COUNT query inline on every load, holding up the
+rest of the page on a cold or remote database. The check now runs on a daemon
+thread at most once per HEALTH_TTL_SECONDS per process; callers get the last
+result immediately (or wait a bounded time for the first one).
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from utils.db_connector import collect_query_errors, run_query
+
+# A result younger than this is served without re-checking
+HEALTH_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class HealthStatus:
+    ok: bool
+    customers: int | None
+    error: str | None
+    checked_at: float
+    duration_ms: float
+
+
+_status: HealthStatus | None = None
+_refresh: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def _check():
+    global _status
+    start = time.perf_counter()
+    try:
+        # run_query reports database errors with st.error, which a background thread cannot show
+        with collect_query_errors() as errors:
+            df = run_query("customer_count")
+        if errors:
+            status = HealthStatus(False, None, "; ".join(errors), time.time(), (time.perf_counter() - start) * 1000)
+        else:
+            customers = int(df.iloc[0]["total_customers"]) if not df.empty else None
+            status = HealthStatus(True, customers, None, time.time(), (time.perf_counter() - start) * 1000)
+    except Exception as e:
+        status = HealthStatus(False, None, str(e), time.time(), (time.perf_counter() - start) * 1000)
+    with _lock:
+        _status = status
+
+
+def start_health_check() -> threading.Thread | None:
+    """Starts a background check unless a fresh result exists or one is already running."""
+    global _refresh
+    with _lock:
+        if _status is not None and time.time() - _status.checked_at < HEALTH_TTL_SECONDS:
+            return None
+        if _refresh is None or not _refresh.is_alive():
+            _refresh = threading.Thread(target=_check, name="db-health-check", daemon=True)
+            _refresh.start()
+        return _refresh
+
+
+def get_health(wait: float = 0.0) -> HealthStatus | None:
+    """The latest health status, waiting up to `wait` seconds for a running check.
+
+    Returns None while the first check of the process has not finished; a
+    stale result is returned (and refreshed in the background) rather than blocking.
+    """
+    thread = start_health_check()
+    if thread is not None and wait > 0 and _status is None:
+        thread.join(wait)
+    with _lock:
+        return _status
@@ -0,0 +1,178 @@
+"""Index advisor for the dashboard's SQLite database.
+
+Runs EXPLAIN QUERY PLAN over every registered dashboard query, reports full
+table scans and temporary B-trees, and can create the covering indexes the
+queries need, with a before/after timing report.
+
+Usage:
+    python -m utils.index_advisor                 # report only
+    python -m utils.index_advisor --apply         # create missing indexes, then re-time
+    python -m utils.index_advisor --db path/to/other.sqlite --apply
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import time
+
+from utils.queries import QUERY_REGISTRY
+
+DEFAULT_DATABASE_PATH = os.path.join("data", "classicmodels.sqlite")
+
+# Indexes covering the joins, filters and aggregates of the registered queries:
+# (index name, table, columns)
+RECOMMENDED_INDEXES = [
+    # productlines -> products -> orderdetails aggregates (EDA) read only these columns
+    ("idx_orderdetails_product_qty_price", "orderdetails", ("productCode", "quantityOrdered", "priceEach")),
+    # orders -> orderdetails joins for per-customer history and recommendations
+    ("idx_orderdetails_order", "orderdetails", ("orderNumber", "productCode", "quantityOrdered", "priceEach")),
+    ("idx_orders_customer", "orders", ("customerNumber", "orderNumber", "orderDate")),
+    ("idx_orders_number", "orders", ("orderNumber",)),
+    ("idx_orders_date_customer", "orders", ("orderDate", "customerNumber")),
+    ("idx_products_code_line", "products", ("productCode", "productLine", "buyPrice")),
+    ("idx_productlines_line", "productlines", ("productLine",)),
+    ("idx_customers_number", "customers", ("customerNumber",)),
+    ("idx_customers_country", "customers", ("country", "customerNumber")),
+    ("idx_customers_name", "customers", ("customerName", "customerNumber")),
+    ("idx_payments_customer_date", "payments", ("customerNumber", "paymentDate", "amount")),
+]
+
+
+def sample_params(connection: sqlite3.Connection, query) -> dict:
+    """Binds representative values for a query's parameters (an existing customer id)."""
+    params = {}
+    for name in query.params:
+        if name == "customer_id":
+            row = connection.execute(
+                "SELECT customerNumber FROM orders GROUP BY customerNumber ORDER BY COUNT(*) DESC LIMIT 1;"
+            ).fetchone()
+            params[name] = row[0] if row else 0
+        elif name in ("after_order", "lo"):
+            params[name] = 0
+        elif name == "width":
+            params[name] = 10000.0
+        elif name in ("as_of", "start_date", "end_date"):
+            params[name] = connection.execute("SELECT MAX(orderDate) FROM orders;").fetchone()[0]
+        elif name.startswith("start_") or name == "end":
+            # Churn window bounds [start_<days>, end), counted back from the day after the latest order
+            days = 0 if name == "end" else int(name.removeprefix("start_"))
+            params[name] = connection.execute(
+                "SELECT date(MAX(orderDate), ?) FROM orders;", (f"{1 - days:+d} days",)
+            ).fetchone()[0]
+        else:
+            params[name] = None
+    return params
+
+
+def explain(connection: sqlite3.Connection, sql: str, params: dict) -> list[str]:
+    """Returns the EXPLAIN QUERY PLAN detail lines for a statement."""
+    return [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_issues(plan: list[str]) -> list[str]:
+    """Picks the plan steps that indicate full table scans or temporary B-trees."""
+    issues = []
+    for step in plan:
+        is_full_scan = step.startswith("SCAN") and "USING" not in step and "CONSTANT ROW" not in step
+        if is_full_scan or "TEMP B-TREE" in step:
+            issues.append(step)
+    return issues
+
+
+def time_query(connection: sqlite3.Connection, sql: str, params: dict, repeat: int = 5) -> float:
+    """Returns the median wall time in milliseconds to execute and fetch a query."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def analyze_queries(connection: sqlite3.Connection, repeat: int = 5) -> dict:
+    """Explains and times every registered query; returns {name: report}."""
+    report = {}
+    for name, query in QUERY_REGISTRY.items():
+        params = sample_params(connection, query)
+        try:
+            plan = explain(connection, query.sql, params)
+            elapsed_ms = time_query(connection, query.sql, params, repeat)
+        except sqlite3.Error as e:
+            # e.g. summary tables that have not been built yet
+            report[name] = {"error": str(e)}
+            continue
+        report[name] = {"plan": plan, "issues": plan_issues(plan), "ms": elapsed_ms}
+    return report
+
+
+def existing_indexes(connection: sqlite3.Connection) -> set[str]:
+    return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index';")}
+
+
+def missing_indexes(connection: sqlite3.Connection) -> list[tuple]:
+    """Returns the recommended indexes that are not yet present (for existing tables only)."""
+    present = existing_indexes(connection)
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    return [index for index in RECOMMENDED_INDEXES if index[0] not in present and index[1] in tables]
+
+
+def create_indexes(connection: sqlite3.Connection, indexes: list[tuple]):
+    """Creates the given indexes and refreshes the planner statistics."""
+    with connection:
+        for index_name, table, columns in indexes:
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON "{table}" ({column_list});')
+        connection.execute("ANALYZE;")
+
+
+def print_report(report: dict, title: str):
+    print(f"\n=== {title} ===")
+    for name, entry in report.items():
+        if "error" in entry:
+            print(f"- {name}: skipped ({entry['error']})")
+            continue
+        flag = "OK" if not entry["issues"] else f"{len(entry['issues'])} issue(s)"
+        print(f"- {name}: {entry['ms']:.2f} ms [{flag}]")
+        for issue in entry["issues"]:
+            print(f"    ! {issue}")
+
+
+def print_comparison(before: dict, after: dict):
+    print("\n=== Before / after ===")
+    print(f"{'query':<32} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in before:
+        if "ms" not in before[name] or "ms" not in after.get(name, {}):
+            continue
+        old, new = before[name]["ms"], after[name]["ms"]
+        speedup = old / new if new else float("inf")
+        print(f"{name:<32} {old:>10.2f} {new:>10.2f} {speedup:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DATABASE_PATH, help="SQLite database file")
+    parser.add_argument("--apply", action="store_true", help="create the missing recommended indexes")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions per query")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db)
+    before = analyze_queries(connection, args.repeat)
+    print_report(before, "Current query plans")
+
+    missing = missing_indexes(connection)
+    print("\n=== Missing recommended indexes ===")
+    for index_name, table, columns in missing:
+        print(f"- {index_name} ON {table}({', '.join(columns)})")
+    if not missing:
+        print("(none)")
+
+    if args.apply and missing:
+        create_indexes(connection, missing)
+        after = analyze_queries(connection, args.repeat)
+        print_report(after, "Query plans after indexing")
+        print_comparison(before, after)
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
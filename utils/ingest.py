@@ -0,0 +1,230 @@
+"""Bulk loader for CSV / Parquet files into the dashboard's SQLite database.
+
+Files are read in chunks (bounded memory at any size) and appended with
+`executemany` inside large transactions. While loading, the connection runs
+with the rollback journal and fsyncs off, temp B-trees in memory, a big page
+cache and an exclusive lock; indexes on the target tables are dropped first
+and rebuilt once at the end (one sorted build is far cheaper than updating
+them row by row). Settings are restored and ANALYZE is run afterwards.
+
+A source is a CSV file, a Parquet file, a directory of Parquet part files
+(one table), or a directory of such directories (one table per
+subdirectory, e.g. the output of `data/generate_dummy.py --format parquet`).
+The table name defaults to the file / directory name.
+
+Because the journal is off, an interrupted load can leave the file
+corrupt: load into a copy or a new file, then swap it in.
+
+Usage:
+    python -m utils.ingest data/test_dataset.csv --db /tmp/test.sqlite --table test_table
+    python -m utils.ingest /tmp/big_parquet --db /tmp/big.sqlite --recommended-indexes
+    python -m utils.ingest orders.csv --db /tmp/big.sqlite --if-exists replace
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from utils.index_advisor import RECOMMENDED_INDEXES, create_indexes
+
+DEFAULT_CHUNKSIZE = 200_000
+# Rows per transaction: large enough that commits are rare, bounded so the
+# page cache does not have to hold an unbounded dirty set
+DEFAULT_COMMIT_ROWS = 2_000_000
+
+# PRAGMAs applied for the duration of a load, and the ones restored afterwards
+LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": -1_048_576,  # 1 GiB (negative = KiB)
+    "locking_mode": "EXCLUSIVE",
+}
+RESTORE_PRAGMAS = ("synchronous", "temp_store", "cache_size", "locking_mode")
+
+
+def _column_type(dtype) -> str:
+    """SQLite column type for a pandas dtype (same names pandas.to_sql uses)."""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "FLOAT"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def _column_values(series: pd.Series) -> list:
+    """A column as Python values sqlite3 can bind, with missing values as None."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif pd.api.types.is_bool_dtype(series):
+        series = series.astype(np.int64)
+    if series.dtype != object and not series.hasnans:
+        # .tolist() turns numpy scalars into Python ints / floats in one C loop
+        return series.tolist()
+    values = series.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def chunk_rows(chunk: pd.DataFrame):
+    """Rows of a chunk as tuples, built column-wise (no per-row pandas access)."""
+    return zip(*(_column_values(chunk[column]) for column in chunk.columns))
+
+
+def read_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Yields DataFrames of at most `chunksize` rows from a CSV or Parquet source."""
+    if path.lower().endswith((".csv", ".csv.gz", ".txt")):
+        yield from pd.read_csv(path, chunksize=chunksize, low_memory=False)
+        return
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Reading Parquet needs pyarrow: pip install pyarrow") from e
+    files = sorted(glob.glob(os.path.join(path, "*.parquet"))) if os.path.isdir(path) else [path]
+    for file in files:
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def discover_sources(path: str) -> list[tuple[str, str]]:
+    """(table, source) pairs for a path: a file, a Parquet directory, or a directory of tables."""
+    if os.path.isdir(path):
+        subdirectories = sorted(entry.path for entry in os.scandir(path) if entry.is_dir())
+        if subdirectories:
+            return [(os.path.basename(directory), directory) for directory in subdirectories]
+        return [(os.path.basename(os.path.normpath(path)), path)]
+    name = os.path.basename(path)
+    for suffix in (".gz", ".csv", ".txt", ".parquet"):
+        name = name.removesuffix(suffix)
+    return [(name, path)]
+
+
+@contextmanager
+def bulk_load_settings(connection: sqlite3.Connection):
+    """Applies LOAD_PRAGMAS for the duration of the block, then restores the previous settings."""
+    previous = {name: connection.execute(f"PRAGMA {name};").fetchone()[0] for name in RESTORE_PRAGMAS}
+    journal_mode = connection.execute("PRAGMA journal_mode;").fetchone()[0]
+    for name, value in LOAD_PRAGMAS.items():
+        connection.execute(f"PRAGMA {name} = {value};")
+    try:
+        yield
+    finally:
+        connection.execute(f"PRAGMA journal_mode = {journal_mode};")
+        for name, value in previous.items():
+            connection.execute(f"PRAGMA {name} = {value};")
+        # locking_mode = NORMAL only releases the exclusive lock on the next access
+        connection.execute("SELECT 1 FROM sqlite_master LIMIT 1;").fetchall()
+
+
+def drop_indexes(connection: sqlite3.Connection, table: str) -> list[str]:
+    """Drops the explicit indexes of `table` and returns their CREATE statements."""
+    rows = connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL;", (table,)
+    ).fetchall()
+    for name, _ in rows:
+        connection.execute(f'DROP INDEX "{name}";')
+    return [sql for _, sql in rows]
+
+
+def load_table(connection: sqlite3.Connection, table: str, source: str, if_exists: str = "append",
+               chunksize: int = DEFAULT_CHUNKSIZE, commit_rows: int = DEFAULT_COMMIT_ROWS) -> dict:
+    """Loads one source into `table` and returns {table, rows, seconds, deferred_indexes}."""
+    start = time.perf_counter()
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)
+    ).fetchone() is not None
+    if exists and if_exists == "fail":
+        raise ValueError(f"Table '{table}' already exists (use --if-exists append or replace).")
+    deferred = []
+    if exists and if_exists == "replace":
+        connection.execute(f'DROP TABLE "{table}";')
+        exists = False
+    elif exists:
+        deferred = drop_indexes(connection, table)
+
+    rows = pending = 0
+    insert_sql = None
+    connection.execute("BEGIN;")
+    for chunk in read_chunks(source, chunksize):
+        if insert_sql is None:
+            if not exists:
+                columns = ", ".join(f'"{name}" {_column_type(dtype)}' for name, dtype in chunk.dtypes.items())
+                connection.execute(f'CREATE TABLE "{table}" ({columns});')
+            column_list = ", ".join(f'"{name}"' for name in chunk.columns)
+            insert_sql = f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join("?" * len(chunk.columns))});'
+        connection.executemany(insert_sql, chunk_rows(chunk))
+        rows += len(chunk)
+        pending += len(chunk)
+        if pending >= commit_rows:
+            connection.execute("COMMIT;")
+            connection.execute("BEGIN;")
+            pending = 0
+    connection.execute("COMMIT;")
+    return {"table": table, "rows": rows, "seconds": time.perf_counter() - start, "deferred_indexes": deferred}
+
+
+def ingest(db_path: str, sources: list[tuple[str, str]], if_exists: str = "append", chunksize: int = DEFAULT_CHUNKSIZE,
+           commit_rows: int = DEFAULT_COMMIT_ROWS, recommended_indexes: bool = False) -> dict:
+    """Loads every (table, source) pair, then builds the deferred (and optionally recommended) indexes."""
+    # Autocommit mode: transactions are managed explicitly in load_table
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        with bulk_load_settings(connection):
+            loads = [load_table(connection, table, source, if_exists, chunksize, commit_rows) for table, source in sources]
+
+            start = time.perf_counter()
+            connection.execute("BEGIN;")
+            for load in loads:
+                for sql in load["deferred_indexes"]:
+                    connection.execute(sql)
+            connection.execute("COMMIT;")
+            if recommended_indexes:
+                tables = {table for table, _ in sources}
+                create_indexes(connection, [index for index in RECOMMENDED_INDEXES if index[1] in tables])
+            else:
+                connection.execute("ANALYZE;")
+            index_seconds = time.perf_counter() - start
+    finally:
+        connection.close()
+    return {"loads": loads, "index_seconds": index_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="CSV / Parquet files or directories")
+    parser.add_argument("--db", required=True, help="SQLite database file (created if missing)")
+    parser.add_argument("--table", help="target table (single file source only; default: file name)")
+    parser.add_argument("--if-exists", choices=["append", "replace", "fail"], default="append")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows read per chunk")
+    parser.add_argument("--commit-rows", type=int, default=DEFAULT_COMMIT_ROWS, help="rows per transaction")
+    parser.add_argument("--recommended-indexes", action="store_true",
+                        help="also create the dashboard's recommended indexes (utils.index_advisor)")
+    args = parser.parse_args()
+
+    sources = [pair for path in args.sources for pair in discover_sources(path)]
+    if args.table:
+        if len(sources) != 1:
+            parser.error("--table needs exactly one source table")
+        sources = [(args.table, sources[0][1])]
+
+    start = time.perf_counter()
+    report = ingest(args.db, sources, args.if_exists, args.chunksize, args.commit_rows, args.recommended_indexes)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'table':<24} {'rows':>14} {'seconds':>9} {'rows/s':>12}")
+    for load in report["loads"]:
+        rate = load["rows"] / load["seconds"] if load["seconds"] else 0.0
+        print(f"{load['table']:<24} {load['rows']:>14,} {load['seconds']:>9.1f} {rate:>12,.0f}")
+    total = sum(load["rows"] for load in report["loads"])
+    print(f"indexes + ANALYZE: {report['index_seconds']:.1f}s")
+    print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s overall) -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
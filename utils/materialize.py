@@ -0,0 +1,178 @@
+"""Materialized summary tables for the EDA and recommendation pages.
+
+Builds small aggregate tables inside the SQLite database so the pages read a
+handful of pre-aggregated rows instead of re-joining the full order history:
+
+    summary_product_line_sales     quantity sold and gross profit per product line
+    summary_country_customers      customer count per country
+    summary_customer_product_line  quantity per (customer, product line)
+
+Refreshes are incremental: only orders with an orderNumber above the stored
+watermark (and customers above the customerNumber watermark) are folded into
+the existing totals. Use --full to rebuild from scratch, e.g. after historical
+rows were edited or deleted, or after product buy prices changed.
+
+The app only reads a summary table while its watermark has caught up with the
+source table (utils.queries.DERIVED_TABLE_WATERMARKS); after new orders or
+customers arrive, the pages run the live queries until the next refresh.
+
+Usage:
+    python -m utils.materialize            # incremental refresh (builds on first run)
+    python -m utils.materialize --full     # full rebuild
+    python -m utils.materialize --wal      # also switch the file to WAL journaling
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from utils.engine_factory import enable_wal
+
+DEFAULT_DATABASE_PATH = os.path.join("data", "classicmodels.sqlite")
+
+SUMMARY_TABLES = ("summary_product_line_sales", "summary_country_customers", "summary_customer_product_line")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summary_watermarks (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    refreshed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summary_product_line_sales (
+    productLine TEXT PRIMARY KEY,
+    TotalQuantitySold INTEGER NOT NULL,
+    GrossProfit REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summary_country_customers (
+    country TEXT PRIMARY KEY,
+    customer_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summary_customer_product_line (
+    customerNumber INTEGER NOT NULL,
+    productLine TEXT NOT NULL,
+    TotalQuantity INTEGER NOT NULL,
+    PRIMARY KEY (customerNumber, productLine)
+);
+CREATE INDEX IF NOT EXISTS idx_summary_customer_product_line_qty
+    ON summary_customer_product_line (customerNumber, TotalQuantity);
+"""
+
+# Each refresh statement folds rows above the watermark into the running totals.
+# (The WHERE clause is also what lets SQLite parse INSERT ... SELECT ... ON CONFLICT.)
+REFRESH_PRODUCT_LINE_SALES = """
+INSERT INTO summary_product_line_sales (productLine, TotalQuantitySold, GrossProfit)
+SELECT
+    p.productLine,
+    SUM(od.quantityOrdered),
+    SUM((od.priceEach - p.buyPrice) * od.quantityOrdered)
+FROM orderdetails od
+JOIN products p ON od.productCode = p.productCode
+WHERE od.orderNumber > :order_watermark AND od.orderNumber <= :order_high
+GROUP BY p.productLine
+ON CONFLICT (productLine) DO UPDATE SET
+    TotalQuantitySold = TotalQuantitySold + excluded.TotalQuantitySold,
+    GrossProfit = GrossProfit + excluded.GrossProfit;
+"""
+
+REFRESH_CUSTOMER_PRODUCT_LINE = """
+INSERT INTO summary_customer_product_line (customerNumber, productLine, TotalQuantity)
+SELECT
+    o.customerNumber,
+    p.productLine,
+    SUM(od.quantityOrdered)
+FROM orders o
+JOIN orderdetails od ON o.orderNumber = od.orderNumber
+JOIN products p ON od.productCode = p.productCode
+WHERE o.orderNumber > :order_watermark AND o.orderNumber <= :order_high
+GROUP BY o.customerNumber, p.productLine
+ON CONFLICT (customerNumber, productLine) DO UPDATE SET
+    TotalQuantity = TotalQuantity + excluded.TotalQuantity;
+"""
+
+REFRESH_COUNTRY_CUSTOMERS = """
+INSERT INTO summary_country_customers (country, customer_count)
+SELECT country, COUNT(customerNumber)
+FROM customers
+WHERE customerNumber > :customer_watermark AND customerNumber <= :customer_high
+GROUP BY country
+ON CONFLICT (country) DO UPDATE SET
+    customer_count = customer_count + excluded.customer_count;
+"""
+
+
+def get_watermark(connection: sqlite3.Connection, name: str) -> int | None:
+    row = connection.execute("SELECT value FROM summary_watermarks WHERE name = ?;", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def set_watermark(connection: sqlite3.Connection, name: str, value: int):
+    connection.execute(
+        "INSERT INTO summary_watermarks (name, value, refreshed_at) VALUES (?, ?, datetime('now')) "
+        "ON CONFLICT (name) DO UPDATE SET value = excluded.value, refreshed_at = excluded.refreshed_at;",
+        (name, value),
+    )
+
+
+def refresh_summaries(connection: sqlite3.Connection, full: bool = False) -> dict:
+    """Brings the summary tables up to date and returns what was processed.
+
+    Falls back to a full rebuild when the source tables shrank below a stored
+    watermark (data was replaced rather than appended).
+    """
+    start = time.perf_counter()
+    with connection:
+        connection.executescript(SCHEMA)
+        order_high = connection.execute("SELECT COALESCE(MAX(orderNumber), 0) FROM orders;").fetchone()[0]
+        customer_high = connection.execute("SELECT COALESCE(MAX(customerNumber), 0) FROM customers;").fetchone()[0]
+        order_watermark = get_watermark(connection, "orderNumber")
+        customer_watermark = get_watermark(connection, "customerNumber")
+
+        if full or order_watermark is None or customer_watermark is None \
+                or order_high < order_watermark or customer_high < customer_watermark:
+            full = True
+            for table in SUMMARY_TABLES:
+                connection.execute(f"DELETE FROM {table};")
+            order_watermark = customer_watermark = -1
+
+        params = {
+            "order_watermark": order_watermark,
+            "order_high": order_high,
+            "customer_watermark": customer_watermark,
+            "customer_high": customer_high,
+        }
+        connection.execute(REFRESH_PRODUCT_LINE_SALES, params)
+        connection.execute(REFRESH_CUSTOMER_PRODUCT_LINE, params)
+        connection.execute(REFRESH_COUNTRY_CUSTOMERS, params)
+        set_watermark(connection, "orderNumber", order_high)
+        set_watermark(connection, "customerNumber", customer_high)
+
+    return {
+        "mode": "full" if full else "incremental",
+        "orders_after": order_watermark,
+        "orders_through": order_high,
+        "customers_through": customer_high,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DATABASE_PATH, help="SQLite database file")
+    parser.add_argument("--full", action="store_true", help="rebuild every summary table from scratch")
+    parser.add_argument("--wal", action="store_true", help="switch the database to WAL journaling for concurrent readers")
+    args = parser.parse_args()
+
+    if args.wal:
+        print(f"journal_mode: {enable_wal(args.db)}")
+
+    connection = sqlite3.connect(args.db)
+    report = refresh_summaries(connection, full=args.full)
+    connection.close()
+    print(
+        f"{report['mode']} refresh: orders {report['orders_after'] + 1}..{report['orders_through']}, "
+        f"customers through {report['customers_through']} in {report['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Concurrent execution of a page's independent queries.
+
+A page that runs its queries one after another before each chart waits for
+the sum of their latencies. Instead, a page declares its queries up front on a
+`PageQueries` batch, which runs them on a shared thread pool (SQLite and the
+database drivers release the GIL while a statement executes), at most
+`max_concurrency` at a time per page. The page lays out its sections with
+placeholders and fills each one as its result lands (`as_completed`), so page
+latency approaches that of the slowest query:
+
+    batch = PageQueries("01_eda")
+    batch.submit("country", run_query, "summary_country_counts")
+    ...
+    for key, df in batch.as_completed():
+        with slots[key].container():
+            batch.show_errors(key)
+            render[key](df)
+
+Each query runs in a copy of the page's context, so profiling records keep the
+page's name, and query errors are collected for the page to show in the
+section they belong to. Results go through the shared query cache as usual.
+DASHBOARD_PAGE_CONCURRENCY sets the per-page cap; 0 runs the queries on the
+script thread in submission order, as before.
+"""
+import contextvars
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+import streamlit as st
+
+from utils.db_connector import collect_query_errors
+
+# Threads shared by all sessions; matches the default SQLite connection pool size
+PAGE_QUERY_WORKERS = 8
+# Queries of one page running at the same time
+DEFAULT_PAGE_CONCURRENCY = 4
+
+_default_concurrency = int(os.environ.get("DASHBOARD_PAGE_CONCURRENCY", DEFAULT_PAGE_CONCURRENCY))
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PAGE_QUERY_WORKERS, thread_name_prefix="page-query")
+        return _executor
+
+
+@dataclass
+class _Task:
+    key: str
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    # Copied on the script thread at submit time (page name for profiling)
+    context: contextvars.Context
+    future: Future | None = None
+    errors: list[str] = field(default_factory=list)
+
+    def run(self) -> Any:
+        with collect_query_errors() as errors:
+            try:
+                return self.fn(*self.args, **self.kwargs)
+            finally:
+                self.errors.extend(errors)
+
+
+class PageQueries:
+    """The queries of one page run, executed concurrently and consumed as they complete."""
+
+    def __init__(self, page: str, max_concurrency: int | None = None):
+        self.page = page
+        self.max_concurrency = max(0, _default_concurrency if max_concurrency is None else max_concurrency)
+        self._tasks: dict[str, _Task] = {}
+        self._queued: deque[_Task] = deque()
+        self._completed: queue.SimpleQueue = queue.SimpleQueue()
+        self._in_flight = 0
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn: Callable, *args, **kwargs):
+        """Schedules `fn(*args, **kwargs)` (e.g. run_query and its arguments) under `key`."""
+        if key in self._tasks:
+            raise ValueError(f"Duplicate page query key: '{key}'")
+        task = _Task(key, fn, args, kwargs, contextvars.copy_context())
+        self._tasks[key] = task
+        if self.max_concurrency:
+            with self._lock:
+                self._queued.append(task)
+            self._launch()
+
+    def _launch(self):
+        # Submitting outside the lock: a future that is already done runs its callback right away
+        while True:
+            with self._lock:
+                if self._cancelled or not self._queued or self._in_flight >= self.max_concurrency:
+                    return
+                task = self._queued.popleft()
+                self._in_flight += 1
+            task.future = _get_executor().submit(task.context.run, task.run)
+            task.future.add_done_callback(lambda _, task=task: self._finished(task))
+
+    def _finished(self, task: _Task):
+        with self._lock:
+            self._in_flight -= 1
+        self._completed.put(task)
+        self._launch()
+
+    def as_completed(self) -> Iterator[tuple[str, Any]]:
+        """Yields (key, result) as each query finishes; re-raises a query's exception in the page.
+
+        Queries not yet started are cancelled if the page stops consuming early
+        (e.g. the script run is interrupted).
+        """
+        try:
+            if not self.max_concurrency:
+                for task in self._tasks.values():
+                    yield task.key, task.context.run(task.run)
+                return
+            for _ in range(len(self._tasks)):
+                task = self._completed.get()
+                yield task.key, task.future.result()
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """Drops the queries that have not started; running ones finish (their results are still cached)."""
+        with self._lock:
+            self._cancelled = True
+            self._queued.clear()
+
+    def errors(self, key: str) -> list[str]:
+        """Query error messages collected while running `key`."""
+        return self._tasks[key].errors
+
+    def show_errors(self, key: str):
+        """Shows the query errors of `key` with st.error (call inside the section's placeholder)."""
+        for message in self.errors(key):
+            st.error(message)
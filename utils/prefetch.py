@@ -0,0 +1,146 @@
+"""Background prefetching of the queries the next pages will run.
+
+Users mostly walk the pages in order (home -> EDA -> ML pages), yet every page
+only starts querying once it is opened. After a page has rendered it calls
+`prefetch_adjacent(page)`, which warms the shared query cache on a small thread
+pool with the parameterless queries of the neighbouring pages (PAGE_QUERIES
+order) and the customer lists behind the churn / recommendation selectboxes.
+
+Jobs belong to a browser session: a session's previous job is cancelled when
+it schedules a new one, and queued queries are skipped once the session has
+ended. Queries already in the cache are not re-run. Set DASHBOARD_PREFETCH=0
+to disable prefetching.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from utils import profiling
+from utils.db_connector import is_cached, run_query
+from utils.queries import PAGE_QUERIES, get_query
+
+logger = logging.getLogger(__name__)
+
+# Background threads, kept small so prefetching never competes with the pages' own queries
+PREFETCH_WORKERS = 2
+# Selectbox options of the churn and recommendation pages, warmed from every page
+CUSTOMER_LIST_QUERIES = ("customer_options",)
+PAGE_ORDER = tuple(PAGE_QUERIES)
+
+_enabled = os.environ.get("DASHBOARD_PREFETCH", "1").strip().lower() not in ("0", "false", "no", "off")
+_executor: ThreadPoolExecutor | None = None
+_jobs: dict[str, "PrefetchJob"] = {}
+_stats = {"fetched": 0, "cached": 0, "cancelled": 0, "failed": 0}
+_lock = threading.Lock()
+
+
+@dataclass
+class PrefetchJob:
+    session_id: str | None
+    queries: tuple[str, ...]
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    futures: list[Future] = field(default_factory=list)
+
+    def cancel(self) -> int:
+        """Stops the job and returns how many queued queries were dropped (a running one finishes)."""
+        self.cancelled.set()
+        return sum(future.cancel() for future in self.futures)
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+
+def adjacent_pages(page: str) -> list[str]:
+    """The next page, then the previous one, in navigation order."""
+    if page not in PAGE_ORDER:
+        return []
+    position = PAGE_ORDER.index(page)
+    return [PAGE_ORDER[i] for i in (position + 1, position - 1) if 0 <= i < len(PAGE_ORDER)]
+
+
+def prefetch_queries(page: str) -> tuple[str, ...]:
+    """Queries worth warming after `page`: parameterless queries of the adjacent pages plus the customer lists."""
+    names = [name for other in adjacent_pages(page) for name in PAGE_QUERIES[other]]
+    names += CUSTOMER_LIST_QUERIES
+    # Parameterised queries (e.g. one customer's profile) depend on a selection that is not known yet
+    candidates = [name for name in names if name not in PAGE_QUERIES.get(page, ()) and not get_query(name).params]
+    return tuple(dict.fromkeys(candidates))
+
+
+def _session_active(session_id: str | None) -> bool:
+    if session_id is None:
+        return True
+    from streamlit import runtime
+
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+
+def _count(outcome: str, n: int = 1):
+    with _lock:
+        _stats[outcome] += n
+
+
+def _prefetch(job: PrefetchJob, name: str):
+    if job.cancelled.is_set() or not _session_active(job.session_id):
+        job.cancelled.set()
+        _count("cancelled")
+        return
+    profiling.set_page("prefetch")
+    try:
+        if is_cached(name):
+            _count("cached")
+            return
+        run_query(name)
+        _count("fetched")
+    except Exception:
+        # The page runs (and reports) the query itself when it is opened
+        logger.exception("Prefetching query '%s' failed.", name)
+        _count("failed")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+    return _executor
+
+
+def prefetch_adjacent(page: str) -> PrefetchJob | None:
+    """Warms the cache for the pages next to `page` in the background (call once the page has rendered)."""
+    if not _enabled:
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    session_id = ctx.session_id if ctx is not None else None
+    job = PrefetchJob(session_id, prefetch_queries(page))
+
+    with _lock:
+        previous = _jobs.pop(session_id, None)
+        if previous is not None:
+            _stats["cancelled"] += previous.cancel()
+        # Forget finished jobs and those of sessions that have ended
+        for other_id, other in list(_jobs.items()):
+            if other.done() or not _session_active(other_id):
+                _stats["cancelled"] += other.cancel()
+                del _jobs[other_id]
+        executor = _get_executor()
+        job.futures = [executor.submit(_prefetch, job, name) for name in job.queries]
+        _jobs[session_id] = job
+    return job
+
+
+def cancel_session(session_id: str | None):
+    """Cancels the pending prefetch work of a session."""
+    with _lock:
+        job = _jobs.pop(session_id, None)
+    if job is not None:
+        _count("cancelled", job.cancel())
+
+
+def prefetch_stats() -> dict:
+    """Counts of prefetched, already-cached, cancelled and failed queries, plus active jobs."""
+    with _lock:
+        return {**_stats, "active_jobs": sum(not job.done() for job in _jobs.values()), "enabled": _enabled}
@@ -0,0 +1,212 @@
+"""Lightweight profiling of dashboard queries and chart sections.
+
+When enabled, get_data/run_query record per-query execute and fetch time, row
+count, result bytes and cache outcome, and pages time their chart sections
+(figure build and Streamlit render) with `section()`. Records are kept in a
+bounded in-process buffer, shown on the diagnostics page and exportable as JSON
+or OpenMetrics text.
+
+Profiling is off by default; enable it with DASHBOARD_PROFILING=1 or from the
+diagnostics page. While disabled, `section()` returns a shared no-op context
+manager and the query path skips all timing, so the cost is one flag check.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+# Most recent records kept per process (oldest are dropped first)
+MAX_RECORDS = 5000
+
+_enabled = os.environ.get("DASHBOARD_PROFILING", "").strip().lower() in ("1", "true", "yes", "on")
+_records: deque = deque(maxlen=MAX_RECORDS)
+_lock = threading.Lock()
+_page: ContextVar[str] = ContextVar("dashboard_page", default="-")
+_NULL_SECTION = nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    """Turns profiling on or off for the whole process (every session)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def set_page(page: str):
+    """Attributes the records of the current script run to `page` (call at the top of a page)."""
+    _page.set(page)
+
+
+def current_page() -> str:
+    return _page.get()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def record_query(query: str, cache: str, rows: int, nbytes: int, execute_seconds: float = 0.0,
+                 fetch_seconds: float = 0.0, error: str | None = None):
+    """Stores one query record (called by utils.db_connector when profiling is enabled)."""
+    record = {
+        "kind": "query",
+        "page": _page.get(),
+        "name": query,
+        "cache": cache,
+        "execute_ms": execute_seconds * 1000,
+        "fetch_ms": fetch_seconds * 1000,
+        "rows": rows,
+        "bytes": nbytes,
+        "error": error,
+        "at": _now(),
+    }
+    with _lock:
+        _records.append(record)
+
+
+@contextmanager
+def _timed_section(name: str, phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = {
+            "kind": "section",
+            "page": _page.get(),
+            "name": name,
+            "phase": phase,
+            "duration_ms": (time.perf_counter() - start) * 1000,
+            "at": _now(),
+        }
+        with _lock:
+            _records.append(record)
+
+
+def section(name: str, phase: str = "figure"):
+    """Times a page section, e.g. `with section("1.1 Country bar", "render"): st.plotly_chart(...)`.
+
+    `phase` separates figure construction ("figure") from Streamlit rendering
+    ("render") or model work ("model"). A no-op while profiling is disabled.
+    """
+    if not _enabled:
+        return _NULL_SECTION
+    return _timed_section(name, phase)
+
+
+def records() -> list[dict]:
+    with _lock:
+        return list(_records)
+
+
+def clear():
+    with _lock:
+        _records.clear()
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(items: list[dict] | None = None) -> list[dict]:
+    """Aggregates records per (page, kind, name, phase): count, total / p50 / p95 / max ms,
+    rows, bytes and cache hits."""
+    groups: dict[tuple, list[dict]] = {}
+    for record in records() if items is None else items:
+        key = (record["page"], record["kind"], record["name"], record.get("phase", "query"))
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for (page, kind, name, phase), group in sorted(groups.items()):
+        durations = [
+            r["duration_ms"] if kind == "section" else r["execute_ms"] + r["fetch_ms"] for r in group
+        ]
+        row = {
+            "page": page, "kind": kind, "name": name, "phase": phase, "count": len(group),
+            "total_ms": sum(durations), "mean_ms": statistics.fmean(durations),
+            "p50_ms": _percentile(durations, 50), "p95_ms": _percentile(durations, 95), "max_ms": max(durations),
+        }
+        if kind == "query":
+            row.update({
+                "execute_ms": sum(r["execute_ms"] for r in group),
+                "fetch_ms": sum(r["fetch_ms"] for r in group),
+                "rows": sum(r["rows"] for r in group),
+                "bytes": sum(r["bytes"] for r in group),
+                "cache_hits": sum(r["cache"] == "hit" for r in group),
+                "errors": sum(r["error"] is not None for r in group),
+            })
+        summary.append(row)
+    return summary
+
+
+def export_json(items: list[dict] | None = None) -> str:
+    """Raw records plus the per-name summary as a JSON document."""
+    items = records() if items is None else items
+    return json.dumps({"exported_at": _now(), "records": items, "summary": summarize(items)}, indent=2)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def export_openmetrics(items: list[dict] | None = None) -> str:
+    """The summary in OpenMetrics text format (durations in seconds), for offline analysis."""
+    summary = summarize(items)
+    queries = [row for row in summary if row["kind"] == "query"]
+    sections = [row for row in summary if row["kind"] == "section"]
+    lines = []
+
+    lines += [
+        "# TYPE dashboard_query_duration_seconds summary",
+        "# UNIT dashboard_query_duration_seconds seconds",
+        "# HELP dashboard_query_duration_seconds Query execute + fetch time.",
+    ]
+    for row in queries:
+        labels = dict(page=row["page"], query=row["name"])
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+            lines.append(f"dashboard_query_duration_seconds{_labels(**labels, quantile=quantile)} {row[key] / 1000:.6f}")
+        lines.append(f"dashboard_query_duration_seconds_count{_labels(**labels)} {row['count']}")
+        lines.append(f"dashboard_query_duration_seconds_sum{_labels(**labels)} {row['total_ms'] / 1000:.6f}")
+
+    for metric, key, help_text in (
+        ("dashboard_query_execute_seconds", "execute_ms", "Time spent executing queries."),
+        ("dashboard_query_fetch_seconds", "fetch_ms", "Time spent fetching rows into DataFrames."),
+    ):
+        lines += [f"# TYPE {metric} counter", f"# UNIT {metric} seconds", f"# HELP {metric} {help_text}"]
+        lines += [f"{metric}_total{_labels(page=row['page'], query=row['name'])} {row[key] / 1000:.6f}" for row in queries]
+
+    for metric, key, help_text in (
+        ("dashboard_query_rows", "rows", "Rows returned."),
+        ("dashboard_query_bytes", "bytes", "Result DataFrame bytes."),
+        ("dashboard_query_cache_hits", "cache_hits", "Results served from the query cache."),
+        ("dashboard_query_errors", "errors", "Failed queries."),
+    ):
+        lines += [f"# TYPE {metric} counter", f"# HELP {metric} {help_text}"]
+        lines += [f"{metric}_total{_labels(page=row['page'], query=row['name'])} {row[key]}" for row in queries]
+
+    lines += [
+        "# TYPE dashboard_section_duration_seconds summary",
+        "# UNIT dashboard_section_duration_seconds seconds",
+        "# HELP dashboard_section_duration_seconds Page section time (figure build / render / model).",
+    ]
+    for row in sections:
+        labels = dict(page=row["page"], section=row["name"], phase=row["phase"])
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+            lines.append(f"dashboard_section_duration_seconds{_labels(**labels, quantile=quantile)} {row[key] / 1000:.6f}")
+        lines.append(f"dashboard_section_duration_seconds_count{_labels(**labels)} {row['count']}")
+        lines.append(f"dashboard_section_duration_seconds_sum{_labels(**labels)} {row['total_ms'] / 1000:.6f}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,647 @@
+from dataclasses import dataclass, field
+
+from sqlalchemy import TextClause, text
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """A registered dashboard query with bound parameters and its own cache policy.
+
+    The SQL is wrapped in a `text()` construct once at registration, so every
+    execution reuses the same statement object (and SQLAlchemy's compiled-SQL cache).
+    `ttl` overrides the default result-cache TTL; `cache=False` bypasses the cache.
+    Queries over optional tables (e.g. materialized summaries) list them in
+    `requires` and name a `fallback` query to run when they are absent, or when a
+    derived table in DERIVED_TABLE_WATERMARKS fell behind its source tables.
+    `variants` maps a SQLAlchemy dialect name ("mssql", "mysql") to SQL that
+    replaces `sql` on that backend (e.g. TOP instead of LIMIT).
+    `analytical=True` marks aggregate scans that may run on the optional DuckDB
+    mirror (utils/analytical.py; its SQL can be overridden with a "duckdb" variant).
+    """
+    name: str
+    sql: str
+    params: tuple = ()
+    ttl: float | None = None
+    cache: bool = True
+    description: str = ""
+    requires: tuple = ()
+    fallback: str | None = None
+    variants: dict = field(default_factory=dict)
+    analytical: bool = False
+    statement: TextClause = field(init=False, repr=False, compare=False)
+    _variant_statements: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "statement", text(self.sql))
+        object.__setattr__(self, "_variant_statements", {dialect: text(sql) for dialect, sql in self.variants.items()})
+
+    def sql_for(self, dialect: str) -> str:
+        """Returns the SQL text to run on the given dialect."""
+        return self.variants.get(dialect, self.sql)
+
+    def statement_for(self, dialect: str) -> TextClause:
+        """Returns the prepared statement to run on the given dialect."""
+        return self._variant_statements.get(dialect, self.statement)
+
+
+QUERY_REGISTRY: dict[str, NamedQuery] = {}
+
+
+def register_query(
+    name: str,
+    sql: str,
+    params: tuple = (),
+    ttl: float | None = None,
+    cache: bool = True,
+    description: str = "",
+    requires: tuple = (),
+    fallback: str | None = None,
+    variants: dict | None = None,
+    analytical: bool = False,
+) -> NamedQuery:
+    """Adds a query to the registry and returns it."""
+    if name in QUERY_REGISTRY:
+        raise ValueError(f"Query '{name}' is already registered.")
+    query = NamedQuery(
+        name=name, sql=sql, params=tuple(params), ttl=ttl, cache=cache,
+        description=description, requires=tuple(requires), fallback=fallback,
+        variants=dict(variants or {}), analytical=analytical,
+    )
+    QUERY_REGISTRY[name] = query
+    return query
+
+
+def get_query(name: str) -> NamedQuery:
+    """Looks up a registered query by name."""
+    try:
+        return QUERY_REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Unknown query '{name}'. Registered: {sorted(QUERY_REGISTRY)}") from None
+
+
+# --- App / health check ---
+register_query(
+    "customer_count",
+    "SELECT COUNT(customerNumber) AS total_customers FROM customers;",
+    ttl=60,
+    description="Total number of customers (home page health check).",
+)
+
+# --- EDA page ---
+register_query(
+    "eda_country_counts",
+    """
+    SELECT
+        country,
+        COUNT(customerNumber) AS customer_count
+    FROM
+        customers
+    GROUP BY
+        country
+    ORDER BY
+        customer_count DESC, country
+    LIMIT 10;
+    """,
+    ttl=3600,
+    description="Top 10 countries by customer count.",
+    analytical=True,
+    variants={
+        "mssql": """
+        SELECT TOP 10
+            country,
+            COUNT(customerNumber) AS customer_count
+        FROM customers
+        GROUP BY country
+        ORDER BY customer_count DESC, country;
+        """,
+    },
+)
+
+register_query(
+    "eda_credit_limit_range",
+    "SELECT MIN(creditLimit) AS lo, MAX(creditLimit) AS hi FROM customers;",
+    ttl=3600,
+    description="Credit limit range (histogram bin edges).",
+    analytical=True,
+)
+
+register_query(
+    "eda_credit_limit_bins",
+    """
+    SELECT bin, COUNT(*) AS count
+    FROM (
+        SELECT CAST((creditLimit - :lo) / :width AS INTEGER) AS bin
+        FROM customers
+        WHERE creditLimit IS NOT NULL
+    ) binned
+    GROUP BY bin;
+    """,
+    params=("lo", "width"),
+    ttl=3600,
+    description="Customers per equal-width credit limit bin (histogram counted in SQL).",
+    analytical=True,
+    variants={
+        # CAST AS INTEGER truncates on SQLite (values are >= lo); MySQL / SQL Server spell it FLOOR
+        "mysql": """
+        SELECT bin, COUNT(*) AS count
+        FROM (
+            SELECT FLOOR((creditLimit - :lo) / :width) AS bin
+            FROM customers
+            WHERE creditLimit IS NOT NULL
+        ) binned
+        GROUP BY bin;
+        """,
+        "mssql": """
+        SELECT bin, COUNT(*) AS count
+        FROM (
+            SELECT FLOOR((creditLimit - :lo) / :width) AS bin
+            FROM customers
+            WHERE creditLimit IS NOT NULL
+        ) binned
+        GROUP BY bin;
+        """,
+        # DuckDB's CAST rounds to the nearest integer
+        "duckdb": """
+        SELECT bin, COUNT(*) AS count
+        FROM (
+            SELECT CAST(FLOOR((creditLimit - :lo) / :width) AS BIGINT) AS bin
+            FROM customers
+            WHERE creditLimit IS NOT NULL
+        ) binned
+        GROUP BY bin;
+        """,
+    },
+)
+
+register_query(
+    "eda_product_line_sales",
+    """
+    SELECT
+        pl.productLine,
+        SUM(od.quantityOrdered) AS TotalQuantitySold
+    FROM
+        productlines pl
+    JOIN
+        products p ON pl.productLine = p.productLine
+    JOIN
+        orderdetails od ON p.productCode = od.productCode
+    GROUP BY
+        pl.productLine
+    ORDER BY
+        TotalQuantitySold DESC;
+    """,
+    ttl=3600,
+    description="Total quantity sold per product line.",
+    analytical=True,
+)
+
+register_query(
+    "eda_product_line_profit",
+    """
+    SELECT
+        pl.productLine,
+        SUM((od.priceEach - p.buyPrice) * od.quantityOrdered) AS GrossProfit
+    FROM
+        productlines pl
+    JOIN
+        products p ON pl.productLine = p.productLine
+    JOIN
+        orderdetails od ON p.productCode = od.productCode
+    GROUP BY
+        pl.productLine
+    ORDER BY
+        GrossProfit DESC;
+    """,
+    ttl=3600,
+    description="Gross profit per product line.",
+    analytical=True,
+)
+
+# --- Materialized summaries (built by `python -m utils.materialize`) ---
+register_query(
+    "summary_country_counts",
+    """
+    SELECT country, customer_count
+    FROM summary_country_customers
+    ORDER BY customer_count DESC, country
+    LIMIT 10;
+    """,
+    ttl=3600,
+    description="Top 10 countries by customer count (materialized).",
+    requires=("summary_country_customers",),
+    fallback="eda_country_counts",
+    variants={
+        "mssql": """
+        SELECT TOP 10 country, customer_count
+        FROM summary_country_customers
+        ORDER BY customer_count DESC, country;
+        """,
+    },
+)
+
+register_query(
+    "summary_product_line_sales",
+    """
+    SELECT productLine, TotalQuantitySold
+    FROM summary_product_line_sales
+    ORDER BY TotalQuantitySold DESC;
+    """,
+    ttl=3600,
+    description="Total quantity sold per product line (materialized).",
+    requires=("summary_product_line_sales",),
+    fallback="eda_product_line_sales",
+)
+
+register_query(
+    "summary_product_line_profit",
+    """
+    SELECT productLine, GrossProfit
+    FROM summary_product_line_sales
+    ORDER BY GrossProfit DESC;
+    """,
+    ttl=3600,
+    description="Gross profit per product line (materialized).",
+    requires=("summary_product_line_sales",),
+    fallback="eda_product_line_profit",
+)
+
+# --- Customer lookups (churn & recommendation pages) ---
+register_query(
+    "customer_options",
+    "SELECT customerNumber, customerName FROM customers ORDER BY customerName;",
+    ttl=3600,
+    description="Customer ids and names for the selection boxes.",
+)
+
+register_query(
+    "customer_profile",
+    """
+    SELECT customerNumber, customerName, country, creditLimit
+    FROM customers
+    WHERE customerNumber = :customer_id;
+    """,
+    params=("customer_id",),
+    description="One customer's profile (point lookup).",
+)
+
+register_query(
+    "customer_order_history",
+    """
+    SELECT
+        o.orderNumber,
+        o.orderDate,
+        o.status,
+        SUM(od.quantityOrdered) AS quantity,
+        SUM(od.quantityOrdered * od.priceEach) AS amount
+    FROM orders o
+    JOIN orderdetails od ON o.orderNumber = od.orderNumber
+    WHERE o.customerNumber = :customer_id
+    GROUP BY o.orderNumber, o.orderDate, o.status
+    ORDER BY o.orderDate;
+    """,
+    params=("customer_id",),
+    description="One customer's order history with order totals.",
+)
+
+register_query(
+    "customer_top_product_line",
+    """
+    WITH CustomerProductSales AS (
+        SELECT
+            pl.productLine,
+            SUM(od.quantityOrdered) AS TotalQuantity
+        FROM
+            orders o
+        JOIN orderdetails od ON o.orderNumber = od.orderNumber
+        JOIN products p ON od.productCode = p.productCode
+        JOIN productlines pl ON p.productLine = pl.productLine
+        WHERE
+            o.customerNumber = :customer_id
+        GROUP BY
+            pl.productLine
+    )
+    SELECT productLine, TotalQuantity
+    FROM CustomerProductSales
+    ORDER BY TotalQuantity DESC, productLine
+    LIMIT 1;
+    """,
+    params=("customer_id",),
+    description="One customer's most purchased product line.",
+    variants={
+        "mssql": """
+        SELECT TOP 1 pl.productLine, SUM(od.quantityOrdered) AS TotalQuantity
+        FROM orders o
+        JOIN orderdetails od ON o.orderNumber = od.orderNumber
+        JOIN products p ON od.productCode = p.productCode
+        JOIN productlines pl ON p.productLine = pl.productLine
+        WHERE o.customerNumber = :customer_id
+        GROUP BY pl.productLine
+        ORDER BY TotalQuantity DESC, pl.productLine;
+        """,
+    },
+)
+
+register_query(
+    "summary_customer_top_product_line",
+    """
+    SELECT productLine, TotalQuantity
+    FROM summary_customer_product_line
+    WHERE customerNumber = :customer_id
+    ORDER BY TotalQuantity DESC, productLine
+    LIMIT 1;
+    """,
+    params=("customer_id",),
+    description="One customer's most purchased product line (materialized).",
+    requires=("summary_customer_product_line",),
+    fallback="customer_top_product_line",
+    variants={
+        "mssql": """
+        SELECT TOP 1 productLine, TotalQuantity
+        FROM summary_customer_product_line
+        WHERE customerNumber = :customer_id
+        ORDER BY TotalQuantity DESC, productLine;
+        """,
+    },
+)
+
+# --- Credit risk page ---
+register_query(
+    "customer_countries",
+    "SELECT DISTINCT country FROM customers ORDER BY country;",
+    ttl=3600,
+    description="Distinct customer countries.",
+)
+
+
+# --- ML feature extraction (feat_eng/feature_engineering.py) ---
+register_query(
+    "order_date_range",
+    "SELECT MIN(orderDate) AS first_order_date, MAX(orderDate) AS last_order_date FROM orders;",
+    ttl=3600,
+    description="First and last order dates in the history.",
+)
+
+register_query(
+    "features_customer_rfm",
+    """
+    SELECT
+        c.customerNumber,
+        c.country,
+        c.creditLimit,
+        COUNT(DISTINCT o.orderNumber) AS frequency,
+        MIN(o.orderDate) AS first_order_date,
+        MAX(o.orderDate) AS last_order_date,
+        COALESCE(SUM(od.quantityOrdered * od.priceEach), 0) AS monetary,
+        COALESCE(SUM(od.quantityOrdered), 0) AS quantity
+    FROM customers c
+    LEFT JOIN orders o
+        ON o.customerNumber = c.customerNumber AND o.orderDate <= :as_of
+    LEFT JOIN orderdetails od
+        ON od.orderNumber = o.orderNumber
+    GROUP BY c.customerNumber, c.country, c.creditLimit;
+    """,
+    params=("as_of",),
+    description="Per-customer recency/frequency/monetary aggregates up to a date.",
+    analytical=True,
+)
+
+register_query(
+    "features_customer_product_lines",
+    """
+    SELECT
+        o.customerNumber,
+        p.productLine,
+        SUM(od.quantityOrdered) AS quantity
+    FROM orders o
+    JOIN orderdetails od ON o.orderNumber = od.orderNumber
+    JOIN products p ON od.productCode = p.productCode
+    WHERE o.orderDate <= :as_of
+    GROUP BY o.customerNumber, p.productLine;
+    """,
+    params=("as_of",),
+    description="Quantity per (customer, product line) up to a date.",
+    analytical=True,
+)
+
+register_query(
+    "customers_ordering_between",
+    """
+    SELECT DISTINCT customerNumber
+    FROM orders
+    WHERE orderDate > :start_date AND orderDate <= :end_date;
+    """,
+    params=("start_date", "end_date"),
+    description="Customers with at least one order in a date window (churn labels).",
+)
+
+# --- Churn activity windows (model/churn_windows.py) ---
+# Window bounds come from model.churn_windows.window_bounds(reference day): each window is [start_<days>, end).
+CHURN_WINDOW_PARAMS = ("customer_id", "start_30", "start_90", "start_365", "end")
+
+register_query(
+    "churn_customer_windows",
+    """
+    SELECT orders_30, spend_30, paid_30, orders_90, spend_90, paid_90, orders_365, spend_365, paid_365
+    FROM churn_windows
+    WHERE customerNumber = :customer_id;
+    """,
+    params=CHURN_WINDOW_PARAMS,
+    description="One customer's 30/90/365-day orders, spend and payments (maintained incrementally).",
+    requires=("churn_windows",),
+    fallback="churn_customer_windows_live",
+)
+
+register_query(
+    "churn_customer_windows_live",
+    """
+    SELECT
+        COALESCE(SUM(CASE WHEN day >= :start_30 THEN orders END), 0) AS orders_30,
+        COALESCE(SUM(CASE WHEN day >= :start_30 THEN spend END), 0) AS spend_30,
+        COALESCE(SUM(CASE WHEN day >= :start_30 THEN paid END), 0) AS paid_30,
+        COALESCE(SUM(CASE WHEN day >= :start_90 THEN orders END), 0) AS orders_90,
+        COALESCE(SUM(CASE WHEN day >= :start_90 THEN spend END), 0) AS spend_90,
+        COALESCE(SUM(CASE WHEN day >= :start_90 THEN paid END), 0) AS paid_90,
+        COALESCE(SUM(CASE WHEN day >= :start_365 THEN orders END), 0) AS orders_365,
+        COALESCE(SUM(CASE WHEN day >= :start_365 THEN spend END), 0) AS spend_365,
+        COALESCE(SUM(CASE WHEN day >= :start_365 THEN paid END), 0) AS paid_365
+    FROM (
+        SELECT
+            o.orderDate AS day,
+            COUNT(DISTINCT o.orderNumber) AS orders,
+            COALESCE(SUM(od.quantityOrdered * od.priceEach), 0) AS spend,
+            0 AS paid
+        FROM orders o
+        LEFT JOIN orderdetails od ON od.orderNumber = o.orderNumber
+        WHERE o.customerNumber = :customer_id AND o.orderDate >= :start_365 AND o.orderDate < :end
+        GROUP BY o.orderDate
+        UNION ALL
+        SELECT paymentDate, 0, 0, SUM(amount)
+        FROM payments
+        WHERE customerNumber = :customer_id AND paymentDate >= :start_365 AND paymentDate < :end
+        GROUP BY paymentDate
+    ) activity;
+    """,
+    params=CHURN_WINDOW_PARAMS,
+    description="Live fallback for churn_customer_windows (one customer's orders and payments of the last year).",
+)
+
+register_query(
+    "churn_customer_activity",
+    """
+    SELECT day, orders, spend, paid
+    FROM churn_daily_activity
+    WHERE customerNumber = :customer_id AND day >= :start_365 AND day < :end
+    ORDER BY day;
+    """,
+    params=CHURN_WINDOW_PARAMS,
+    description="One customer's daily orders, spend and payments over the last year (trend sparklines).",
+    requires=("churn_daily_activity",),
+    fallback="churn_customer_activity_live",
+)
+
+register_query(
+    "churn_customer_activity_live",
+    """
+    SELECT day, SUM(orders) AS orders, SUM(spend) AS spend, SUM(paid) AS paid
+    FROM (
+        SELECT
+            o.orderDate AS day,
+            COUNT(DISTINCT o.orderNumber) AS orders,
+            COALESCE(SUM(od.quantityOrdered * od.priceEach), 0) AS spend,
+            0 AS paid
+        FROM orders o
+        LEFT JOIN orderdetails od ON od.orderNumber = o.orderNumber
+        WHERE o.customerNumber = :customer_id AND o.orderDate >= :start_365 AND o.orderDate < :end
+        GROUP BY o.orderDate
+        UNION ALL
+        SELECT paymentDate, 0, 0, SUM(amount)
+        FROM payments
+        WHERE customerNumber = :customer_id AND paymentDate >= :start_365 AND paymentDate < :end
+        GROUP BY paymentDate
+    ) activity
+    GROUP BY day
+    ORDER BY day;
+    """,
+    params=CHURN_WINDOW_PARAMS,
+    description="Live fallback for churn_customer_activity.",
+)
+
+# --- Recommendation engine (model/recommender.py) ---
+register_query(
+    "reco_interactions",
+    """
+    SELECT
+        o.customerNumber,
+        od.productCode,
+        SUM(od.quantityOrdered) AS quantity
+    FROM orders o
+    JOIN orderdetails od ON o.orderNumber = od.orderNumber
+    WHERE o.orderNumber > :after_order
+    GROUP BY o.customerNumber, od.productCode;
+    """,
+    params=("after_order",),
+    cache=False,
+    description="Quantity per (customer, product) for orders above a watermark (0 = all).",
+    analytical=True,
+)
+
+register_query(
+    "reco_order_watermark",
+    "SELECT COALESCE(MAX(orderNumber), 0) AS max_order FROM orders;",
+    cache=False,
+    description="Highest orderNumber, used as the recommender's incremental watermark.",
+)
+
+register_query(
+    "product_catalog",
+    "SELECT productCode, productName, productLine FROM products;",
+    ttl=3600,
+    description="Product names and lines for displaying recommendations.",
+)
+
+# --- Credit risk (model/credit_risk.py) ---
+register_query(
+    "credit_customer_book",
+    """
+    SELECT
+        c.customerNumber,
+        c.customerName,
+        c.country,
+        c.creditLimit,
+        o.first_order_date,
+        o.last_order_date,
+        COALESCE(o.total_ordered, 0) AS total_ordered,
+        COALESCE(p.total_paid, 0) AS total_paid
+    FROM customers c
+    LEFT JOIN (
+        SELECT
+            ord.customerNumber,
+            MIN(ord.orderDate) AS first_order_date,
+            MAX(ord.orderDate) AS last_order_date,
+            SUM(od.quantityOrdered * od.priceEach) AS total_ordered
+        FROM orders ord
+        JOIN orderdetails od ON od.orderNumber = ord.orderNumber
+        GROUP BY ord.customerNumber
+    ) o ON o.customerNumber = c.customerNumber
+    LEFT JOIN (
+        SELECT customerNumber, SUM(amount) AS total_paid
+        FROM payments
+        GROUP BY customerNumber
+    ) p ON p.customerNumber = c.customerNumber;
+    """,
+    description="Per-customer order value, payments and active period for scoring the credit book.",
+    analytical=True,
+)
+
+# --- Derived-table freshness ---
+# Watermarks (summary_watermarks) each derived table must have caught up with, mapped to the
+# column of `derived_source_highs` they track. Tables whose watermark is behind (new orders
+# or customers arrived since the last refresh) are read as absent, i.e. through the fallback.
+DERIVED_TABLE_WATERMARKS = {
+    "summary_product_line_sales": {"orderNumber": "orders"},
+    "summary_customer_product_line": {"orderNumber": "orders"},
+    "summary_country_customers": {"customerNumber": "customers"},
+    "churn_windows": {"churn_orderNumber": "orders", "churn_payment_rowid": "payments", "churn_customerNumber": "customers"},
+    "churn_daily_activity": {"churn_orderNumber": "orders", "churn_payment_rowid": "payments"},
+}
+
+register_query(
+    "derived_table_watermarks",
+    "SELECT name, value FROM summary_watermarks;",
+    description="Source rows folded into the materialized tables so far (utils/materialize.py, model/churn_windows.py).",
+)
+
+register_query(
+    "derived_source_highs",
+    """
+    SELECT
+        (SELECT COALESCE(MAX(orderNumber), 0) FROM orders) AS orders,
+        (SELECT COALESCE(MAX(customerNumber), 0) FROM customers) AS customers,
+        (SELECT COALESCE(MAX(rowid), 0) FROM payments) AS payments;
+    """,
+    description="Highest orderNumber, customerNumber and payments rowid (primary-key lookups).",
+    variants={
+        # No rowid outside SQLite: the row count equals the highest rowid of an append-only table
+        dialect: """
+        SELECT
+            (SELECT COALESCE(MAX(orderNumber), 0) FROM orders) AS orders,
+            (SELECT COALESCE(MAX(customerNumber), 0) FROM customers) AS customers,
+            (SELECT COUNT(*) FROM payments) AS payments;
+        """
+        for dialect in ("mysql", "mssql")
+    },
+)
+
+
+# Queries each page runs on load; per-selection lookups are the parameterized ones.
+# Used by the load-test harness to replay realistic sessions.
+PAGE_QUERIES = {
+    "app": ("customer_count",),
+    "01_eda": (
+        "summary_country_counts", "eda_credit_limit_range", "eda_credit_limit_bins",
+        "summary_product_line_sales", "summary_product_line_profit",
+    ),
+    "02_ml_churn": ("customer_options", "customer_profile", "churn_customer_windows", "churn_customer_activity"),
+    "03_ml_product_reco": ("customer_options", "product_catalog", "summary_customer_top_product_line"),
+    "04_ml_credit_risk": ("customer_countries",),
+}
@@ -0,0 +1,175 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Quoted string literals / identifiers ('' and "" escape a quote inside them) or a whitespace run
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+")
+
+
+def normalize_sql(sql_query: str) -> str:
+    """Collapses whitespace and trailing semicolons so equivalent queries share a cache key.
+
+    Whitespace inside quoted literals is significant and kept as is.
+    """
+    collapsed = _SQL_TOKEN.sub(lambda match: match.group(0) if match.group(0)[0] in "'\"" else " ", sql_query)
+    return collapsed.strip().rstrip(";").strip()
+
+
+def make_cache_key(sql_query: str, params: dict | None = None, dtypes: dict | None = None) -> tuple:
+    """Builds a hashable cache key from the normalized SQL, its bound parameters and declared dtypes."""
+    bound = tuple(sorted((params or {}).items()))
+    declared = tuple(sorted((name, str(dtype)) for name, dtype in (dtypes or {}).items()))
+    return (normalize_sql(sql_query), bound, declared)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Returns the deep memory footprint of a DataFrame in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class SQLiteVersionProbe:
+    """Reports a token that changes whenever the SQLite file is modified.
+
+    The token combines the file's mtime/size with `PRAGMA data_version` read on a
+    dedicated long-lived connection (data_version only moves when *other*
+    connections commit, so the probe must keep its own connection open).
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _data_version(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                f"file:{self.database_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        return self._connection.execute("PRAGMA data_version;").fetchone()[0]
+
+    def file_version(self) -> tuple:
+        """Identity, size and mtime of the database file (and its WAL), comparable across processes.
+
+        Unlike the token returned by calling the probe, it holds no per-connection
+        data_version, so other processes and later restarts derive the same value.
+        """
+        version = (os.path.realpath(self.database_path),)
+        for path in (self.database_path, self.database_path + "-wal"):
+            try:
+                stat = os.stat(path)
+                version += (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                version += (None,)
+        return version
+
+    def __call__(self) -> tuple:
+        with self._lock:
+            try:
+                stat = os.stat(self.database_path)
+                return (stat.st_mtime_ns, stat.st_size, self._data_version())
+            except (OSError, sqlite3.Error):
+                # Missing or unreadable file: never serve stale results for it
+                return (time.time_ns(),)
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results with TTL and a memory budget."""
+
+    def __init__(self, ttl_seconds: float = 600, max_bytes: int = 256 * 1024 * 1024, version_probe=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.version_probe = version_probe
+        self._entries = OrderedDict()  # key -> (DataFrame, nbytes, expires_at)
+        self._lock = threading.Lock()
+        self._version = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        """Drops every entry if the underlying database changed since the last lookup."""
+        if self.version_probe is None:
+            return
+        version = self.version_probe()
+        if self._version is not None and version != self._version:
+            self.invalidations += 1
+            self._entries.clear()
+            self.current_bytes = 0
+        self._version = version
+
+    def _pop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+    def get(self, key):
+        """Returns a copy of the cached DataFrame for `key`, or None on a miss."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            df, _, expires_at = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Hand out a copy so callers cannot mutate the shared cached frame
+            return df.copy()
+
+    def contains(self, key) -> bool:
+        """True if `key` has a live entry; unlike get() it touches neither the LRU order nor the counters."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] >= time.monotonic()
+
+    def put(self, key, df: pd.DataFrame, ttl_seconds: float | None = None):
+        """Stores a DataFrame, evicting least recently used entries to stay within budget."""
+        nbytes = frame_nbytes(df)
+        if nbytes > self.max_bytes:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            while self._entries and self.current_bytes + nbytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._pop(oldest_key)
+                self.evictions += 1
+            self._entries[key] = (df.copy(), nbytes, time.monotonic() + ttl)
+            self.current_bytes += nbytes
+
+    def clear(self):
+        """Removes every cached entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters and current memory usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,212 @@
+"""SQLite stand-in for the MySQL and SQL Server drivers, for exercising those backends offline.
+
+The mysql / mssql paths of utils/backends.py (dialect query variants, the
+statement-timeout connect hooks, pool settings) normally need a live server and
+its driver. This module is a small DB-API 2.0 driver over sqlite3 that
+SQLAlchemy's mysql+mysqlconnector and mssql+pyodbc dialects accept in place of
+the real one:
+
+    config = BackendConfig(backend="mssql", host="offline")
+    engine = create_backend_engine(config, **sqlite_shim.engine_kwargs("data/classicmodels.sqlite"))
+
+Statements are adapted to SQLite only where the registered queries and the
+dialects need it:
+
+    SELECT TOP n ...          -> SELECT ... LIMIT n
+    SET SESSION name = value  -> recorded in connection.session, not executed
+    server probes             -> canned answers (version, sql_mode, schema name, ...)
+
+Anything else runs on SQLite unchanged, so a variant using syntax SQLite does
+not know fails loudly rather than passing by accident.
+"""
+import math
+import re
+import sqlite3
+import sys
+
+# --- DB-API module attributes (read by SQLAlchemy instead of the real driver's) ---
+
+apilevel = "2.0"
+threadsafety = 1
+paramstyle = "qmark"
+# Versions reported as the driver's (mysql-connector / pyodbc dialects parse them)
+__version__ = "9.4.0"
+version = "5.1.0"
+
+Warning = sqlite3.Warning
+Error = sqlite3.Error
+InterfaceError = sqlite3.InterfaceError
+DatabaseError = sqlite3.DatabaseError
+DataError = sqlite3.DataError
+OperationalError = sqlite3.OperationalError
+IntegrityError = sqlite3.IntegrityError
+InternalError = sqlite3.InternalError
+ProgrammingError = sqlite3.ProgrammingError
+NotSupportedError = sqlite3.NotSupportedError
+Binary = bytes
+BinaryNull = None
+# pyodbc SQL type codes the mssql dialect refers to
+SQL_VARCHAR = 12
+SQL_WVARCHAR = -9
+
+_TOP = re.compile(r"^\s*SELECT\s+TOP\s+(\d+)\s+(.*?)[\s;]*$", re.IGNORECASE | re.DOTALL)
+_SET_SESSION = re.compile(r"^\s*SET\s+(?:SESSION\s+)?(\w+)\s*=\s*(.*?)[\s;]*$", re.IGNORECASE | re.DOTALL)
+
+_SERVER_VARIABLE = re.compile(r"^\s*SELECT\s+@@(\w+)[\s;]*$", re.IGNORECASE)
+_SHOW_VARIABLES = re.compile(r"^\s*SHOW\s+VARIABLES\s+LIKE\s+'(\w+)'[\s;]*$", re.IGNORECASE)
+
+# MySQL server variables (SELECT @@name / SHOW VARIABLES LIKE 'name')
+SERVER_VARIABLES = {
+    "transaction_isolation": "REPEATABLE-READ",
+    "sql_mode": "ONLY_FULL_GROUP_BY,STRICT_TRANS_TABLES,NO_ENGINE_SUBSTITUTION",
+    "lower_case_table_names": "0",
+}
+
+# Other server probes the dialects run on connect: a fragment of the (lower-cased,
+# whitespace-collapsed) statement -> the answer as (column names, rows)
+_PROBES = {
+    "serverproperty('productversion')": (("version",), [("16.0.1000.6",)]),
+    "select schema_name()": (("schema",), [("dbo",)]),
+    "from sys.system_views": (("name",), [("dm_exec_sessions",)]),
+    "from sys.dm_exec_sessions": (("TRANSACTION_ISOLATION_LEVEL",), [("READ COMMITTED",)]),
+    "'test max support'": (("value",), [("test max support",)]),
+    "from fn_listextendedproperty(": (("value",), []),
+    "select version()": (("version",), [("8.0.36",)]),
+    "select database()": (("database",), [("classicmodels",)]),
+}
+
+
+def _floor(value):
+    return None if value is None else math.floor(value)
+
+
+def translate(sql: str) -> str:
+    """Rewrites the mssql / mysql constructs of the registered queries to SQLite."""
+    top = _TOP.match(sql)
+    if top:
+        return f"SELECT {top.group(2)} LIMIT {top.group(1)}"
+    return sql
+
+
+class Cursor:
+    def __init__(self, connection: "Connection"):
+        self.connection = connection
+        self._cursor = connection._sqlite.cursor()
+        self._canned = None
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1
+
+    def execute(self, sql: str, parameters=()):
+        self.connection.statements.append(sql)
+        self._canned = None
+        setting = _SET_SESSION.match(sql)
+        if setting:
+            self.connection.session[setting.group(1).upper()] = setting.group(2)
+            self.description, self.rowcount = None, -1
+            return self
+        probe = self._probe(sql)
+        if probe is not None:
+            columns, rows = probe
+            self._canned = list(rows)
+            self.description = [(name, None, None, None, None, None, None) for name in columns]
+            self.rowcount = len(rows)
+            return self
+        self._cursor.execute(translate(sql), parameters)
+        self.description, self.rowcount = self._cursor.description, self._cursor.rowcount
+        return self
+
+    @staticmethod
+    def _probe(sql: str) -> tuple | None:
+        variable = _SERVER_VARIABLE.match(sql)
+        if variable:
+            return (variable.group(1),), [(SERVER_VARIABLES[variable.group(1).lower()],)]
+        variable = _SHOW_VARIABLES.match(sql)
+        if variable:
+            name = variable.group(1).lower()
+            return ("Variable_name", "Value"), [(name, SERVER_VARIABLES[name])] if name in SERVER_VARIABLES else []
+        statement = " ".join(sql.split()).lower()
+        return next((answer for fragment, answer in _PROBES.items() if fragment in statement), None)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self.connection.statements.append(sql)
+        self._cursor.executemany(translate(sql), seq_of_parameters)
+        self.description, self.rowcount = self._cursor.description, self._cursor.rowcount
+        return self
+
+    def fetchone(self):
+        if self._canned is not None:
+            return self._canned.pop(0) if self._canned else None
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int | None = None):
+        size = self.arraysize if size is None else size
+        if self._canned is not None:
+            rows, self._canned = self._canned[:size], self._canned[size:]
+            return rows
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        if self._canned is not None:
+            rows, self._canned = self._canned, []
+            return rows
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def nextset(self):
+        return None
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def setoutputsize(self, size, column=None):
+        pass
+
+
+class Connection:
+    """A sqlite3 connection posing as a mysql-connector / pyodbc one.
+
+    `timeout` (pyodbc's per-statement timeout) and `session` (SET SESSION values)
+    are kept for inspection; `statements` lists everything executed.
+    """
+
+    def __init__(self, database: str):
+        self._sqlite = sqlite3.connect(f"file:{database}?mode=ro", uri=True, check_same_thread=False)
+        # SQLite only has FLOOR when compiled with its math functions
+        self._sqlite.create_function("FLOOR", 1, _floor, deterministic=True)
+        # mysql-connector / pyodbc connection attributes the dialects read or set
+        self.charset = "utf8mb4"
+        self.timeout = 0
+        self.session = {}
+        self.statements = []
+
+    def cursor(self, **options) -> Cursor:
+        # Driver options (e.g. mysql-connector's buffered=True) do not apply to SQLite
+        return Cursor(self)
+
+    def add_output_converter(self, sqltype, func):
+        pass
+
+    def ping(self, reconnect: bool = False):
+        # mysql-connector's liveness check (pool_pre_ping on MySQL)
+        self.cursor().execute("SELECT 1")
+
+    def commit(self):
+        self._sqlite.commit()
+
+    def rollback(self):
+        self._sqlite.rollback()
+
+    def close(self):
+        self._sqlite.close()
+
+
+def connect(database: str) -> Connection:
+    return Connection(database)
+
+
+def engine_kwargs(database: str) -> dict:
+    """create_engine() arguments that route a mysql / mssql URL to `database` (SQLite, read-only)."""
+    return {"module": sys.modules[__name__], "creator": lambda: connect(database)}
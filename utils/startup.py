@@ -0,0 +1,123 @@
+"""Startup timing: how long a cold process takes to reach first paint.
+
+The app marks its startup phases with `mark()` (process-wide, first occurrence
+only): seconds since the interpreter started, so module imports before the
+first script run are included. The diagnostics page shows the report.
+
+Run as a command to measure cold starts: every entry script is executed
+headlessly (Streamlit AppTest) in a fresh interpreter, reporting the baseline
+Streamlit import, the script's first run, and which heavy optional modules
+(scikit-learn, scipy, ...) the script itself pulled in on top of Streamlit.
+
+Usage:
+    python -m utils.startup                      # app.py and every page
+    python -m utils.startup app.py pages/01_eda.py --repeat 3
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that are expensive to import and only needed by some pages
+HEAVY_MODULES = ("plotly", "sklearn", "scipy", "joblib", "pyarrow", "duckdb")
+
+
+def _process_start() -> float:
+    """Wall-clock time the interpreter started (Linux /proc), or now if unavailable."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Field 22 (starttime, clock ticks after boot) follows the parenthesised command name
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+        return time.time() - (uptime_seconds - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_START = _process_start()
+_marks: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def mark(phase: str):
+    """Records the first time this process reaches `phase` (later calls are ignored)."""
+    if phase in _marks:
+        return
+    with _lock:
+        _marks.setdefault(phase, time.time() - PROCESS_START)
+
+
+def startup_report() -> list[dict]:
+    """Phases in the order they were reached: seconds since process start and since the previous phase."""
+    with _lock:
+        marks = sorted(_marks.items(), key=lambda item: item[1])
+    report, previous = [], 0.0
+    for phase, seconds in marks:
+        report.append({"phase": phase, "since_start_ms": seconds * 1000, "step_ms": (seconds - previous) * 1000})
+        previous = seconds
+    return report
+
+
+# --- Cold start measurement (command) ---
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ms = (time.perf_counter() - start) * 1000
+preloaded = set(sys.modules)
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+run_ms = (time.perf_counter() - start) * 1000
+heavy = sorted({name.split(".")[0] for name in set(sys.modules) - preloaded} & set(sys.argv[2].split(",")))
+print(json.dumps({"streamlit_ms": streamlit_ms, "first_run_ms": run_ms, "heavy_modules": heavy,
+                  "exceptions": [str(e.value) for e in app.exception][:3]}))
+"""
+
+
+def measure_cold_start(script: str, repeat: int = 1) -> dict:
+    """Runs `script` once per repetition in a fresh interpreter and returns median timings."""
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE, os.path.join(ROOT, script), ",".join(HEAVY_MODULES)],
+            cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"{script} failed:\n{completed.stderr[-4000:]}")
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        "script": script,
+        "streamlit_ms": statistics.median(run["streamlit_ms"] for run in runs),
+        "first_run_ms": statistics.median(run["first_run_ms"] for run in runs),
+        "heavy_modules": runs[-1]["heavy_modules"],
+        "exceptions": runs[-1]["exceptions"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="*", help="entry scripts relative to the repo root (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="fresh interpreters per script (median reported)")
+    args = parser.parse_args()
+
+    scripts = args.scripts or ["app.py"] + sorted(
+        os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py"))
+    )
+    print(f"{'script':<32} {'streamlit ms':>13} {'first run ms':>13}  heavy modules")
+    for script in scripts:
+        result = measure_cold_start(script, args.repeat)
+        print(f"{script:<32} {result['streamlit_ms']:>13.0f} {result['first_run_ms']:>13.0f}  "
+              f"{', '.join(result['heavy_modules']) or '-'} {result['exceptions'] or ''}")
+
+
+if __name__ == "__main__":
+    main()